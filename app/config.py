@@ -2,7 +2,7 @@
 애플리케이션 설정 관리
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Dict, Any, List
 
 
 class Settings(BaseSettings):
@@ -20,6 +20,18 @@ class Settings(BaseSettings):
     llm_temperature: float = 1  # LLM 온도 설정
     max_tokens: int = 1000  # 최대 토큰 수
     
+    # LLM HTTP 클라이언트 설정 (OpenAI/GMS 호출용 공용 연결 풀)
+    llm_http_max_connections: int = 100  # 최대 동시 연결 수
+    llm_http_max_keepalive: int = 20  # 유지할 keep-alive 연결 수
+    llm_http_keepalive_expiry: float = 30.0  # 유휴 keep-alive 연결 유지 시간 (초)
+    llm_connect_timeout: float = 5.0  # 연결/쓰기 타임아웃 (초)
+    llm_read_timeout: float = 60.0  # 읽기 타임아웃 (초, 스트리밍은 토큰 사이 간격)
+    llm_pool_timeout: float = 10.0  # 연결 풀에서 연결을 기다리는 최대 시간 (초)
+    llm_max_retries: int = 2  # 429/5xx/연결 오류 재시도 횟수
+    llm_retry_backoff_base: float = 0.5  # 재시도 백오프 기준 (초, 지수 증가 + full jitter)
+    llm_retry_backoff_max: float = 8.0  # 재시도 대기 최대 시간 (초, Retry-After 헤더도 이 값으로 제한)
+    llm_hedge_after_ms: Optional[int] = None  # 이 시간 안에 응답 헤더가 없으면 같은 요청을 한 번 더 보냄 (None이면 사용 안 함, 비동기 호출만)
+    
     # GMS (Gen AI Management System) 설정
     use_gms: bool = False  # GMS 사용 여부
     gms_base_url: Optional[str] = None  # GMS API 엔드포인트 (예: "https://gms.ssafy.io/gmsapi/api.openai.com/v1")
@@ -38,17 +50,112 @@ class Settings(BaseSettings):
     embedding_device: str = "cpu"  # "cpu" or "cuda"
     
     # 벡터 DB 설정
-    vector_db_type: str = "chroma"
+    vector_db_type: str = "chroma"  # "chroma" (HNSW) 또는 "numpy" (mmap 행렬 정확 검색, 약 20만 청크 이하 권장)
     chroma_db_path: str = "./vector_db"
     collection_name: str = "documents"
     
+    # 인덱스 서버 모드 (멀티 워커 실행 시 하나의 프로세스만 인덱스를 메모리에 올림)
+    vector_db_mode: str = "embedded"  # "embedded" (프로세스 내 PersistentClient) 또는 "server" (chroma 백엔드 전용)
+    index_server_host: str = "127.0.0.1"
+    index_server_port: int = 8001
+    index_server_pool_size: int = 32  # 워커당 유지할 keep-alive 연결 수
+    index_server_timeout: float = 30.0  # 요청 타임아웃 (초)
+    index_server_fallback: bool = True  # 서버에 연결할 수 없으면 embedded 모드로 대체
+    web_concurrency: int = 1  # API 워커 프로세스 수 (uvicorn/gunicorn의 WEB_CONCURRENCY, 2 이상이면 파일 기반 사이드카 색인 비활성화)
+    
+    # HNSW 인덱스 설정 (새로 생성하는 컬렉션에 적용, 기존 컬렉션은 재구축으로 변경)
+    chroma_hnsw_space: str = "cosine"  # "cosine", "l2", "ip" (e5 임베딩은 cosine 권장, 기존 l2 컬렉션을 재구축하면 거리 기준 설정도 다시 조정)
+    chroma_hnsw_m: int = 16  # 노드당 연결 수 (클수록 정확도/메모리 증가)
+    chroma_hnsw_construction_ef: int = 100  # 인덱스 구축 시 탐색 폭
+    chroma_hnsw_search_ef: int = 100  # 검색 시 탐색 폭 (top_k보다 충분히 커야 함)
+    # 컬렉션별 HNSW 설정 덮어쓰기 (예: {"product_a": {"m": 32, "search_ef": 200}})
+    chroma_hnsw_overrides: Dict[str, Dict[str, Any]] = {}
+    
+    # NumPy 정확 검색 백엔드 설정 (vector_db_type="numpy")
+    numpy_db_path: Optional[str] = None  # 저장 경로 (기본값: {chroma_db_path}/numpy)
+    numpy_space: str = "cosine"  # "cosine" 또는 "ip" (컬렉션 생성 시 고정)
+    
+    # 양자화 후보 검색 설정 (chroma 백엔드, embedded 모드)
+    quantized_search_mode: str = "off"  # "off", "int8", "binary" (양자화 사본으로 후보를 뽑고 float32로 재채점)
+    quantized_oversample: int = 10  # 후보 수 = n_results × oversample (binary는 20 이상 권장)
+    
+    # 스냅샷 설정 (재임베딩 없이 노드를 부트스트랩하기 위한 내보내기/가져오기)
+    snapshot_dir: Optional[str] = None  # 기본 내보내기 경로 (기본값: {chroma_db_path}/snapshots)
+    snapshot_import_batch_size: int = 5000  # 가져오기 시 한 번에 저장할 청크 수
+    
     # 문서 처리 설정
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    ingest_batch_size: int = 64  # 대량 수집 시 한 번에 임베딩/저장하는 청크 수 (체크포인트 단위)
+    ingest_checkpoint_dir: Optional[str] = None  # 체크포인트 저장 경로 (기본값: {chroma_db_path}/ingest_checkpoints)
+    
+    # 하이브리드 검색 설정 (BM25 어휘 색인 + 벡터 검색)
+    lexical_index_enabled: bool = True  # 수집/삭제 시 BM25 어휘 색인 유지 (인덱스 서버 모드/멀티 워커에서는 사용하지 않음)
+    lexical_compact_min_docs: int = 5000  # 델타 문서 수가 이 값을 넘으면 기본 세그먼트와 병합
+    hybrid_search_enabled: bool = True  # 검색 시 어휘/벡터 결과를 RRF로 결합
+    hybrid_candidate_multiplier: int = 4  # 각 검색에서 가져올 후보 수 = top_k * 배수
+    rrf_k: int = 60  # Reciprocal Rank Fusion 상수
+    lexical_fast_path_enabled: bool = True  # 식별자 형태 질의는 임베딩 없이 어휘 검색만 사용
+    
+    # 2단계 검색 설정 (문서 중심 벡터로 상위 문서를 고른 뒤 그 문서의 청크만 검색)
+    document_centroids_enabled: bool = True  # 수집/삭제 시 문서별 중심 벡터 색인 유지 (인덱스 서버 모드/멀티 워커에서는 사용하지 않음)
+    retrieval_mode: str = "flat"  # "flat"(전체 청크 검색) 또는 "two_stage"(문서 -> 청크)
+    two_stage_top_documents: int = 20  # 1단계에서 고를 문서 수
+    
+    # 멀티 컬렉션 설정 (요청별 collection 지정)
+    max_open_collections: int = 8  # 동시에 열어 둘 최대 컬렉션 수 (기본 컬렉션 포함)
+    collection_memory_budget_mb: int = 4096  # 열린 컬렉션의 추정 인덱스 메모리 합계 상한 (0이면 제한 없음)
+    allowed_collections: Optional[List[str]] = None  # 요청으로 접근할 수 있는 컬렉션 (None이면 이름 규칙만 검사)
+    fanout_max_workers: int = 8  # 여러 컬렉션 동시 검색 스레드 수
+    
+    # 비동기 채팅 처리 설정 (워커 하나에서 여러 LLM 호출을 동시에 진행)
+    llm_max_concurrency: int = 64  # 동시에 진행할 최대 LLM 호출 수 (초과 요청은 대기)
+    embedding_max_workers: int = 2  # 쿼리 임베딩 스레드 수 (CPU 바운드)
+    search_max_workers: int = 8  # 벡터/어휘 검색 스레드 수
+    singleflight_enabled: bool = True  # 동시에 들어온 같은 요청(정규화 질문, 검색 청크, 히스토리 동일)은 LLM 호출/스트림 하나를 공유
+    
+    # 의미 기반 답변 캐시 설정 (대화 기록 없는 독립 질문만 캐시)
+    answer_cache_enabled: bool = False  # 비슷한 질문에 저장된 답변 재사용 (명시적으로 켜야 함)
+    # 재사용할 최소 쿼리 임베딩 코사인 유사도
+    # multilingual-e5는 관련 없는 질문끼리도 코사인 유사도가 0.8~0.9대에 몰리므로, 단어 몇 개만 다른
+    # 다른 질문이 통과하지 않도록 표현만 바뀐 같은 질문 수준으로 높게 잡음 (실제 질의 로그로 조정 권장)
+    answer_cache_similarity_threshold: float = 0.98
+    answer_cache_ttl_seconds: int = 3600  # 답변 유효 시간 (초, 0이면 만료 없음)
+    answer_cache_max_entries: int = 1000  # 최대 저장 답변 수 (초과 시 오래 사용하지 않은 답변부터 제거)
+    
+    # 시작 워밍업 설정 (끝나기 전까지 /ready는 503 반환)
+    warmup_enabled: bool = True  # 시작 시 임베딩 모델, 벡터 인덱스, 페이지 캐시 워밍업
+    warmup_batch_sizes: List[int] = [1, 8, 32]  # 더미 인코딩 배치 크기
+    warmup_queries: List[str] = [  # 합성 검색 질의
+        "설치 방법을 알려주세요",
+        "How do I configure the server?",
+        "오류가 발생하면 어떻게 해야 하나요?",
+    ]
     
     # RAG 설정
     retrieval_top_k: int = 5  # 검색할 문서 수
-    similarity_threshold: float = 0.5  # 유사도 임계값 (거리가 이 값보다 크면 관련성 낮음으로 판단)
+    similarity_threshold: float = 0.5  # 유사도 임계값 (거리가 이 값보다 크면 관련성 낮음으로 판단, 컬렉션 거리 공간 기준)
+    relevance_gate_enabled: bool = False  # 거리 분포로 LLM에 보낼 청크 수를 질의마다 조정 (모두 탈락하면 문서 없는 프롬프트 사용)
+    relevance_gap: float = 0.1  # 가장 가까운 청크보다 거리가 이 값 넘게 먼 청크 제외
+    relevance_min_k: int = 1  # 절대 기준을 통과하면 거리 차이와 상관없이 유지할 최소 청크 수
+    relevance_max_k: int = 5  # 게이트 통과 후 최대 청크 수 (0이면 제한 없음)
+    mmr_enabled: bool = False  # 채팅 검색 결과에 MMR 다양화 적용 (거의 같은 청크 중복 제거)
+    mmr_oversample: int = 4  # MMR 후보 배수 (top_k x mmr_oversample개 중에서 top_k개 선택)
+    mmr_lambda: float = 0.7  # MMR 관련도 가중치 (1이면 관련도만, 0이면 다양성만)
+    context_packing_enabled: bool = True  # 인접 청크 병합, 오버랩/헤더 중복 제거 후 토큰 예산 안에서 컨텍스트 구성
+    context_token_budget: int = 3000  # LLM에 보낼 문서 컨텍스트 토큰 예산 (0이면 제한 없음)
+    context_tokenizer: Optional[str] = None  # tiktoken 인코딩 이름 (None이면 llm_model로 결정, 모르는 모델은 cl100k_base)
+    
+    # 재순위화 설정 (넓게 검색한 뒤 cross-encoder 점수로 상위 청크만 LLM에 전달)
+    rerank_enabled: bool = False  # 재순위화 사용 여부
+    rerank_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # 다국어 cross-encoder 모델
+    rerank_device: str = "cpu"  # "cpu" or "cuda"
+    rerank_candidates: int = 20  # 재순위화할 후보 청크 수 (retrieval_top_k보다 작으면 retrieval_top_k)
+    rerank_top_n: int = 5  # 재순위화 후 남길 청크 수 (0이면 개수 제한 없음)
+    rerank_score_threshold: Optional[float] = None  # 이 점수 미만 청크 제외 (None이면 사용 안 함, 최소 1개는 유지)
+    rerank_batch_size: int = 32  # 한 번에 점수를 매길 (질의, 청크) 쌍 수
+    rerank_max_length: int = 512  # cross-encoder 입력 최대 토큰 수
+    rerank_cache_size: int = 10000  # (질의, 청크) 쌍 점수 LRU 캐시 크기 (0이면 캐시 안 함)
     rag_prompt_template: str = """다음 공식 문서를 참고하여 사용자의 질문에 답변해주세요.
 
 공식 문서 내용:
@@ -58,6 +165,39 @@ class Settings(BaseSettings):
 
 답변:"""
     
+    # 의도 라우터 설정 (인사말/신원 질문은 검색 없이 답변)
+    intent_router_enabled: bool = False  # 쿼리 임베딩으로 경로를 골라 문서 질문만 검색 + 문서 컨텍스트 사용
+    intent_router_threshold: float = 0.8  # 문서 외 경로를 사용할 최소 코사인 유사도 (미만이면 문서 질문으로 처리)
+    intent_prototypes: Dict[str, List[str]] = {  # 경로별 예시 질문 (중심 벡터 계산용, "docs" 경로 필수)
+        "docs": [
+            "설치 방법을 알려주세요",
+            "설정 파일은 어디에 있나요?",
+            "오류가 발생하면 어떻게 해야 하나요?",
+            "이 함수의 매개변수는 무엇인가요?",
+            "How do I configure the server?",
+            "Show me an example of using the API",
+        ],
+        "smalltalk": [
+            "안녕하세요",
+            "반가워요",
+            "고마워요",
+            "오늘 날씨 어때?",
+            "Hello",
+            "Thanks a lot!",
+        ],
+        "identity": [
+            "너 누구야",
+            "너는 뭐야",
+            "역할이 뭐야",
+            "무엇을 도와줄 수 있어?",
+            "Who are you?",
+            "What can you do?",
+        ],
+    }
+    intent_canned_responses: Dict[str, str] = {  # LLM 호출 없이 고정 답변을 보낼 경로 (나머지 경로는 짧은 프롬프트로 LLM 호출)
+        "identity": "저는 공식 문서 도우미 챗봇입니다. 공식 문서를 검색해서 설치, 설정, API 사용법 같은 질문에 답변해 드려요. 궁금한 내용을 물어보세요!",
+    }
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,270 @@
+"""
+대량 수집 체크포인트 모듈
+디렉토리 일괄 처리 중 커밋된 파일/청크 배치를 기록하여 재시작 시 이어서 처리
+
+저장 구조:
+    {job_id}.json         전체 상태 스냅샷
+    {job_id}.log.jsonl    스냅샷 이후 변경된 파일 상태 (배치마다 한 줄 추가, 로드 시 스냅샷 위에 재생)
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 작업 ID 규칙 (파일 이름으로 쓰이므로 경로 구분자/상대 경로를 허용하지 않음)
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# 변경 로그가 이 줄 수와 기록된 파일 수 중 큰 값을 넘으면 스냅샷으로 합침 (전체 쓰기 비용을 분할 상환)
+LOG_COMPACT_MIN_RECORDS = 1000
+
+
+class IngestCheckpoint:
+    """대량 수집 작업 체크포인트 (JSON 스냅샷 + 추가 전용 변경 로그)"""
+    
+    def __init__(self, job_id: str, checkpoint_dir: Optional[str] = None):
+        """
+        체크포인트 초기화 (기존 파일이 있으면 불러오기)
+        
+        Args:
+            job_id: 작업 ID (같은 ID로 다시 실행하면 이어서 처리)
+            checkpoint_dir: 체크포인트 저장 디렉토리 (기본값: settings.ingest_checkpoint_dir)
+            
+        Raises:
+            ValueError: 작업 ID 형식이 잘못된 경우
+        """
+        self.job_id = self.validate_job_id(job_id)
+        self.checkpoint_dir = checkpoint_dir or settings.ingest_checkpoint_dir or os.path.join(
+            settings.chroma_db_path, "ingest_checkpoints"
+        )
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self.path = os.path.join(self.checkpoint_dir, f"{job_id}.json")
+        self.log_path = os.path.join(self.checkpoint_dir, f"{job_id}.log.jsonl")
+        self._log_records = 0
+        self.state = self._load()
+    
+    @staticmethod
+    def validate_job_id(job_id: str) -> str:
+        """
+        요청으로 받은 작업 ID 검증 (영숫자, _, - 로 이루어진 1~64자)
+        
+        Args:
+            job_id: 작업 ID
+            
+        Returns:
+            검증된 작업 ID
+            
+        Raises:
+            ValueError: 형식이 잘못된 경우
+        """
+        if not isinstance(job_id, str) or not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid job_id: {job_id!r} (expected 1-64 characters of A-Z, a-z, 0-9, _ or -)")
+        return job_id
+    
+    @staticmethod
+    def make_job_id(directory_path: str, pattern: str, collection_name: Optional[str] = None) -> str:
+        """
+        디렉토리 경로와 패턴(과 컬렉션)으로 결정적인 작업 ID 생성
+        
+        Args:
+            directory_path: 디렉토리 경로
+            pattern: 파일 패턴
+            collection_name: 대상 컬렉션 (기본 컬렉션이면 생략하여 기존 작업 ID 유지)
+            
+        Returns:
+            작업 ID
+        """
+        key = f"{os.path.abspath(directory_path)}|{pattern}"
+        if collection_name and collection_name != settings.collection_name:
+            key += f"|{collection_name}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """
+        문서 내용 해시 (파일이 바뀌었으면 처음부터 다시 처리하기 위함)
+        
+        Args:
+            text: 문서 텍스트
+            
+        Returns:
+            SHA-256 해시 문자열
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _load(self) -> Dict[str, Any]:
+        """체크포인트 스냅샷 로드 후 변경 로그 재생 (없거나 손상되었으면 새 상태)"""
+        state = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"[IngestCheckpoint] 체크포인트 로드 실패, 새로 시작: {e}")
+        if state is None:
+            state = {
+                "job_id": self.job_id,
+                "created_at": datetime.now().isoformat(),
+                "files": {}
+            }
+        
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 마지막 줄이 기록 도중 중단된 경우
+                        continue
+                    state["files"][record["key"]] = record["state"]
+                    self._log_records += 1
+        
+        if state["files"]:
+            logger.info(
+                f"[IngestCheckpoint] 체크포인트 로드 - 작업 {self.job_id}, "
+                f"기록된 파일: {len(state['files'])}개"
+            )
+        return state
+    
+    def _file_state(self, key: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """내용 해시가 일치하는 파일 상태 반환"""
+        file_state = self.state["files"].get(key)
+        if file_state and file_state.get("content_hash") == content_hash:
+            return file_state
+        return None
+    
+    def is_done(self, key: str, content_hash: str) -> bool:
+        """
+        파일이 이미 모두 커밋되었는지 확인
+        
+        Args:
+            key: 파일 키 (상대 경로)
+            content_hash: 문서 내용 해시
+            
+        Returns:
+            완료 여부
+        """
+        file_state = self._file_state(key, content_hash)
+        return bool(file_state and file_state.get("done"))
+    
+    def committed_batches(self, key: str, content_hash: str) -> int:
+        """
+        파일에서 이미 커밋된 청크 배치 수
+        
+        Args:
+            key: 파일 키 (상대 경로)
+            content_hash: 문서 내용 해시
+            
+        Returns:
+            커밋된 배치 수 (내용이 바뀌었으면 0)
+        """
+        file_state = self._file_state(key, content_hash)
+        return file_state.get("committed_batches", 0) if file_state else 0
+    
+    def get_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        완료된 파일의 처리 결과 반환
+        
+        Args:
+            key: 파일 키 (상대 경로)
+            
+        Returns:
+            파일 상태 딕셔너리 또는 None
+        """
+        return self.state["files"].get(key)
+    
+    def mark_batch(
+        self,
+        key: str,
+        content_hash: str,
+        document_id: str,
+        batch_index: int,
+        total_batches: int
+    ) -> None:
+        """
+        청크 배치 커밋 기록 후 변경 로그에 추가
+        
+        Args:
+            key: 파일 키 (상대 경로)
+            content_hash: 문서 내용 해시
+            document_id: 문서 ID
+            batch_index: 커밋된 배치 인덱스
+            total_batches: 전체 배치 수
+        """
+        self.state["files"][key] = {
+            "content_hash": content_hash,
+            "document_id": document_id,
+            "committed_batches": batch_index + 1,
+            "total_batches": total_batches,
+            "done": False
+        }
+        self._append(key)
+    
+    def mark_done(
+        self,
+        key: str,
+        content_hash: str,
+        document_id: str,
+        chunks_count: int
+    ) -> None:
+        """
+        파일 처리 완료 기록 후 변경 로그에 추가
+        
+        Args:
+            key: 파일 키 (상대 경로)
+            content_hash: 문서 내용 해시
+            document_id: 문서 ID
+            chunks_count: 저장된 청크 수
+        """
+        file_state = self.state["files"].get(key, {})
+        file_state.update({
+            "content_hash": content_hash,
+            "document_id": document_id,
+            "chunks_count": chunks_count,
+            "done": True
+        })
+        self.state["files"][key] = file_state
+        self._append(key)
+    
+    def _append(self, key: str) -> None:
+        """파일 상태 변경을 로그에 한 줄 추가 (로그가 커지면 스냅샷으로 합침)"""
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "state": self.state["files"][key]}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_records += 1
+        if self._log_records > max(LOG_COMPACT_MIN_RECORDS, len(self.state["files"])):
+            self.save()
+    
+    def save(self) -> None:
+        """
+        전체 상태를 스냅샷으로 저장하고 변경 로그 비우기
+        (임시 파일에 쓴 뒤 교체하여 중단 시에도 손상 방지, 로그를 비우기 전에 중단되어도 재생 결과는 같음)
+        """
+        self.state["updated_at"] = datetime.now().isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_records = 0
+    
+    def clear(self) -> None:
+        """체크포인트 파일 삭제 (작업이 오류 없이 끝났을 때)"""
+        for path in (self.path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._log_records = 0
+        self.state = {
+            "job_id": self.job_id,
+            "created_at": datetime.now().isoformat(),
+            "files": {}
+        }
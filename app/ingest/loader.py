@@ -323,7 +323,8 @@ class DocumentLoader:
     def load_markdown_directory(
         directory_path: str,
         pattern: str = "*.md",
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        stable_ids: bool = False
     ) -> List[Dict[str, Any]]:
         """
         디렉토리에서 모든 마크다운 파일 로드
@@ -332,6 +333,7 @@ class DocumentLoader:
             directory_path: 디렉토리 경로
             pattern: 파일 패턴 (기본값: *.md)
             metadata: 기본 메타데이터
+            stable_ids: 파일 경로로 결정적인 문서 ID 생성 (다시 실행해도 같은 ID)
             
         Returns:
             문서 딕셔너리 리스트
@@ -347,9 +349,13 @@ class DocumentLoader:
         if not md_files:
             raise ValueError(f"No markdown files found in {directory_path}")
         
-        for md_file in md_files:
+        for md_file in sorted(md_files):
             file_metadata = metadata.copy() if metadata else {}
             file_metadata["relative_path"] = str(md_file.relative_to(path))
+            if stable_ids:
+                file_metadata["document_id"] = str(
+                    uuid.uuid5(uuid.NAMESPACE_URL, str(md_file.resolve()))
+                )
             
             try:
                 doc = DocumentLoader.load_markdown_file(str(md_file), file_metadata)
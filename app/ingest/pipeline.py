@@ -1,11 +1,18 @@
 """
 문서 처리 파이프라인
 """
-from typing import List, Dict, Any, Optional
+import copy
+import logging
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from app.ingest.loader import DocumentLoader
 from app.ingest.chunker import DocumentChunker
 from app.ingest.embedder import Embedder
-from app.vectorstore.chroma import ChromaVectorStore
+from app.ingest.checkpoint import IngestCheckpoint
+from app.vectorstore.factory import create_vectorstore
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class IngestPipeline:
@@ -33,24 +40,88 @@ class IngestPipeline:
             chunk_overlap=chunk_overlap
         )
         self.embedder = Embedder(model_name=embedding_model)
-        self.vectorstore = ChromaVectorStore(collection_name=collection_name)
+        self.vectorstore = create_vectorstore(collection_name=collection_name)
+    
+    def with_vectorstore(self, vectorstore) -> "IngestPipeline":
+        """
+        로더/청커/임베딩 모델을 공유하고 벡터 스토어만 바꾼 파이프라인 (요청별 컬렉션용)
+        
+        Args:
+            vectorstore: 사용할 벡터 스토어
+            
+        Returns:
+            새 파이프라인 인스턴스
+        """
+        pipeline = copy.copy(self)
+        pipeline.vectorstore = vectorstore
+        return pipeline
+    
+    def _chunk_document(self, document: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        문서를 마크다운 기준으로 청킹하고 결정적인 청크 ID 생성
+        
+        Args:
+            document: 문서 딕셔너리 (id, text, metadata 포함)
+            
+        Returns:
+            (청크 텍스트 리스트, 청크 메타데이터 리스트, 청크 ID 리스트)
+        """
+        chunks = self.chunker.chunk_markdown_document(
+            document,
+            preserve_metadata=True,
+            preserve_headers=True
+        )
+        
+        if not chunks:
+            raise ValueError("No chunks created from document")
+        
+        chunk_texts = [chunk["text"] for chunk in chunks]
+        # ChromaDB는 None 메타데이터 값을 허용하지 않으므로 제거 (헤더 없는 문서 등)
+        chunk_metadatas = [
+            {key: value for key, value in chunk["metadata"].items() if value is not None}
+            for chunk in chunks
+        ]
+        chunk_ids = [
+            f"{document['id']}_chunk_{i}" for i in range(len(chunks))
+        ]
+        return chunk_texts, chunk_metadatas, chunk_ids
+    
+    def _embed_chunk_texts(self, chunk_texts: List[str]) -> List[List[float]]:
+        """
+        청크 텍스트 임베딩 생성
+        
+        Args:
+            chunk_texts: 청크 텍스트 리스트
+            
+        Returns:
+            임베딩 벡터 리스트
+        """
+        # multilingual-e5 모델의 경우 "passage: " prefix 사용
+        instruction = "passage: " if "multilingual-e5" in self.embedder.model_name.lower() else None
+        return self.embedder.embed_texts(chunk_texts, instruction=instruction)
     
     def ingest_text(
         self,
         text: str,
         metadata: Optional[Dict[str, Any]] = None,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        upsert: bool = True
     ) -> Dict[str, Any]:
         """
         텍스트를 수집하고 벡터 스토어에 저장
         
+        upsert 모드에서는 같은 document_id로 다시 수집할 때 청크 집합을
+        새 버전으로 교체합니다. 기존 청크는 갱신되고, 새 버전에 없는
+        뒤쪽 청크는 삭제됩니다.
+        
         Args:
             text: 문서 텍스트
             metadata: 문서 메타데이터
             document_id: 문서 ID (없으면 자동 생성)
+            upsert: 기존 청크를 교체할지 여부 (False면 collection.add 사용)
             
         Returns:
-            처리 결과 딕셔너리
+            처리 결과 딕셔너리 (added/updated/removed 청크 수, 단계별 소요 시간(초) 포함)
         """
         # 1. 문서 로드
         if metadata is None:
@@ -60,44 +131,71 @@ class IngestPipeline:
         
         document = self.loader.load_text(text, metadata)
         
-        # 2. 문서 청킹 (마크다운으로 처리)
-        chunks = self.chunker.chunk_markdown_document(
-            document,
-            preserve_metadata=True,
-            preserve_headers=True
-        )
-        
-        if not chunks:
-            raise ValueError("No chunks created from document")
+        # 2. 문서 청킹 (마크다운으로 처리) + 청크 ID 생성
+        stage_start = time.perf_counter()
+        chunk_texts, chunk_metadatas, chunk_ids = self._chunk_document(document)
+        timings = {"chunk": time.perf_counter() - stage_start}
         
         # 3. 임베딩 생성
-        chunk_texts = [chunk["text"] for chunk in chunks]
-        # multilingual-e5 모델의 경우 "passage: " prefix 사용
-        instruction = "passage: " if "multilingual-e5" in self.embedder.model_name.lower() else None
-        embeddings = self.embedder.embed_texts(chunk_texts, instruction=instruction)
+        stage_start = time.perf_counter()
+        embeddings = self._embed_chunk_texts(chunk_texts)
+        timings["embed"] = time.perf_counter() - stage_start
         
-        # 4. 메타데이터 준비
-        chunk_metadatas = [chunk["metadata"] for chunk in chunks]
+        # 4. 벡터 스토어에 저장
+        stage_start = time.perf_counter()
+        if not upsert:
+            stored_ids = self.vectorstore.add_documents(
+                texts=chunk_texts,
+                embeddings=embeddings,
+                metadatas=chunk_metadatas,
+                ids=chunk_ids
+            )
+            self.vectorstore.update_document_centroid(document["id"], embeddings)
+            timings["store"] = time.perf_counter() - stage_start
+            return {
+                "document_id": document["id"],
+                "chunks_count": len(chunk_ids),
+                "chunk_ids": stored_ids,
+                "added_count": len(stored_ids),
+                "updated_count": 0,
+                "removed_count": 0,
+                "timings": timings,
+                "message": f"Successfully ingested document with {len(chunk_ids)} chunks"
+            }
         
-        # 5. 청크 ID 생성
-        import uuid
-        chunk_ids = [
-            f"{document['id']}_chunk_{i}" for i in range(len(chunks))
-        ]
-        
-        # 6. 벡터 스토어에 저장
-        stored_ids = self.vectorstore.add_documents(
+        # 기존 청크 ID 조회 후 upsert -> 남은 뒤쪽 청크만 삭제
+        # (upsert를 먼저 수행하므로 교체 중에도 문서가 비어 보이지 않음)
+        existing_ids = set(self.vectorstore.get_document_chunk_ids(document["id"]))
+        stored_ids = self.vectorstore.upsert_documents(
             texts=chunk_texts,
             embeddings=embeddings,
             metadatas=chunk_metadatas,
             ids=chunk_ids
         )
         
+        new_ids = set(stored_ids)
+        removed_ids = sorted(existing_ids - new_ids)
+        if removed_ids:
+            self.vectorstore.delete_documents(removed_ids)
+        # 문서 중심 벡터 갱신 (2단계 검색용, 새 버전의 청크 임베딩 평균)
+        self.vectorstore.update_document_centroid(document["id"], embeddings)
+        timings["store"] = time.perf_counter() - stage_start
+        
+        updated_count = len(existing_ids & new_ids)
+        added_count = len(new_ids) - updated_count
+        
         return {
             "document_id": document["id"],
-            "chunks_count": len(chunks),
+            "chunks_count": len(chunk_ids),
             "chunk_ids": stored_ids,
-            "message": f"Successfully ingested document with {len(chunks)} chunks"
+            "added_count": added_count,
+            "updated_count": updated_count,
+            "removed_count": len(removed_ids),
+            "timings": timings,
+            "message": (
+                f"Successfully ingested document with {len(chunk_ids)} chunks "
+                f"(added: {added_count}, updated: {updated_count}, removed: {len(removed_ids)})"
+            )
         }
     
     def ingest_documents(
@@ -124,6 +222,148 @@ class IngestPipeline:
         
         return results
     
+    def ingest_directory(
+        self,
+        directory_path: str,
+        pattern: str = "*.md",
+        metadata: Optional[Dict[str, Any]] = None,
+        job_id: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        디렉토리의 마크다운 파일을 체크포인트 기반으로 일괄 수집
+        
+        파일 경로로 결정적인 문서 ID를 만들고, 청크를 batch_size 단위로
+        임베딩/저장할 때마다 체크포인트에 기록합니다. 중간에 프로세스가
+        재시작되면 같은 작업 ID로 다시 호출했을 때 완료된 파일은 건너뛰고
+        진행 중이던 파일은 마지막으로 커밋된 배치 다음부터 이어서 처리합니다.
+        
+        Args:
+            directory_path: 디렉토리 경로
+            pattern: 파일 패턴 (기본값: *.md)
+            metadata: 기본 메타데이터
+            job_id: 작업 ID (없으면 디렉토리 경로와 패턴으로 생성)
+            batch_size: 체크포인트 단위 청크 수 (기본값: settings.ingest_batch_size)
+            
+        Returns:
+            처리 결과 딕셔너리 (processed, skipped, total_chunks, document_ids, errors, job_id)
+        """
+        batch_size = batch_size or settings.ingest_batch_size
+        job_id = job_id or IngestCheckpoint.make_job_id(
+            directory_path, pattern, self.vectorstore.collection_name
+        )
+        checkpoint = IngestCheckpoint(job_id)
+        
+        documents = self.loader.load_markdown_directory(
+            directory_path=directory_path,
+            pattern=pattern,
+            metadata=metadata,
+            stable_ids=True
+        )
+        
+        processed_count = 0
+        skipped_count = 0
+        total_chunks = 0
+        document_ids = []
+        errors = []
+        
+        for document in documents:
+            key = document["metadata"].get("relative_path") or document["id"]
+            try:
+                result = self._ingest_document_resumable(document, checkpoint, key, batch_size)
+                if result["skipped"]:
+                    skipped_count += 1
+                else:
+                    processed_count += 1
+                total_chunks += result["chunks_count"]
+                document_ids.append(result["document_id"])
+            except Exception as e:
+                logger.error(f"[IngestPipeline] 파일 처리 실패 - {key}: {e}", exc_info=True)
+                errors.append(f"Error processing {document['metadata'].get('source', key)}: {str(e)}")
+        
+        # 오류 없이 끝난 작업은 체크포인트 정리 (다음 실행은 전체를 다시 upsert)
+        if not errors:
+            checkpoint.clear()
+        
+        return {
+            "job_id": job_id,
+            "processed": processed_count,
+            "skipped": skipped_count,
+            "total_chunks": total_chunks,
+            "document_ids": document_ids,
+            "errors": errors
+        }
+    
+    def _ingest_document_resumable(
+        self,
+        document: Dict[str, Any],
+        checkpoint: IngestCheckpoint,
+        key: str,
+        batch_size: int
+    ) -> Dict[str, Any]:
+        """
+        문서 하나를 배치 단위로 저장하며 체크포인트에 기록
+        
+        Args:
+            document: 문서 딕셔너리 (결정적인 id 포함)
+            checkpoint: 체크포인트 인스턴스
+            key: 체크포인트 파일 키
+            batch_size: 배치당 청크 수
+            
+        Returns:
+            처리 결과 딕셔너리 (document_id, chunks_count, skipped)
+        """
+        content_hash = IngestCheckpoint.content_hash(document["text"])
+        
+        if checkpoint.is_done(key, content_hash):
+            previous = checkpoint.get_result(key)
+            return {
+                "document_id": previous["document_id"],
+                "chunks_count": previous.get("chunks_count", 0),
+                "skipped": True
+            }
+        
+        # 청킹은 결정적이므로 재시작 시 다시 수행해도 같은 청크 ID가 나옴
+        chunk_texts, chunk_metadatas, chunk_ids = self._chunk_document(document)
+        total_batches = (len(chunk_ids) + batch_size - 1) // batch_size
+        start_batch = checkpoint.committed_batches(key, content_hash)
+        
+        if start_batch:
+            logger.info(
+                f"[IngestPipeline] 체크포인트에서 재개 - {key}, "
+                f"배치 {start_batch}/{total_batches}부터"
+            )
+        
+        for batch_index in range(start_batch, total_batches):
+            start = batch_index * batch_size
+            end = start + batch_size
+            embeddings = self._embed_chunk_texts(chunk_texts[start:end])
+            self.vectorstore.upsert_documents(
+                texts=chunk_texts[start:end],
+                embeddings=embeddings,
+                metadatas=chunk_metadatas[start:end],
+                ids=chunk_ids[start:end]
+            )
+            checkpoint.mark_batch(key, content_hash, document["id"], batch_index, total_batches)
+        
+        # 이전 버전에만 있던 뒤쪽 청크 정리
+        leftover_ids = sorted(
+            set(self.vectorstore.get_document_chunk_ids(document["id"])) - set(chunk_ids)
+        )
+        if leftover_ids:
+            self.vectorstore.delete_documents(leftover_ids)
+        
+        # 재개한 경우 앞쪽 배치의 임베딩은 메모리에 없으므로 저장된 청크에서 중심 벡터 계산
+        self.vectorstore.update_document_centroid(document["id"])
+        
+        checkpoint.mark_done(key, content_hash, document["id"], len(chunk_ids))
+        
+        return {
+            "document_id": document["id"],
+            "chunks_count": len(chunk_ids),
+            "skipped": False
+        }
+    
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """
         저장된 모든 문서 조회
@@ -144,14 +384,12 @@ class IngestPipeline:
             성공 여부
         """
         # 해당 문서의 모든 청크 찾기
-        all_docs = self.vectorstore.get_all_documents()
-        chunk_ids = [
-            doc["id"] for doc in all_docs
-            if doc.get("metadata", {}).get("document_id") == document_id
-        ]
+        chunk_ids = self.vectorstore.get_document_chunk_ids(document_id)
         
         if chunk_ids:
-            return self.vectorstore.delete_documents(chunk_ids)
+            success = self.vectorstore.delete_documents(chunk_ids)
+            self.vectorstore.update_document_centroid(document_id)
+            return success
         return False
     
     def delete_all_documents(self) -> bool:
@@ -1,11 +1,18 @@
 """
 FastAPI 메인 애플리케이션
 """
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 from app.routes import documents, chat
+from app.services.warmup import run_warmup, warmup_state
+from app.services.rag.concurrency import shutdown_executors
+from app.services.rag.llm_http import close_http_clients
 
 # 로깅 설정
 logging.basicConfig(
@@ -14,11 +21,45 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    애플리케이션 수명 주기
+    
+    시작 시 워밍업을 백그라운드 스레드에서 실행하여 /health는 바로 응답하고,
+    /ready는 워밍업이 끝난 뒤에만 200을 반환하도록 합니다.
+    """
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(run_in_threadpool(
+            run_warmup,
+            embedders=[chat.ingest_pipeline.embedder, documents.ingest_pipeline.embedder],
+            vectorstore=chat.ingest_pipeline.vectorstore,
+            rag_service=chat.rag_service
+        ))
+    else:
+        warmup_state.status = "ready"
+    
+    yield
+    
+    if warmup_task is not None and not warmup_task.done():
+        logger.info("[Lifespan] 워밍업 완료 대기 후 종료")
+        await warmup_task
+    
+    # 비동기 RAG 경로의 임베딩/검색 스레드 풀과 LLM HTTP 연결 풀 정리
+    shutdown_executors()
+    await close_http_clients()
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title=settings.app_name,
     description="간단한 RAG 시스템 챗봇 API",
-    version=settings.app_version
+    version=settings.app_version,
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -47,3 +88,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    준비 상태 확인 (로드 밸런서용)
+    
+    워밍업이 끝나기 전에는 503을 반환합니다.
+    """
+    return JSONResponse(
+        status_code=200 if warmup_state.ready else 503,
+        content=warmup_state.to_dict()
+    )
@@ -9,6 +9,8 @@ class ChatRequest(BaseModel):
     """채팅 요청 모델"""
     message: str = Field(..., description="사용자 메시지")
     session_id: Optional[str] = Field(None, description="세션 ID (없으면 자동 생성)")
+    collection: Optional[str] = Field(None, description="검색할 컬렉션 (기본값: 설정된 기본 컬렉션)")
+    use_cache: bool = Field(True, description="비슷한 질문의 저장된 답변 재사용 여부 (이전 대화가 없는 질문에만 적용)")
 
 
 class ChatResponse(BaseModel):
@@ -16,6 +18,12 @@ class ChatResponse(BaseModel):
     response: str = Field(..., description="챗봇 응답")
     sources: Optional[List[str]] = Field(None, description="참조된 문서 소스")
     session_id: str = Field(..., description="세션 ID")
+    cached: bool = Field(False, description="답변 캐시에서 가져온 응답인지 여부")
+    context_tokens: Optional[int] = Field(None, description="LLM에 보낸 문서 컨텍스트 토큰 수 (컨텍스트 패킹 사용 시)")
+    context_tokens_saved: Optional[int] = Field(None, description="컨텍스트 패킹으로 줄인 토큰 수")
+    rerank_latency_ms: Optional[float] = Field(None, description="재순위화에 걸린 시간 (ms, 재순위화 사용 시)")
+    rerank_tokens_saved: Optional[int] = Field(None, description="재순위화로 제외한 청크의 토큰 수")
+    route: Optional[str] = Field(None, description="의도 라우터가 고른 경로 (docs, smalltalk, identity 등, 라우터 사용 시)")
 
 
 class DocumentRequest(BaseModel):
@@ -23,6 +31,8 @@ class DocumentRequest(BaseModel):
     text: str = Field(..., description="문서 텍스트")
     metadata: Optional[Dict[str, Any]] = Field(None, description="문서 메타데이터")
     document_id: Optional[str] = Field(None, description="문서 ID")
+    upsert: bool = Field(True, description="같은 문서 ID가 있으면 청크 집합을 교체할지 여부")
+    collection: Optional[str] = Field(None, description="저장할 컬렉션 (기본값: 설정된 기본 컬렉션)")
 
 
 class DocumentResponse(BaseModel):
@@ -30,6 +40,9 @@ class DocumentResponse(BaseModel):
     message: str = Field(..., description="응답 메시지")
     document_id: str = Field(..., description="저장된 문서 ID")
     chunks_count: int = Field(..., description="생성된 청크 수")
+    added_count: Optional[int] = Field(None, description="새로 추가된 청크 수")
+    updated_count: Optional[int] = Field(None, description="갱신된 기존 청크 수")
+    removed_count: Optional[int] = Field(None, description="삭제된 이전 버전 청크 수")
 
 
 class DocumentListResponse(BaseModel):
@@ -45,12 +58,18 @@ class BulkDocumentResponse(BaseModel):
     total_chunks: int = Field(..., description="생성된 총 청크 수")
     document_ids: List[str] = Field(..., description="저장된 문서 ID 리스트")
     errors: Optional[List[str]] = Field(None, description="오류 메시지 리스트")
+    job_id: Optional[str] = Field(None, description="체크포인트 작업 ID (재시작 시 이어서 처리)")
+    skipped_documents: Optional[int] = Field(None, description="체크포인트로 건너뛴 문서 수")
 
 
 class SearchRequest(BaseModel):
     """검색 요청 모델"""
     query: str = Field(..., description="검색 쿼리")
     n_results: int = Field(5, description="반환할 결과 수", ge=1, le=20)
+    collection: Optional[str] = Field(None, description="검색할 컬렉션 (기본값: 설정된 기본 컬렉션)")
+    collections: Optional[List[str]] = Field(None, description="여러 컬렉션을 동시에 검색하여 병합 (지정하면 collection 무시)", min_length=1, max_length=32)
+    mmr: bool = Field(False, description="MMR 다양화 (n_results x MMR_OVERSAMPLE개 후보 중 서로 덜 비슷한 결과 선택)")
+    mmr_lambda: Optional[float] = Field(None, description="MMR 관련도 가중치 (1이면 관련도만, 0이면 다양성만, 기본값: MMR_LAMBDA)", ge=0.0, le=1.0)
 
 
 class SearchResponse(BaseModel):
@@ -60,6 +79,21 @@ class SearchResponse(BaseModel):
     total: int = Field(..., description="검색된 결과 수")
 
 
+class BatchSearchRequest(BaseModel):
+    """배치 검색 요청 모델"""
+    queries: List[str] = Field(..., description="검색 쿼리 리스트", min_length=1, max_length=5000)
+    n_results: int = Field(5, description="쿼리당 반환할 결과 수", ge=1, le=20)
+    filter_metadata: Optional[Dict[str, Any]] = Field(None, description="메타데이터 필터 (모든 쿼리에 공통 적용)")
+    collection: Optional[str] = Field(None, description="검색할 컬렉션 (기본값: 설정된 기본 컬렉션)")
+    collections: Optional[List[str]] = Field(None, description="여러 컬렉션을 동시에 검색하여 병합 (지정하면 collection 무시)", min_length=1, max_length=32)
+
+
+class BatchSearchResponse(BaseModel):
+    """배치 검색 응답 모델"""
+    results: List[SearchResponse] = Field(..., description="쿼리 순서대로 검색 결과")
+    total: int = Field(..., description="쿼리 수")
+
+
 class StatsResponse(BaseModel):
     """통계 응답 모델"""
     total_documents: int = Field(..., description="전체 문서 수")
@@ -70,7 +104,7 @@ class StatsResponse(BaseModel):
 class ChunkResponse(BaseModel):
     """청크 응답 모델"""
     chunk_id: str = Field(..., description="청크 ID")
-    text: str = Field(..., description="청크 텍스트")
+    text: Optional[str] = Field(None, description="청크 텍스트 (include_text=false면 생략)")
     metadata: Dict[str, Any] = Field(..., description="청크 메타데이터")
 
 
@@ -78,3 +112,26 @@ class ChunkListResponse(BaseModel):
     """청크 목록 응답 모델"""
     chunks: List[ChunkResponse] = Field(..., description="청크 목록")
     total: int = Field(..., description="전체 청크 수")
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (마지막 페이지면 없음)")
+
+
+class IndexRebuildRequest(BaseModel):
+    """인덱스 재구축 요청 모델 (지정하지 않은 값은 현재 설정 유지)"""
+    space: Optional[str] = Field(None, description="거리 공간 (cosine, l2, ip)", pattern="^(cosine|l2|ip)$")
+    m: Optional[int] = Field(None, description="HNSW 노드당 연결 수", ge=2, le=128)
+    construction_ef: Optional[int] = Field(None, description="인덱스 구축 시 탐색 폭", ge=1, le=2000)
+    search_ef: Optional[int] = Field(None, description="검색 시 탐색 폭", ge=1, le=2000)
+    batch_size: int = Field(1000, description="복사 배치 크기", ge=1, le=10000)
+
+
+class SnapshotExportRequest(BaseModel):
+    """스냅샷 내보내기 요청 모델"""
+    path: Optional[str] = Field(None, description="스냅샷 디렉토리 ({snapshot_dir} 기준 상대 경로, 기본값: {컬렉션}-{시각})")
+
+
+class SnapshotImportRequest(BaseModel):
+    """스냅샷 가져오기 요청 모델"""
+    path: str = Field(..., description="스냅샷 디렉토리 ({snapshot_dir} 기준 상대 경로)")
+    replace: bool = Field(True, description="가져오기 전에 기존 청크를 모두 삭제할지 여부")
+    verify: bool = Field(True, description="파일 체크섬 검증 여부")
+    allow_model_mismatch: bool = Field(False, description="임베딩 모델이 현재 설정과 달라도 가져올지 여부")
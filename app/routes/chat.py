@@ -2,13 +2,21 @@
 채팅 관련 라우터
 LangChain을 사용한 RAG 챗봇
 """
+import json
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Tuple
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.models import ChatRequest, ChatResponse
 from app.services.rag import RAGService, update_summary_background
+from app.services.rag.llm_http import llm_call_metrics
 from app.services.session_manager import SessionManager
 from app.ingest.pipeline import IngestPipeline
+from app.vectorstore.factory import collection_registry
+from app.vectorstore.registry import validate_collection_name
+from app.vectorstore.base import CollectionNotFoundError
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,6 +41,136 @@ except ValueError as e:
 session_manager = SessionManager(max_history=5)
 
 
+def _prepare_history(session_id: str, message: str) -> Tuple[List[Dict[str, Any]], str, Any]:
+    """
+    세션 히스토리 조회 후 사용자 메시지를 세션에 추가
+    
+    Args:
+        session_id: 세션 ID
+        message: 사용자 메시지
+        
+    Returns:
+        (추가 전 전체 히스토리, 기존 요약, LLM에 전달할 히스토리)
+    """
+    full_history = session_manager.get_history(session_id)
+    existing_summary = session_manager.get_summary(session_id) or ""
+    
+    # 사용자 메시지를 세션에 추가
+    session_manager.add_message(session_id, "user", message)
+    
+    # 히스토리 구성 (기존 요약 사용, 업데이트는 백그라운드에서 처리)
+    recent_count = 1  # 최근 1쌍(2개 메시지)만 전체 포함
+    
+    if len(full_history) > recent_count * 2:
+        # 요약이 필요한 경우: 기존 요약 + 최근 대화 사용
+        recent_history = full_history[-(recent_count * 2):]
+        history_with_summary = {
+            "summary": existing_summary,
+            "recent": recent_history
+        }
+    else:
+        # 요약 불필요 (최근 대화만 전달)
+        history_with_summary = full_history
+    return full_history, existing_summary, history_with_summary
+
+
+def _schedule_summary(
+    background_tasks: BackgroundTasks,
+    session_id: str,
+    full_history: List[Dict[str, Any]],
+    existing_summary: str
+) -> None:
+    """
+    응답을 세션에 저장한 뒤 백그라운드 요약 업데이트 예약
+    
+    Args:
+        background_tasks: 응답 후 실행할 작업 목록
+        session_id: 세션 ID
+        full_history: 사용자 메시지 추가 전 전체 히스토리
+        existing_summary: 기존 요약
+    """
+    recent_count = 1
+    if len(full_history) >= recent_count * 2:  # recent_count = 1이므로 2개 이상일 때 요약
+        # 업데이트된 히스토리 가져오기 (방금 추가한 메시지 포함)
+        updated_history = session_manager.get_history(session_id)
+        background_tasks.add_task(
+            update_summary_background,
+            session_id=session_id,
+            full_history=updated_history,
+            existing_summary=existing_summary,
+            session_manager=session_manager,
+            history_summarizer=rag_service.history_summarizer
+        )
+        logger.info(f"[chat] 백그라운드 요약 업데이트 작업 추가 - 세션 {session_id}")
+
+
+def _format_sources(sources: List[Dict[str, Any]]) -> List[str]:
+    """소스 정보를 문자열 리스트로 변환"""
+    formatted = []
+    for source in sources:
+        source_str = f"Document: {source.get('document_id', 'unknown')}"
+        if source.get("filename"):
+            source_str += f" ({source['filename']})"
+        formatted.append(source_str)
+    return formatted
+
+
+def _use_answer_cache(request: ChatRequest, session_id: str) -> bool:
+    """요청이 캐시를 끄지 않았고 세션에 이전 대화가 없는 독립 질문인지 확인 (_prepare_history 전에 호출)"""
+    return request.use_cache and not session_manager.get_history(session_id)
+
+
+def _check_chat_request(request: ChatRequest) -> None:
+    """RAG 서비스 사용 가능 여부와 요청한 컬렉션 이름 확인"""
+    if rag_service is None:
+        raise HTTPException(
+            status_code=500,
+            detail="RAG service is not available. Please set OPENAI_API_KEY in .env file"
+        )
+    
+    if request.collection:
+        try:
+            validate_collection_name(request.collection)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _check_collection_exists(collection: Optional[str]) -> None:
+    """
+    요청한 컬렉션이 있는지 확인 (채팅은 컬렉션을 만들지 않으므로 없으면 404)
+    
+    스트리밍 응답은 시작한 뒤에는 상태 코드를 바꿀 수 없으므로 응답 전에 컬렉션을 미리 엽니다.
+    """
+    if not collection or collection == settings.collection_name:
+        return
+    try:
+        await run_in_threadpool(collection_registry.get, collection)
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@asynccontextmanager
+async def _rag_service_for(collection: Optional[str]):
+    """
+    요청한 컬렉션을 검색하는 RAG 서비스 (처리하는 동안 컬렉션 LRU에서 내보내지 않음)
+    
+    컬렉션 열기/내보내기는 디스크 작업이므로 스레드에서 실행합니다.
+    
+    Args:
+        collection: 컬렉션 이름 (없거나 기본 컬렉션이면 기본 서비스)
+        
+    Yields:
+        RAG 서비스
+    """
+    if not collection or collection == settings.collection_name:
+        yield rag_service
+        return
+    lease = collection_registry.lease(collection)
+    vectorstore = await run_in_threadpool(lease.__enter__)
+    try:
+        yield rag_service.with_vectorstore(vectorstore)
+    finally:
+        await run_in_threadpool(lease.__exit__, None, None, None)
 
 
 @router.post("", response_model=ChatResponse)
@@ -44,76 +182,53 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     세션 ID를 통해 대화 맥락을 유지합니다.
     요약은 백그라운드에서 처리되어 다음 요청부터 반영됩니다.
     """
-    if rag_service is None:
-        raise HTTPException(
-            status_code=500,
-            detail="RAG service is not available. Please set OPENAI_API_KEY in .env file"
-        )
+    _check_chat_request(request)
+    await _check_collection_exists(request.collection)
     
     try:
         # 세션 ID 가져오기 또는 생성
         session_id = session_manager.get_or_create_session(request.session_id)
         
-        # 이전 대화 히스토리 조회
-        full_history = session_manager.get_history(session_id)
-        existing_summary = session_manager.get_summary(session_id) or ""
+        # 이전 대화가 없는 질문만 답변 캐시 사용 (대화 맥락에 따라 답이 달라지므로)
+        use_cache = _use_answer_cache(request, session_id)
         
-        # 사용자 메시지를 세션에 추가
-        session_manager.add_message(session_id, "user", request.message)
-        
-        # 히스토리 구성 (기존 요약 사용, 업데이트는 백그라운드에서 처리)
-        recent_count = 1  # 최근 1쌍(2개 메시지)만 전체 포함
-        
-        if len(full_history) > recent_count * 2:
-            # 요약이 필요한 경우: 기존 요약 + 최근 대화 사용
-            recent_history = full_history[-(recent_count * 2):]
-            history_with_summary = {
-                "summary": existing_summary,
-                "recent": recent_history
-            }
-        else:
-            # 요약 불필요 (최근 대화만 전달)
-            history_with_summary = full_history
+        # 이전 대화 히스토리 조회 후 사용자 메시지를 세션에 추가
+        full_history, existing_summary, history_with_summary = _prepare_history(session_id, request.message)
         
         # RAG를 사용한 응답 생성 (대화 히스토리 포함)
         # 기존 요약을 사용하므로 LLM 호출 1회만 발생
-        result = rag_service.chat(
-            question=request.message,
-            top_k=settings.retrieval_top_k,
-            conversation_history=history_with_summary
-        )
+        # 임베딩/검색은 스레드 풀, LLM은 ainvoke로 처리하여 이벤트 루프를 막지 않음
+        async with _rag_service_for(request.collection) as service:
+            result = await service.achat(
+                question=request.message,
+                top_k=settings.retrieval_top_k,
+                conversation_history=history_with_summary,
+                use_cache=use_cache
+            )
         
         # 응답을 세션에 추가
         session_manager.add_message(session_id, "assistant", result["response"])
         
-        # 백그라운드에서 요약 업데이트 (응답 반환 후 처리)
-        # 업데이트된 요약은 다음 요청부터 사용됨
-        if len(full_history) >= recent_count * 2:  # recent_count = 1이므로 2개 이상일 때 요약
-            # 업데이트된 히스토리 가져오기 (방금 추가한 메시지 포함)
-            updated_history = session_manager.get_history(session_id)
-            background_tasks.add_task(
-                update_summary_background,
-                session_id=session_id,
-                full_history=updated_history,
-                existing_summary=existing_summary,
-                session_manager=session_manager,
-                history_summarizer=rag_service.history_summarizer
-            )
-            logger.info(f"[chat] 백그라운드 요약 업데이트 작업 추가 - 세션 {session_id}")
+        # 백그라운드에서 요약 업데이트 (응답 반환 후 처리, 다음 요청부터 사용됨)
+        _schedule_summary(background_tasks, session_id, full_history, existing_summary)
         
-        # 소스 정보를 문자열 리스트로 변환
-        sources = []
-        for source in result.get("sources", []):
-            source_str = f"Document: {source.get('document_id', 'unknown')}"
-            if source.get("filename"):
-                source_str += f" ({source['filename']})"
-            sources.append(source_str)
+        sources = _format_sources(result.get("sources", []))
+        context_stats = result.get("context") or {}
+        rerank_stats = result.get("rerank") or {}
         
         return ChatResponse(
             response=result["response"],
             sources=sources if sources else None,
-            session_id=session_id
+            session_id=session_id,
+            cached=result.get("cached", False),
+            context_tokens=context_stats.get("tokens_after"),
+            context_tokens_saved=context_stats.get("tokens_saved"),
+            rerank_latency_ms=rerank_stats.get("latency_ms"),
+            rerank_tokens_saved=rerank_stats.get("tokens_dropped"),
+            route=result.get("route")
         )
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"[chat] 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -122,6 +237,110 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         )
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 형식 메시지"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, background_tasks: BackgroundTasks):
+    """
+    사용자 메시지에 대한 RAG 응답을 Server-Sent Events로 스트리밍합니다.
+    
+    이벤트 순서:
+    - `sources`: 세션 ID와 참조 문서 소스 (검색 직후)
+    - `token`: LLM 응답 토큰 (도착하는 대로)
+    - `done`: 전체 응답, 캐시 적중 여부, 컨텍스트 패킹/재순위화 통계, 의도 라우터 경로, 단계별 소요 시간 (retrieve, first_token, total)
+    - `error`: 처리 중 오류
+    
+    스트림이 끝나면 응답을 세션에 저장하고 요약 업데이트를 백그라운드로 예약합니다.
+    """
+    _check_chat_request(request)
+    await _check_collection_exists(request.collection)
+    
+    session_id = session_manager.get_or_create_session(request.session_id)
+    use_cache = _use_answer_cache(request, session_id)
+    full_history, existing_summary, history_with_summary = _prepare_history(session_id, request.message)
+    
+    async def event_stream():
+        try:
+            async with _rag_service_for(request.collection) as service:
+                async for event in service.astream_response(
+                    question=request.message,
+                    top_k=settings.retrieval_top_k,
+                    conversation_history=history_with_summary,
+                    use_cache=use_cache
+                ):
+                    if event["type"] == "sources":
+                        yield _sse_event("sources", {
+                            "session_id": session_id,
+                            "sources": _format_sources(event["sources"])
+                        })
+                    elif event["type"] == "token":
+                        yield _sse_event("token", {"content": event["content"]})
+                    elif event["type"] == "error":
+                        yield _sse_event("error", {"message": event["message"]})
+                    else:
+                        # 스트림이 끝난 뒤에만 응답 저장 및 요약 예약 (스트림 종료 후 실행됨)
+                        session_manager.add_message(session_id, "assistant", event["response"])
+                        _schedule_summary(background_tasks, session_id, full_history, existing_summary)
+                        yield _sse_event("done", {
+                            "session_id": session_id,
+                            "response": event["response"],
+                            "cached": event["cached"],
+                            "context": event["context"],
+                            "rerank": event["rerank"],
+                            "route": event["route"],
+                            "timings": event["timings"]
+                        })
+        except Exception as e:
+            logger.error(f"[chat_stream] 오류 발생: {str(e)}", exc_info=True)
+            yield _sse_event("error", {"message": f"Error generating response: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/metrics")
+async def chat_metrics():
+    """
+    의미 기반 답변 캐시 통계(적중률, 항목 수, 무효화/제거 횟수),
+    의도 라우터 경로별 요청 수/응답 시간, 동일 요청 합치기 횟수,
+    LLM HTTP 호출 지표(상태 코드별 응답 수, 재시도/헤지 횟수, 지연 시간)를 조회합니다.
+    
+    Returns:
+        캐시/라우터/합치기 활성화 여부와 통계, LLM HTTP 지표
+    """
+    try:
+        answer_cache = rag_service.answer_cache if rag_service is not None else None
+        intent_router = rag_service.intent_router if rag_service is not None else None
+        singleflight = rag_service.singleflight if rag_service is not None else None
+        return {
+            "answer_cache": {
+                "enabled": answer_cache is not None,
+                **(answer_cache.stats() if answer_cache is not None else {})
+            },
+            "intent_router": {
+                "enabled": intent_router is not None,
+                **(intent_router.stats() if intent_router is not None else {})
+            },
+            "singleflight": {
+                "enabled": singleflight is not None,
+                **(singleflight.stats() if singleflight is not None else {})
+            },
+            "llm_http": llm_call_metrics.stats()
+        }
+    except Exception as e:
+        logger.error(f"[chat_metrics] 오류 발생: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error getting metrics: {str(e)}"
+        )
+
+
 @router.get("/summary/{session_id}")
 async def get_summary(session_id: str):
     """
@@ -1,8 +1,10 @@
 """
 문서 관련 라우터
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import List, Optional
+from contextlib import contextmanager
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Dict, Any
 from app.models import (
     DocumentRequest,
     DocumentResponse,
@@ -10,12 +12,22 @@ from app.models import (
     BulkDocumentResponse,
     SearchRequest,
     SearchResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
     StatsResponse,
     ChunkListResponse,
-    ChunkResponse
+    ChunkResponse,
+    IndexRebuildRequest,
+    SnapshotExportRequest,
+    SnapshotImportRequest
 )
 from app.ingest.pipeline import IngestPipeline
+from app.ingest.checkpoint import IngestCheckpoint
 from app.ingest.loader import DocumentLoader
+from app.vectorstore.snapshot import export_snapshot, import_snapshot, resolve_snapshot_path
+from app.vectorstore.factory import collection_registry
+from app.vectorstore.registry import validate_collection_name
+from app.vectorstore.base import CollectionNotFoundError
 from app.config import settings
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -24,72 +36,100 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 ingest_pipeline = IngestPipeline()
 
 
+@contextmanager
+def collection_pipeline(collection: Optional[str] = None, create: bool = False):
+    """
+    요청한 컬렉션의 Ingest 파이프라인 (처리하는 동안 컬렉션 LRU에서 내보내지 않음)
+    
+    Args:
+        collection: 컬렉션 이름 (없으면 기본 컬렉션)
+        create: 컬렉션이 없으면 생성할지 여부 (저장 요청에서만 True)
+        
+    Yields:
+        IngestPipeline 인스턴스 (임베딩 모델은 공유)
+        
+    Raises:
+        ValueError: 컬렉션 이름이 잘못되었거나 허용되지 않은 경우
+        CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
+    """
+    if not collection or collection == settings.collection_name:
+        yield ingest_pipeline
+        return
+    with collection_registry.lease(validate_collection_name(collection), create=create) as vectorstore:
+        yield ingest_pipeline.with_vectorstore(vectorstore)
+
+
 @router.post("", response_model=DocumentResponse)
-async def add_document(request: DocumentRequest):
+def add_document(request: DocumentRequest):
     """
     문서를 벡터 데이터베이스에 추가합니다.
     """
     try:
-        result = ingest_pipeline.ingest_text(
-            text=request.text,
-            metadata=request.metadata,
-            document_id=request.document_id
-        )
+        with collection_pipeline(request.collection, create=True) as pipeline:
+            result = pipeline.ingest_text(
+                text=request.text,
+                metadata=request.metadata,
+                document_id=request.document_id,
+                upsert=request.upsert
+            )
         
         return DocumentResponse(
             message=result["message"],
             document_id=result["document_id"],
-            chunks_count=result["chunks_count"]
+            chunks_count=result["chunks_count"],
+            added_count=result.get("added_count"),
+            updated_count=result.get("updated_count"),
+            removed_count=result.get("removed_count")
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding document: {str(e)}")
 
 
 @router.get("", response_model=DocumentListResponse)
-async def list_documents():
+def list_documents(collection: Optional[str] = Query(None, description="컬렉션 (기본값: 기본 컬렉션)")):
     """
     저장된 문서 목록을 반환합니다.
     """
     try:
-        # 고유한 문서만 추출 (청크가 아닌 원본 문서)
-        all_docs = ingest_pipeline.get_all_documents()
-        
-        # 문서 ID별로 그룹화
-        document_map = {}
-        for doc in all_docs:
-            doc_id = doc.get("metadata", {}).get("document_id")
-            if doc_id and doc_id not in document_map:
-                document_map[doc_id] = {
-                    "id": doc_id,
-                    "metadata": doc.get("metadata", {}),
-                    "chunks_count": 0
-                }
-            if doc_id:
-                document_map[doc_id]["chunks_count"] += 1
-        
-        documents = list(document_map.values())
+        # 사이드카 인덱스에서 문서별 청크 수/메타데이터 조회 (청크 본문은 읽지 않음)
+        with collection_pipeline(collection) as pipeline:
+            documents = pipeline.vectorstore.list_documents()
         
         return DocumentListResponse(
             documents=documents,
             total=len(documents)
         )
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
 
 
 @router.delete("/{document_id}")
-async def delete_document(document_id: str):
+def delete_document(
+    document_id: str,
+    collection: Optional[str] = Query(None, description="컬렉션 (기본값: 기본 컬렉션)")
+):
     """
     문서를 삭제합니다.
     """
     try:
-        success = ingest_pipeline.delete_document(document_id)
+        with collection_pipeline(collection) as pipeline:
+            success = pipeline.delete_document(document_id)
         if success:
             return {"message": f"Document {document_id} deleted successfully"}
         else:
             raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
     except HTTPException:
         raise
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
 
@@ -147,36 +187,137 @@ async def reset_collection():
 
 
 @router.get("/stats", response_model=StatsResponse)
-async def get_document_stats():
+def get_document_stats(collection: Optional[str] = Query(None, description="컬렉션 (기본값: 기본 컬렉션)")):
     """
     벡터 데이터베이스 통계를 반환합니다.
     """
     try:
-        all_docs = ingest_pipeline.get_all_documents()
-        total_chunks = len(all_docs)
-        
-        # 고유한 문서 ID 추출
-        document_ids = set()
-        for doc in all_docs:
-            doc_id = doc.get("metadata", {}).get("document_id")
-            if doc_id:
-                document_ids.add(doc_id)
-        
-        total_documents = len(document_ids)
+        with collection_pipeline(collection) as pipeline:
+            total_chunks = pipeline.vectorstore.count()
+            total_documents = pipeline.vectorstore.count_documents()
         
         return StatsResponse(
             total_documents=total_documents,
             total_chunks=total_chunks,
-            collection_name=settings.collection_name
+            collection_name=collection or settings.collection_name
         )
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 
+@router.get("/admin/collections", summary="열린 컬렉션 조회")
+async def get_open_collections():
+    """
+    컬렉션 LRU에 열려 있는 컬렉션과 추정 메모리 사용량을 반환합니다.
+    """
+    try:
+        return collection_registry.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting collections: {str(e)}")
+
+
+@router.get("/admin/index-params", summary="인덱스 설정 조회")
+async def get_index_params():
+    """
+    현재 컬렉션의 HNSW 인덱스 설정을 반환합니다.
+    """
+    try:
+        return {
+            "collection_name": settings.collection_name,
+            "params": ingest_pipeline.vectorstore.get_index_params()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting index params: {str(e)}")
+
+
+@router.get("/admin/quantization", summary="양자화 인덱스 통계")
+def get_quantization_stats(
+    recall_queries: int = Query(0, ge=0, le=1000, description="recall 측정 쿼리 수 (0이면 측정하지 않음)"),
+    k: int = Query(10, ge=1, le=100, description="recall 기준 top-k")
+):
+    """
+    양자화 후보 인덱스의 메모리 절감량과 정확 검색 대비 recall@k를 반환합니다.
+    
+    recall 측정은 저장된 벡터를 전수 스캔하므로 스레드풀에서 실행됩니다.
+    """
+    vectorstore = ingest_pipeline.vectorstore
+    if not hasattr(vectorstore, "quantization_stats"):
+        raise HTTPException(status_code=400, detail="Quantized search is only supported by the chroma backend")
+    try:
+        return vectorstore.quantization_stats(recall_queries=recall_queries, k=k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting quantization stats: {str(e)}")
+
+
+@router.post("/admin/rebuild-index", summary="인덱스 재구축")
+def rebuild_index(request: IndexRebuildRequest):
+    """
+    새 HNSW 설정으로 컬렉션을 재구축합니다.
+    
+    재구축하는 동안 기존 컬렉션은 계속 검색/쓰기를 처리하며,
+    복사가 끝나면 새 컬렉션으로 교체됩니다. (스레드풀에서 실행)
+    """
+    try:
+        return ingest_pipeline.vectorstore.rebuild_index(
+            space=request.space,
+            m=request.m,
+            construction_ef=request.construction_ef,
+            search_ef=request.search_ef,
+            batch_size=request.batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding index: {str(e)}")
+
+
+@router.post("/admin/snapshot/export", summary="스냅샷 내보내기")
+def export_collection_snapshot(request: SnapshotExportRequest):
+    """
+    컬렉션의 ID/본문/메타데이터/임베딩을 스냅샷 번들로 내보냅니다.
+    
+    내보내는 동안 쓰기는 대기하고 검색은 계속 처리됩니다. (스레드풀에서 실행)
+    경로는 스냅샷 디렉토리 기준 상대 경로만 허용합니다.
+    """
+    try:
+        output_path = resolve_snapshot_path(request.path) if request.path else None
+        return export_snapshot(ingest_pipeline.vectorstore, output_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting snapshot: {str(e)}")
+
+
+@router.post("/admin/snapshot/import", summary="스냅샷 가져오기")
+def import_collection_snapshot(request: SnapshotImportRequest):
+    """
+    스냅샷 번들을 임베딩 재계산 없이 컬렉션으로 가져옵니다. (스레드풀에서 실행)
+    경로는 스냅샷 디렉토리 기준 상대 경로만 허용합니다.
+    """
+    try:
+        return import_snapshot(
+            ingest_pipeline.vectorstore,
+            resolve_snapshot_path(request.path),
+            replace=request.replace,
+            verify=request.verify,
+            allow_model_mismatch=request.allow_model_mismatch
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing snapshot: {str(e)}")
+
+
 @router.post("/search", response_model=SearchResponse)
-async def search_documents(request: SearchRequest):
+def search_documents(request: SearchRequest):
     """
     벡터 검색을 수행합니다.
+    
+    임베딩과 (여러 컬렉션) 검색이 동기 처리이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행됩니다.
     """
     try:
         # 쿼리 임베딩 생성
@@ -187,41 +328,129 @@ async def search_documents(request: SearchRequest):
         
         query_embedding = ingest_pipeline.embedder.embed_text(query_text)
         
-        # 벡터 검색
-        search_results = ingest_pipeline.vectorstore.search(
-            query_embedding=query_embedding,
-            n_results=request.n_results
-        )
+        # 벡터 검색 (collections를 지정하면 여러 컬렉션을 병렬로 검색하여 병합, mmr이면 후보를 넓게 검색한 뒤 MMR 선택)
+        if request.collections:
+            search_results = collection_registry.search_collections(
+                [validate_collection_name(name) for name in request.collections],
+                [query_embedding],
+                n_results=request.n_results,
+                mmr=request.mmr,
+                lambda_mult=request.mmr_lambda
+            )[0]
+        else:
+            with collection_pipeline(request.collection) as pipeline:
+                if request.mmr:
+                    search_results = pipeline.vectorstore.search_mmr(
+                        query_embedding=query_embedding,
+                        n_results=request.n_results,
+                        lambda_mult=request.mmr_lambda
+                    )
+                else:
+                    search_results = pipeline.vectorstore.search(
+                        query_embedding=query_embedding,
+                        n_results=request.n_results
+                    )
         
-        # 결과 포맷팅
-        results = []
-        for i, (doc, distance, metadata, doc_id) in enumerate(zip(
-            search_results["documents"],
-            search_results["distances"],
-            search_results["metadatas"],
-            search_results["ids"]
-        )):
-            results.append({
-                "rank": i + 1,
-                "document_id": doc_id,
-                "text": doc[:200] + "..." if len(doc) > 200 else doc,  # 처음 200자만
-                "distance": float(distance),
-                "metadata": metadata
-            })
+        return _format_search_results(request.query, search_results)
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching documents: {str(e)}")
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+def search_documents_batch(request: BatchSearchRequest):
+    """
+    여러 쿼리를 한 번에 벡터 검색합니다.
+    
+    쿼리 임베딩은 한 번의 배치 인코딩으로 생성하고, 검색도 한 번의 배치 호출로 수행합니다.
+    (오프라인 평가/프리페치용, 스레드풀에서 실행)
+    """
+    try:
+        # multilingual-e5 모델의 경우 "query: " prefix 사용 (embed_texts에서 적용)
+        query_embeddings = ingest_pipeline.embedder.embed_texts(request.queries, instruction="query:")
         
-        return SearchResponse(
-            query=request.query,
-            results=results,
-            total=len(results)
-        )
+        if request.collections:
+            search_results = collection_registry.search_collections(
+                [validate_collection_name(name) for name in request.collections],
+                query_embeddings,
+                n_results=request.n_results,
+                filter_metadata=request.filter_metadata
+            )
+        else:
+            with collection_pipeline(request.collection) as pipeline:
+                search_results = pipeline.vectorstore.search_many(
+                    query_embeddings=query_embeddings,
+                    n_results=request.n_results,
+                    filter_metadata=request.filter_metadata
+                )
+        
+        results = [
+            _format_search_results(query, query_results)
+            for query, query_results in zip(request.queries, search_results)
+        ]
+        return BatchSearchResponse(results=results, total=len(results))
+    except CollectionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching documents: {str(e)}")
 
 
+def _format_search_results(query: str, search_results: Dict[str, Any]) -> SearchResponse:
+    """
+    벡터 스토어 검색 결과를 SearchResponse로 변환
+    
+    Args:
+        query: 검색 쿼리
+        search_results: 검색 결과 딕셔너리 (documents, distances, metadatas, ids, 병합 검색 시 collections)
+        
+    Returns:
+        검색 응답
+    """
+    results = []
+    for i, (doc, distance, metadata, doc_id) in enumerate(zip(
+        search_results["documents"],
+        search_results["distances"],
+        search_results["metadatas"],
+        search_results["ids"]
+    )):
+        result = {
+            "rank": i + 1,
+            "document_id": doc_id,
+            "text": doc[:200] + "..." if len(doc) > 200 else doc,  # 처음 200자만
+            "distance": float(distance),
+            "metadata": metadata
+        }
+        if "collections" in search_results:
+            result["collection"] = search_results["collections"][i]
+        results.append(result)
+    
+    return SearchResponse(
+        query=query,
+        results=results,
+        total=len(results)
+    )
+
+
+def _ingest_uploaded_document(collection: Optional[str], document: Dict[str, Any]) -> Dict[str, Any]:
+    """업로드된 마크다운 문서 하나를 컬렉션에 저장 (스레드풀에서 호출)"""
+    with collection_pipeline(collection, create=True) as pipeline:
+        return pipeline.ingest_text(
+            text=document["text"],
+            metadata=document["metadata"],
+            document_id=document["id"]
+        )
+
+
 @router.post("/upload-markdown", response_model=BulkDocumentResponse)
 async def upload_markdown_files(
     files: List[UploadFile] = File(..., description="마크다운 파일들"),
-    base_metadata: Optional[str] = Form(None, description="기본 메타데이터 (JSON 문자열)")
+    base_metadata: Optional[str] = Form(None, description="기본 메타데이터 (JSON 문자열)"),
+    collection: Optional[str] = Form(None, description="저장할 컬렉션 (기본값: 기본 컬렉션)")
 ):
     """
     마크다운 파일들을 업로드하여 벡터 데이터베이스에 추가합니다.
@@ -243,6 +472,12 @@ async def upload_markdown_files(
         except json.JSONDecodeError:
             errors.append("Invalid JSON in base_metadata")
     
+    if collection:
+        try:
+            validate_collection_name(collection)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     for file in files:
         try:
             # 파일 확장자 확인
@@ -260,12 +495,8 @@ async def upload_markdown_files(
                 metadata={**base_meta, "upload_source": "api"}
             )
             
-            # Ingest 파이프라인 실행
-            result = ingest_pipeline.ingest_text(
-                text=document["text"],
-                metadata=document["metadata"],
-                document_id=document["id"]
-            )
+            # Ingest 파이프라인 실행 (컬렉션 열기/임베딩/저장은 디스크·CPU 작업이므로 스레드에서 실행)
+            result = await run_in_threadpool(_ingest_uploaded_document, collection, document)
             
             processed_count += 1
             total_chunks += result["chunks_count"]
@@ -285,15 +516,20 @@ async def upload_markdown_files(
 
 
 @router.post("/upload-directory", response_model=BulkDocumentResponse)
-async def upload_markdown_directory(
+def upload_markdown_directory(
     directory_path: str = Form(..., description="마크다운 파일이 있는 디렉토리 경로"),
     pattern: str = Form("*.md", description="파일 패턴 (예: *.md)"),
-    base_metadata: Optional[str] = Form(None, description="기본 메타데이터 (JSON 문자열)")
+    base_metadata: Optional[str] = Form(None, description="기본 메타데이터 (JSON 문자열)"),
+    job_id: Optional[str] = Form(None, description="체크포인트 작업 ID (없으면 디렉토리 경로와 패턴으로 생성)"),
+    collection: Optional[str] = Form(None, description="저장할 컬렉션 (기본값: 기본 컬렉션)")
 ):
     """
     디렉토리 경로를 제공하여 마크다운 파일들을 일괄 처리합니다.
     
     서버에서 접근 가능한 디렉토리 경로를 제공하면 해당 디렉토리의 모든 마크다운 파일을 처리합니다.
+    파일 경로 기반의 고정 문서 ID와 배치 단위 체크포인트를 사용하므로,
+    처리 도중 서버가 재시작되어도 같은 요청을 다시 보내면 마지막으로 커밋된 배치부터 이어서 처리합니다.
+    작업 전체가 동기 처리이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행됩니다.
     """
     import json
     
@@ -305,45 +541,32 @@ async def upload_markdown_directory(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON in base_metadata")
     
+    if job_id:
+        try:
+            IngestCheckpoint.validate_job_id(job_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        # 디렉토리에서 마크다운 파일 로드
-        documents = DocumentLoader.load_markdown_directory(
-            directory_path=directory_path,
-            pattern=pattern,
-            metadata={**base_meta, "upload_source": "directory"}
-        )
-        
-        if not documents:
-            raise HTTPException(status_code=404, detail="No markdown files found in directory")
-        
-        # 모든 문서 처리
-        processed_count = 0
-        total_chunks = 0
-        document_ids = []
-        errors = []
-        
-        for document in documents:
-            try:
-                result = ingest_pipeline.ingest_text(
-                    text=document["text"],
-                    metadata=document["metadata"],
-                    document_id=document["id"]
-                )
-                
-                processed_count += 1
-                total_chunks += result["chunks_count"]
-                document_ids.append(result["document_id"])
-                
-            except Exception as e:
-                errors.append(f"Error processing {document.get('metadata', {}).get('source', 'unknown')}: {str(e)}")
-                continue
+        with collection_pipeline(collection, create=True) as pipeline:
+            result = pipeline.ingest_directory(
+                directory_path=directory_path,
+                pattern=pattern,
+                metadata={**base_meta, "upload_source": "directory"},
+                job_id=job_id
+            )
         
         return BulkDocumentResponse(
-            message=f"Processed {processed_count} markdown file(s) from directory",
-            total_documents=processed_count,
-            total_chunks=total_chunks,
-            document_ids=document_ids,
-            errors=errors if errors else None
+            message=(
+                f"Processed {result['processed']} markdown file(s) from directory "
+                f"(skipped {result['skipped']} already committed)"
+            ),
+            total_documents=result["processed"] + result["skipped"],
+            total_chunks=result["total_chunks"],
+            document_ids=result["document_ids"],
+            errors=result["errors"] if result["errors"] else None,
+            job_id=result["job_id"],
+            skipped_documents=result["skipped"]
         )
         
     except ValueError as e:
@@ -355,42 +578,62 @@ async def upload_markdown_directory(
 @router.get("/chunks", response_model=ChunkListResponse)
 async def list_chunks(
     document_id: Optional[str] = None,
-    limit: int = 100,
-    offset: int = 0
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    include_text: bool = True
 ):
     """
     저장된 모든 청크를 조회합니다.
     
+    cursor를 사용하면 이전 페이지의 마지막 키부터 인덱스를 탐색하므로
+    컬렉션 크기와 관계없이 페이지 크기만큼의 비용으로 조회합니다.
+    
     Args:
         document_id: 특정 문서의 청크만 조회 (선택적)
         limit: 반환할 최대 청크 수 (기본값: 100)
-        offset: 건너뛸 청크 수 (기본값: 0)
+        offset: 건너뛸 청크 수 (기본값: 0, cursor가 있으면 무시)
+        cursor: 이전 응답의 next_cursor (선택적)
+        include_text: 청크 텍스트 포함 여부 (False면 메타데이터만 조회)
     """
+    include = ["documents", "metadatas"] if include_text else ["metadatas"]
+    
     try:
-        all_docs = ingest_pipeline.get_all_documents()
+        vectorstore = ingest_pipeline.vectorstore
+        if cursor or offset == 0:
+            page, next_cursor = vectorstore.page_chunks(
+                limit=limit,
+                cursor=cursor,
+                document_id=document_id,
+                include=include
+            )
+        else:
+            # 기존 offset 방식 (인덱스 OFFSET으로 처리)
+            page = vectorstore.list_chunks(
+                document_id=document_id,
+                limit=limit,
+                offset=offset,
+                include=include
+            )
+            next_cursor = None
         
-        chunks = []
-        for doc in all_docs:
-            # document_id 필터링
-            if document_id:
-                doc_metadata = doc.get("metadata", {})
-                if doc_metadata.get("document_id") != document_id:
-                    continue
-            
-            chunks.append(ChunkResponse(
+        paginated_chunks = [
+            ChunkResponse(
                 chunk_id=doc.get("id", ""),
-                text=doc.get("text", ""),
+                text=doc.get("text") if include_text else None,
                 metadata=doc.get("metadata", {})
-            ))
-        
-        # 페이징 적용
-        total = len(chunks)
-        paginated_chunks = chunks[offset:offset + limit]
+            )
+            for doc in page
+        ]
+        total = vectorstore.count_chunks(document_id)
         
         return ChunkListResponse(
             chunks=paginated_chunks,
-            total=total
+            total=total,
+            next_cursor=next_cursor
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing chunks: {str(e)}")
 
@@ -404,15 +647,14 @@ async def get_chunk(chunk_id: str):
         chunk_id: 조회할 청크 ID
     """
     try:
-        all_docs = ingest_pipeline.get_all_documents()
+        found = ingest_pipeline.vectorstore.get_by_ids([chunk_id])
         
-        for doc in all_docs:
-            if doc.get("id") == chunk_id:
-                return ChunkResponse(
-                    chunk_id=doc.get("id", ""),
-                    text=doc.get("text", ""),
-                    metadata=doc.get("metadata", {})
-                )
+        for doc in found:
+            return ChunkResponse(
+                chunk_id=doc.get("id", ""),
+                text=doc.get("text", ""),
+                metadata=doc.get("metadata", {})
+            )
         
         raise HTTPException(status_code=404, detail=f"Chunk {chunk_id} not found")
     except HTTPException:
@@ -430,17 +672,15 @@ async def get_document_chunks(document_id: str):
         document_id: 조회할 문서 ID
     """
     try:
-        all_docs = ingest_pipeline.get_all_documents()
+        chunk_ids = ingest_pipeline.vectorstore.get_document_chunk_ids(document_id)
         
         chunks = []
-        for doc in all_docs:
-            doc_metadata = doc.get("metadata", {})
-            if doc_metadata.get("document_id") == document_id:
-                chunks.append(ChunkResponse(
-                    chunk_id=doc.get("id", ""),
-                    text=doc.get("text", ""),
-                    metadata=doc_metadata
-                ))
+        for doc in ingest_pipeline.vectorstore.get_by_ids(chunk_ids):
+            chunks.append(ChunkResponse(
+                chunk_id=doc.get("id", ""),
+                text=doc.get("text", ""),
+                metadata=doc.get("metadata", {})
+            ))
         
         if not chunks:
             raise HTTPException(status_code=404, detail=f"No chunks found for document {document_id}")
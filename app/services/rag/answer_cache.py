@@ -0,0 +1,261 @@
+"""
+의미 기반 답변 캐시
+이전에 답변한 독립 질문(대화 맥락 없이 이해되는 질문)의 쿼리 임베딩, 답변, 인용한 청크 ID를 저장하고
+임베딩이 충분히 비슷한 질문이 오면 LLM 호출 없이 저장된 답변을 재사용
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set
+
+import numpy as np
+
+from app.config import settings
+from app.vectorstore.base import add_chunk_change_listener
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    쿼리 임베딩 코사인 유사도 기반 답변 캐시 (프로세스 메모리)
+    
+    - 컬렉션별로 따로 조회 (다른 컬렉션의 답변은 재사용하지 않음)
+    - TTL이 지난 항목은 조회 시 제외하고 정리
+    - 항목 수가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 제거
+    - 인용한 청크가 다시 수집되거나 삭제되면 invalidate_chunks()로 해당 답변 제거
+    """
+    
+    def __init__(self, similarity_threshold: float, ttl_seconds: int, max_entries: int):
+        """
+        캐시 초기화
+        
+        Args:
+            similarity_threshold: 재사용할 최소 코사인 유사도
+            ttl_seconds: 항목 유효 시간 (초, 0이면 만료 없음)
+            max_entries: 최대 항목 수
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._by_chunk: Dict[tuple, Set[int]] = {}
+        self._next_id = 0
+        # 컬렉션별 (항목 ID 리스트, 정규화된 임베딩 행렬) - 항목이 바뀌면 다시 만듦
+        self._matrices: Dict[str, tuple] = {}
+        # 컬렉션별 무효화 세대 - 검색과 저장 사이에 청크가 바뀌면 저장하지 않음
+        self._generations: Dict[str, int] = {}
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "invalidated": 0, "evicted": 0, "expired": 0}
+    
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+    
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+    
+    def _remove(self, entry_id: int) -> None:
+        """항목 제거 (잠금을 잡은 상태에서 호출)"""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for chunk_id in entry["chunk_ids"]:
+            key = (entry["collection"], chunk_id)
+            entry_ids = self._by_chunk.get(key)
+            if entry_ids is not None:
+                entry_ids.discard(entry_id)
+                if not entry_ids:
+                    del self._by_chunk[key]
+        self._matrices.pop(entry["collection"], None)
+    
+    def _matrix(self, collection: str):
+        """컬렉션의 (항목 ID 리스트, 임베딩 행렬) (잠금을 잡은 상태에서 호출)"""
+        cached = self._matrices.get(collection)
+        if cached is None:
+            entry_ids = [entry_id for entry_id, entry in self._entries.items() if entry["collection"] == collection]
+            vectors = (
+                np.stack([self._entries[entry_id]["embedding"] for entry_id in entry_ids])
+                if entry_ids else None
+            )
+            cached = (entry_ids, vectors)
+            self._matrices[collection] = cached
+        return cached
+    
+    def lookup(self, collection: str, query_embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        비슷한 질문의 답변 조회
+        
+        Args:
+            collection: 컬렉션 이름
+            query_embedding: 쿼리 임베딩 벡터
+            
+        Returns:
+            캐시 항목 (question, response, sources, chunk_ids, similarity) 또는 None
+        """
+        query = self._unit(query_embedding)
+        now = time.time()
+        with self._lock:
+            entry_ids, vectors = self._matrix(collection)
+            if vectors is None or vectors.shape[1] != query.shape[0]:
+                self._counters["misses"] += 1
+                return None
+            
+            similarities = vectors @ query
+            for index in np.argsort(-similarities):
+                similarity = float(similarities[index])
+                if similarity < self.similarity_threshold:
+                    break
+                entry_id = entry_ids[index]
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                if self._expired(entry, now):
+                    self._remove(entry_id)
+                    self._counters["expired"] += 1
+                    continue
+                self._entries.move_to_end(entry_id)
+                self._counters["hits"] += 1
+                return {
+                    "question": entry["question"],
+                    "response": entry["response"],
+                    "sources": entry["sources"],
+                    "chunk_ids": list(entry["chunk_ids"]),
+                    "similarity": similarity,
+                }
+            
+            self._counters["misses"] += 1
+            return None
+    
+    def generation(self, collection: str) -> int:
+        """컬렉션의 현재 무효화 세대 (검색 전에 읽어 store()에 전달)"""
+        with self._lock:
+            return self._generations.get(collection, 0)
+    
+    def store(
+        self,
+        collection: str,
+        question: str,
+        query_embedding: List[float],
+        response: str,
+        sources: List[Dict[str, Any]],
+        chunk_ids: List[str],
+        generation: Optional[int] = None
+    ) -> bool:
+        """
+        답변 저장
+        
+        Args:
+            collection: 컬렉션 이름
+            question: 질문
+            query_embedding: 쿼리 임베딩 벡터
+            response: LLM 답변
+            sources: 소스 정보 리스트
+            chunk_ids: 답변에 사용한 청크 ID 리스트 (무효화 기준)
+            generation: 검색 전에 읽은 generation() 값 (그 사이 무효화가 있었으면 저장하지 않음)
+            
+        Returns:
+            저장 여부
+        """
+        with self._lock:
+            if generation is not None and generation != self._generations.get(collection, 0):
+                return False
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "collection": collection,
+                "question": question,
+                "embedding": self._unit(query_embedding),
+                "response": response,
+                "sources": sources,
+                "chunk_ids": list(dict.fromkeys(chunk_ids)),
+                "created_at": time.time(),
+            }
+            for chunk_id in self._entries[entry_id]["chunk_ids"]:
+                self._by_chunk.setdefault((collection, chunk_id), set()).add(entry_id)
+            self._matrices.pop(collection, None)
+            self._counters["stores"] += 1
+            
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self._counters["evicted"] += 1
+            return True
+    
+    def invalidate_chunks(self, collection: str, chunk_ids: Optional[List[str]] = None) -> int:
+        """
+        청크를 인용한 답변 제거
+        
+        Args:
+            collection: 컬렉션 이름
+            chunk_ids: 변경된 청크 ID 리스트 (None이면 컬렉션의 모든 답변)
+            
+        Returns:
+            제거한 항목 수
+        """
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            if chunk_ids is None:
+                entry_ids = {entry_id for entry_id, entry in self._entries.items() if entry["collection"] == collection}
+            else:
+                entry_ids = set()
+                for chunk_id in chunk_ids:
+                    entry_ids |= self._by_chunk.get((collection, chunk_id), set())
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+            self._counters["invalidated"] += len(entry_ids)
+        if entry_ids:
+            logger.info(f"[SemanticAnswerCache] 답변 {len(entry_ids)}개 무효화 - 컬렉션 {collection}")
+        return len(entry_ids)
+    
+    def clear(self) -> None:
+        """모든 항목 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._by_chunk.clear()
+            self._matrices.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 통계
+        
+        Returns:
+            통계 딕셔너리 (entries, hits, misses, hit_rate, stores, invalidated, evicted, expired, 설정값)
+        """
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "similarity_threshold": self.similarity_threshold,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+            }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """
+    프로세스 공용 답변 캐시 (처음 호출 시 생성하고 청크 변경 리스너로 등록)
+    
+    Returns:
+        답변 캐시 (answer_cache_enabled가 꺼져 있으면 None)
+    """
+    global _answer_cache
+    if not settings.answer_cache_enabled:
+        return None
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = SemanticAnswerCache(
+                similarity_threshold=settings.answer_cache_similarity_threshold,
+                ttl_seconds=settings.answer_cache_ttl_seconds,
+                max_entries=settings.answer_cache_max_entries
+            )
+            add_chunk_change_listener(_answer_cache.invalidate_chunks)
+        return _answer_cache
@@ -0,0 +1,77 @@
+"""
+비동기 RAG 경로의 동시성 제한
+CPU 바운드 작업(쿼리 임베딩, 검색)은 크기가 정해진 스레드 풀에서, LLM 호출은 세마포어로
+동시 호출 수를 제한하여 이벤트 루프를 막지 않고 여러 채팅을 동시에 처리
+"""
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Callable, Any
+from app.config import settings
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+# 이벤트 루프별 LLM 세마포어 (세마포어는 생성된 루프에서만 사용 가능)
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """
+    작업 종류별 스레드 풀 반환 (처음 호출 시 생성)
+    
+    Args:
+        kind: "embedding" 또는 "search"
+        
+    Returns:
+        ThreadPoolExecutor
+    """
+    with _executors_lock:
+        executor = _executors.get(kind)
+        if executor is None:
+            max_workers = settings.embedding_max_workers if kind == "embedding" else settings.search_max_workers
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"rag-{kind}")
+            _executors[kind] = executor
+        return executor
+
+
+async def run_in_executor(kind: str, func: Callable, *args) -> Any:
+    """
+    함수를 작업 종류별 스레드 풀에서 실행하고 결과를 기다림
+    
+    Args:
+        kind: "embedding" 또는 "search"
+        func: 실행할 함수
+        *args: 함수 인자
+        
+    Returns:
+        함수 반환값
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(kind), func, *args)
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore: Optional[asyncio.Semaphore] = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        _llm_semaphores[loop] = semaphore
+    return semaphore
+
+
+@asynccontextmanager
+async def llm_slot():
+    """LLM 호출 동시 실행 수 제한 (settings.llm_max_concurrency)"""
+    async with _get_llm_semaphore():
+        yield
+
+
+def shutdown_executors() -> None:
+    """스레드 풀 종료 (애플리케이션 종료 시)"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False)
+        _executors.clear()
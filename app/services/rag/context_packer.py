@@ -0,0 +1,189 @@
+"""
+컨텍스트 패킹 모듈
+검색된 청크를 LLM 모델 토크나이저 기준 토큰 예산 안에서 관련도 순으로 채우고,
+같은 문서의 인접 청크는 하나로 합쳐 청크 사이 오버랩과 반복되는 헤더 경로를 제거
+"""
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 오버랩으로 인정할 최소 길이 (짧은 우연 일치는 제거하지 않음)
+MIN_OVERLAP_CHARS = 16
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding():
+    """
+    tiktoken 인코딩 로드 (처음 한 번만 시도)
+    
+    context_tokenizer가 없으면 llm_model에 맞는 인코딩을, 모델을 모르면 cl100k_base를 사용합니다.
+    tiktoken이 없거나 인코딩 파일을 받을 수 없으면 None (근사 계산 사용).
+    """
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if _encoding_loaded:
+            return _encoding
+        try:
+            import tiktoken
+            
+            if settings.context_tokenizer:
+                _encoding = tiktoken.get_encoding(settings.context_tokenizer)
+            else:
+                try:
+                    _encoding = tiktoken.encoding_for_model(settings.llm_model)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+            logger.info(f"[ContextPacker] 토크나이저: {_encoding.name}")
+        except Exception as e:
+            _encoding = None
+            logger.warning(f"[ContextPacker] tiktoken 인코딩을 불러오지 못해 근사 토큰 수를 사용합니다: {e}")
+        _encoding_loaded = True
+        return _encoding
+
+
+def tokenizer_name() -> str:
+    """사용 중인 토크나이저 이름 (근사 계산이면 "approx")"""
+    encoding = _load_encoding()
+    return encoding.name if encoding is not None else "approx"
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트 토큰 수
+    
+    Args:
+        text: 텍스트
+        
+    Returns:
+        토큰 수 (tiktoken이 없으면 ASCII 4자당 1토큰, 그 외 문자 1자당 1토큰으로 근사)
+    """
+    if not text:
+        return 0
+    encoding = _load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _split_header(doc: Dict[str, Any]) -> Tuple[Optional[str], str]:
+    """
+    청크 앞에 붙은 헤더 경로("# 제목 > ## 부제목")와 본문 분리
+    
+    Returns:
+        (헤더 경로 또는 None, 본문)
+    """
+    content = doc.get("content") or ""
+    if doc.get("metadata", {}).get("header_path") and content.startswith("#"):
+        header, separator, body = content.partition("\n\n")
+        if separator:
+            return header, body
+    return None, content
+
+
+def _strip_overlap(previous: str, following: str) -> str:
+    """following 앞부분이 previous 끝부분과 겹치면 겹치는 부분 제거"""
+    limit = min(len(previous), len(following), settings.chunk_overlap * 2)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(following[:size]):
+            return following[size:].lstrip()
+    return following
+
+
+def _render_group(pieces: List[Dict[str, Any]]) -> str:
+    """
+    같은 문서의 청크들을 chunk_index 순으로 이어 붙인 텍스트
+    
+    chunk_index가 연속인 청크는 오버랩을 제거하고, 헤더 경로는 바뀔 때만 한 번 넣습니다.
+    """
+    parts = []
+    previous_index = None
+    previous_header = None
+    previous_body = None
+    for piece in sorted(pieces, key=lambda p: (p["chunk_index"] is None, p["chunk_index"] or 0)):
+        body = piece["body"]
+        adjacent = (
+            previous_index is not None
+            and piece["chunk_index"] is not None
+            and piece["chunk_index"] == previous_index + 1
+        )
+        if adjacent:
+            body = _strip_overlap(previous_body, body)
+        if piece["header"] and piece["header"] != previous_header:
+            parts.append(piece["header"])
+        if body:
+            parts.append(body)
+        previous_index = piece["chunk_index"]
+        previous_header = piece["header"]
+        previous_body = piece["body"]
+    return "\n\n".join(parts)
+
+
+def pack_context(
+    documents: List[Dict[str, Any]],
+    token_budget: Optional[int] = None
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    검색된 청크를 토큰 예산 안에서 관련도 순으로 채워 컨텍스트 구성
+    
+    청크를 하나씩 추가할 때 그 문서의 합친 텍스트가 늘어나는 토큰 수로 비용을 계산하므로,
+    이미 들어간 청크와 인접한 청크는 오버랩/헤더만큼 싸게 들어갑니다. 예산을 넘는 청크는 건너뛰고
+    다음 청크를 시도하되, 가장 관련도 높은 청크는 예산을 넘어도 항상 포함합니다.
+    
+    Args:
+        documents: 검색 결과 (관련도 순, content, metadata, id)
+        token_budget: 컨텍스트 토큰 예산 (기본값: settings.context_token_budget, 0이면 제한 없음)
+        
+    Returns:
+        (컨텍스트 텍스트, 포함된 청크 리스트(관련도 순), 통계 딕셔너리)
+    """
+    token_budget = settings.context_token_budget if token_budget is None else token_budget
+    
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    group_tokens: Dict[str, int] = {}
+    used_documents = []
+    used_tokens = 0
+    seen_ids = set()
+    
+    for doc in documents:
+        doc_id = doc.get("id")
+        if doc_id is not None and doc_id in seen_ids:
+            continue
+        metadata = doc.get("metadata") or {}
+        key = metadata.get("document_id") or doc_id or str(id(doc))
+        header, body = _split_header(doc)
+        piece = {"chunk_index": metadata.get("chunk_index"), "header": header, "body": body}
+        
+        trial = groups.get(key, []) + [piece]
+        trial_tokens = count_tokens(_render_group(trial))
+        delta = trial_tokens - group_tokens.get(key, 0)
+        if token_budget > 0 and used_documents and used_tokens + delta > token_budget:
+            continue
+        
+        groups[key] = trial
+        group_tokens[key] = trial_tokens
+        used_tokens += delta
+        used_documents.append(doc)
+        if doc_id is not None:
+            seen_ids.add(doc_id)
+    
+    context = "\n\n".join(_render_group(pieces) for pieces in groups.values())
+    tokens_before = count_tokens("\n\n".join(doc.get("content") or "" for doc in documents))
+    tokens_after = count_tokens(context)
+    stats = {
+        "chunks": len(documents),
+        "chunks_used": len(used_documents),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(tokens_before - tokens_after, 0),
+        "token_budget": token_budget,
+        "tokenizer": tokenizer_name(),
+    }
+    return context, used_documents, stats
@@ -0,0 +1,117 @@
+"""
+질의 의도 라우터
+쿼리 임베딩과 경로별 예시 질문 중심 벡터의 코사인 유사도로 경로를 골라,
+인사말/신원 질문은 검색과 문서 컨텍스트 없이 답변하고 문서 질문만 RAG 경로로 보냄
+"""
+import logging
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 검색 + 문서 컨텍스트를 사용하는 기본 경로
+ROUTE_DOCS = "docs"
+
+# 경로별 지연 시간 통계에 보관할 최근 요청 수
+LATENCY_WINDOW = 1000
+
+
+class IntentRouter:
+    """
+    최근접 중심 벡터 의도 분류기
+    
+    경로마다 예시 질문(intent_prototypes) 임베딩의 평균 방향을 중심 벡터로 두고,
+    가장 가까운 경로가 docs가 아니고 유사도가 intent_router_threshold 이상일 때만 그 경로를 사용합니다.
+    중심 벡터는 처음 분류할 때 한 번 계산합니다.
+    """
+    
+    def __init__(
+        self,
+        embedder: Any,
+        prototypes: Optional[Dict[str, List[str]]] = None,
+        threshold: Optional[float] = None
+    ):
+        """
+        라우터 초기화
+        
+        Args:
+            embedder: 쿼리 임베딩과 같은 임베딩 생성기
+            prototypes: 경로별 예시 질문 (기본값: settings.intent_prototypes, docs 경로 포함)
+            threshold: 문서 외 경로를 사용할 최소 코사인 유사도 (기본값: settings.intent_router_threshold)
+        """
+        self.embedder = embedder
+        self.prototypes = prototypes or settings.intent_prototypes
+        self.threshold = settings.intent_router_threshold if threshold is None else threshold
+        if ROUTE_DOCS not in self.prototypes:
+            raise ValueError(f"intent_prototypes must include the '{ROUTE_DOCS}' route")
+        
+        self._routes: List[str] = list(self.prototypes)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {route: deque(maxlen=LATENCY_WINDOW) for route in self._routes}
+        self._counts: Dict[str, int] = {route: 0 for route in self._routes}
+    
+    def load_centroids(self) -> np.ndarray:
+        """경로별 중심 벡터 (처음 호출 시 예시 질문을 임베딩하여 계산, 워밍업에서 미리 호출)"""
+        with self._lock:
+            if self._centroids is None:
+                centroids = []
+                for route in self._routes:
+                    embeddings = np.asarray(
+                        self.embedder.embed_texts(self.prototypes[route], instruction="query:"), dtype=np.float32
+                    )
+                    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+                    centroid = embeddings.mean(axis=0)
+                    centroids.append(centroid / max(float(np.linalg.norm(centroid)), 1e-12))
+                self._centroids = np.stack(centroids)
+                logger.info(f"[IntentRouter] 중심 벡터 {len(self._routes)}개 계산 ({', '.join(self._routes)})")
+            return self._centroids
+    
+    def classify(self, query_embedding: List[float]) -> Tuple[str, float]:
+        """
+        쿼리 임베딩의 경로 분류
+        
+        Args:
+            query_embedding: 쿼리 임베딩 벡터
+            
+        Returns:
+            (경로 이름, 가장 가까운 중심 벡터와의 코사인 유사도)
+            - 유사도가 threshold 미만이면 docs
+        """
+        centroids = self.load_centroids()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarities = centroids @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        route = self._routes[best] if similarity >= self.threshold else ROUTE_DOCS
+        return route, similarity
+    
+    def record(self, route: str, seconds: float) -> None:
+        """경로별 요청 수와 응답 시간 기록"""
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+            self._latencies.setdefault(route, deque(maxlen=LATENCY_WINDOW)).append(seconds * 1000)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        라우터 통계
+        
+        Returns:
+            통계 딕셔너리 (threshold, 경로별 count와 최근 요청의 p50_ms/p95_ms/mean_ms)
+        """
+        with self._lock:
+            routes = {}
+            for route, count in self._counts.items():
+                latencies = np.asarray(self._latencies.get(route) or [0.0])
+                routes[route] = {
+                    "count": count,
+                    "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                    "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+                    "mean_ms": round(float(latencies.mean()), 2),
+                }
+            return {"threshold": self.threshold, "routes": routes}
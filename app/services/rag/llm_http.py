@@ -0,0 +1,309 @@
+"""
+LLM HTTP 클라이언트 모듈
+OpenAI 호환 API 호출용 공유 httpx 클라이언트 (연결 풀/keep-alive, 연결/읽기 타임아웃,
+429/5xx 지터 백오프 재시도, 지연 시 헤지 요청, 호출별 지연 시간/재시도 지표)
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 응답 상태 코드
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 재시도할 전송 오류 (요청이 서버에 도달하지 않은 경우만, 읽기 타임아웃은 헤지 요청으로 대응)
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+# 지연 시간 통계에 보관할 최근 호출 수
+LATENCY_WINDOW = 1000
+
+
+class LLMCallMetrics:
+    """LLM HTTP 호출 지표 (호출 수, 상태 코드별 응답 수, 재시도/헤지 횟수, 응답 헤더까지의 지연 시간)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        """지표 초기화"""
+        with self._lock:
+            self._counters = {"calls": 0, "errors": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+            self._statuses: Dict[str, int] = {}
+            self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+    
+    def increment(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+    
+    def record_call(self, seconds: float, status: Optional[int]) -> None:
+        """논리적 호출 하나(재시도/헤지 포함)의 결과 기록 (status가 None이면 전송 오류)"""
+        with self._lock:
+            self._counters["calls"] += 1
+            if status is None:
+                self._counters["errors"] += 1
+            key = str(status) if status is not None else "error"
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            self._latencies.append(seconds * 1000)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        지표 조회
+        
+        Returns:
+            통계 딕셔너리 (calls, errors, retries, hedges, hedge_wins, statuses, 최근 호출의 p50/p95/p99 ms)
+        """
+        with self._lock:
+            latencies = np.asarray(self._latencies or [0.0])
+            return {
+                **self._counters,
+                "statuses": dict(self._statuses),
+                "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+                "latency_p99_ms": round(float(np.percentile(latencies, 99)), 2),
+            }
+
+
+llm_call_metrics = LLMCallMetrics()
+
+
+def _backoff_seconds(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    재시도 대기 시간 (full jitter 지수 백오프, 서버가 Retry-After를 보내면 그 값 사용)
+    
+    Args:
+        attempt: 0부터 시작하는 재시도 번호
+        response: 재시도할 응답 (선택적)
+        
+    Returns:
+        대기 시간 (초, llm_retry_backoff_max 이하)
+    """
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = 0.0
+        return min(max(seconds, 0.0), settings.llm_retry_backoff_max)
+    cap = min(settings.llm_retry_backoff_max, settings.llm_retry_backoff_base * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+class RetryTransport(httpx.BaseTransport):
+    """429/5xx 응답과 연결 오류를 지터 백오프로 재시도하는 동기 전송 계층 (헤지 요청은 비동기 전송만 지원)"""
+    
+    def __init__(self, transport: httpx.BaseTransport, max_retries: int, metrics: LLMCallMetrics):
+        self._transport = transport
+        self.max_retries = max_retries
+        self.metrics = metrics
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.max_retries:
+                    self.metrics.record_call(time.perf_counter() - started, None)
+                    raise
+                delay = _backoff_seconds(attempt)
+                logger.warning(f"[LLMHttp] 연결 오류 {type(e).__name__}, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+            except Exception:
+                self.metrics.record_call(time.perf_counter() - started, None)
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    self.metrics.record_call(time.perf_counter() - started, response.status_code)
+                    return response
+                delay = _backoff_seconds(attempt, response)
+                response.close()
+                logger.warning(
+                    f"[LLMHttp] 상태 코드 {response.status_code}, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries})"
+                )
+            self.metrics.increment("retries")
+            time.sleep(delay)
+            attempt += 1
+    
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    RetryTransport의 비동기 버전 + 헤지 요청
+    
+    hedge_after가 있으면 첫 요청이 그 시간 안에 응답 헤더를 받지 못할 때 같은 요청을 하나 더 보내고
+    먼저 도착한 응답을 사용합니다 (늦은 쪽은 취소). 꼬리 지연(p99)을 줄이는 대신 그만큼 호출이 늘어납니다.
+    """
+    
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int,
+        metrics: LLMCallMetrics,
+        hedge_after: Optional[float] = None
+    ):
+        self._transport = transport
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self.hedge_after = hedge_after
+    
+    async def _send_hedged(self, request: httpx.Request) -> httpx.Response:
+        """첫 요청이 hedge_after 안에 응답하지 않으면 두 번째 요청을 보내고 먼저 성공한 응답 반환"""
+        primary = asyncio.ensure_future(self._transport.handle_async_request(request))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after)
+            if done:
+                return primary.result()
+            
+            self.metrics.increment("hedges")
+            logger.info(f"[LLMHttp] {self.hedge_after * 1000:.0f}ms 안에 응답이 없어 헤지 요청 전송")
+            hedge = asyncio.ensure_future(self._transport.handle_async_request(request))
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in (primary, hedge) if task in done and task.exception() is None]
+                if succeeded:
+                    for task in succeeded[1:]:
+                        await task.result().aclose()
+                    if succeeded[0] is hedge:
+                        self.metrics.increment("hedge_wins")
+                    return succeeded[0].result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            # 진 요청(또는 호출이 취소된 경우 진행 중인 요청) 취소
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_late_response)
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                if self.hedge_after:
+                    response = await self._send_hedged(request)
+                else:
+                    response = await self._transport.handle_async_request(request)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.max_retries:
+                    self.metrics.record_call(time.perf_counter() - started, None)
+                    raise
+                delay = _backoff_seconds(attempt)
+                logger.warning(f"[LLMHttp] 연결 오류 {type(e).__name__}, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+            except Exception:
+                self.metrics.record_call(time.perf_counter() - started, None)
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    self.metrics.record_call(time.perf_counter() - started, response.status_code)
+                    return response
+                delay = _backoff_seconds(attempt, response)
+                await response.aclose()
+                logger.warning(
+                    f"[LLMHttp] 상태 코드 {response.status_code}, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries})"
+                )
+            self.metrics.increment("retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _close_late_response(task: asyncio.Task) -> None:
+    """헤지 경쟁에서 진 요청이 취소 전에 응답을 받았으면 연결 반환"""
+    if task.cancelled() or task.exception() is not None:
+        return
+    asyncio.ensure_future(task.result().aclose())
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_http_max_connections,
+        max_keepalive_connections=settings.llm_http_max_keepalive,
+        keepalive_expiry=settings.llm_http_keepalive_expiry
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.llm_connect_timeout,
+        read=settings.llm_read_timeout,
+        write=settings.llm_connect_timeout,
+        pool=settings.llm_pool_timeout
+    )
+
+
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_clients_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    프로세스 공용 동기 LLM HTTP 클라이언트 (처음 호출 시 생성)
+    
+    Returns:
+        연결 풀/타임아웃/재시도가 설정된 httpx.Client
+    """
+    global _http_client
+    with _clients_lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(limits=_limits())
+            _http_client = httpx.Client(
+                transport=RetryTransport(transport, settings.llm_max_retries, llm_call_metrics),
+                timeout=_timeout()
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    프로세스 공용 비동기 LLM HTTP 클라이언트 (처음 호출 시 생성, llm_hedge_after_ms가 있으면 헤지 요청 사용)
+    
+    Returns:
+        연결 풀/타임아웃/재시도가 설정된 httpx.AsyncClient
+    """
+    global _async_http_client
+    with _clients_lock:
+        if _async_http_client is None:
+            hedge_after = settings.llm_hedge_after_ms / 1000 if settings.llm_hedge_after_ms else None
+            transport = httpx.AsyncHTTPTransport(limits=_limits())
+            _async_http_client = httpx.AsyncClient(
+                transport=AsyncRetryTransport(transport, settings.llm_max_retries, llm_call_metrics, hedge_after),
+                timeout=_timeout()
+            )
+        return _async_http_client
+
+
+async def close_http_clients() -> None:
+    """공용 LLM HTTP 클라이언트 종료 (애플리케이션 종료 시)"""
+    global _http_client, _async_http_client
+    with _clients_lock:
+        http_client, async_http_client = _http_client, _async_http_client
+        _http_client = _async_http_client = None
+    if http_client is not None:
+        http_client.close()
+    if async_http_client is not None:
+        await async_http_client.aclose()
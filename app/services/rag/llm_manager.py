@@ -5,8 +5,10 @@ LangChain ChatOpenAI 초기화 및 설정
 import os
 import logging
 from typing import Any, Optional
+import openai
 from langchain_openai import ChatOpenAI
 from app.config import settings
+from .llm_http import get_http_client, get_async_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,9 @@ def create_llm(llm: Optional[Any] = None) -> ChatOpenAI:
     """
     LangChain ChatOpenAI 인스턴스 생성
     
+    OpenAI SDK 클라이언트는 공용 httpx 클라이언트(연결 풀, 타임아웃, 재시도, 헤지 요청)를 사용하며,
+    재시도는 전송 계층에서 처리하므로 SDK 자체 재시도는 끕니다.
+    
     Args:
         llm: 기존 LLM 인스턴스 (있으면 재사용)
         
@@ -46,11 +51,22 @@ def create_llm(llm: Optional[Any] = None) -> ChatOpenAI:
             "(USE_GMS=true, GMS_API_KEY, GMS_BASE_URL) in .env file"
         )
     
+    # 공용 HTTP 클라이언트를 사용하는 OpenAI SDK 클라이언트
+    client_params = {
+        "api_key": api_key,
+        "base_url": base_url,
+        "max_retries": 0,
+    }
+    sync_client = openai.OpenAI(**client_params, http_client=get_http_client())
+    async_client = openai.AsyncOpenAI(**client_params, http_client=get_async_http_client())
+    
     # ChatOpenAI 초기화 (GMS 지원)
     llm_kwargs = {
         "model": settings.llm_model,
         "temperature": settings.llm_temperature,
         "openai_api_key": api_key,
+        "client": sync_client.chat.completions,
+        "async_client": async_client.chat.completions,
     }
     
     # base_url이 설정되어 있으면 (GMS 사용 시) 추가
@@ -0,0 +1,73 @@
+"""
+관련도 게이트 모듈
+검색 결과의 거리 분포로 LLM에 보낼 청크 수를 질의마다 정함
+(인사말처럼 관련 문서가 없는 질의는 0개, 한 청크만 관련 있으면 그 청크만)
+"""
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import settings
+from .context_packer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def gate_documents(
+    documents: List[Dict[str, Any]],
+    similarity_threshold: Optional[float] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    거리 기준으로 관련도 낮은 청크 제외 (검색 순서 유지)
+    
+    1. 절대 기준: 거리가 similarity_threshold보다 큰 청크 제외
+    2. 상대 기준: 가장 가까운 청크보다 relevance_gap 넘게 먼 청크 제외 (단, 거리가 있는 청크 relevance_min_k개까지는 유지)
+    3. 최대 relevance_max_k개
+    
+    어휘 검색에서만 나온 청크(distance 없음)는 벡터 거리를 통과한 청크가 있을 때만 함께 남기고,
+    모든 청크에 거리가 없으면(식별자 질의) 거리 기준 없이 개수만 제한합니다.
+    
+    Args:
+        documents: 검색 결과 (관련도 순, distance)
+        similarity_threshold: 최대 거리 (기본값: settings.similarity_threshold)
+        
+    Returns:
+        (남긴 청크 리스트, 통계 딕셔너리)
+    """
+    similarity_threshold = settings.similarity_threshold if similarity_threshold is None else similarity_threshold
+    max_k = settings.relevance_max_k
+    
+    distances = [doc.get("distance") for doc in documents if doc.get("distance") is not None]
+    passing = [distance for distance in distances if distance <= similarity_threshold]
+    if not distances:
+        kept = list(documents)
+    elif not passing:
+        kept = []
+    else:
+        best = min(passing)
+        kept = []
+        kept_vector = 0  # 최소 개수는 거리가 있는 청크만 셈 (어휘 전용 청크가 자리를 차지하지 않도록)
+        for doc in documents:
+            distance = doc.get("distance")
+            if distance is None:
+                kept.append(doc)
+            elif distance <= similarity_threshold and (
+                distance - best <= settings.relevance_gap or kept_vector < settings.relevance_min_k
+            ):
+                kept.append(doc)
+                kept_vector += 1
+    if max_k > 0:
+        kept = kept[:max_k]
+    
+    kept_ids = {id(doc) for doc in kept}
+    dropped = [doc for doc in documents if id(doc) not in kept_ids]
+    stats = {
+        "candidates": len(documents),
+        "kept": len(kept),
+        "best_distance": round(min(distances), 4) if distances else None,
+        "tokens_dropped": sum(count_tokens(doc.get("content") or "") for doc in dropped),
+    }
+    logger.info(
+        f"[RelevanceGate] 청크 {stats['candidates']}개 -> {stats['kept']}개 "
+        f"(최소 거리 {stats['best_distance']}), 제외한 토큰 {stats['tokens_dropped']}"
+    )
+    return kept, stats
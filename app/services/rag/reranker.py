@@ -0,0 +1,152 @@
+"""
+재순위화 모듈
+넓게 검색한 후보 청크를 cross-encoder로 (질의, 청크) 쌍마다 점수를 매겨 상위 청크만 LLM에 전달
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from sentence_transformers import CrossEncoder
+
+from app.config import settings
+from .context_packer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    cross-encoder 재순위화 (CPU 배치 점수 계산 + 쌍 점수 LRU 캐시)
+    
+    캐시 키는 (질의, 청크 ID, 청크 본문 해시)이므로 같은 ID의 청크가 다시 수집되어
+    본문이 바뀌면 새로 점수를 매깁니다.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = None,
+        device: str = None,
+        batch_size: int = None,
+        cache_size: int = None
+    ):
+        """
+        cross-encoder 모델 초기화
+        
+        Args:
+            model_name: cross-encoder 모델 이름 (기본값: settings.rerank_model)
+            device: 사용할 디바이스 (기본값: settings.rerank_device)
+            batch_size: 한 번에 점수를 매길 쌍 수 (기본값: settings.rerank_batch_size)
+            cache_size: 쌍 점수 캐시 크기 (기본값: settings.rerank_cache_size, 0이면 캐시 안 함)
+        """
+        self.model_name = model_name or settings.rerank_model
+        self.device = device or settings.rerank_device
+        self.batch_size = batch_size or settings.rerank_batch_size
+        self.cache_size = settings.rerank_cache_size if cache_size is None else cache_size
+        self._cache: "OrderedDict[Tuple[str, str, int], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        print(f"Loading rerank model: {self.model_name} on {self.device}")
+        self.model = CrossEncoder(self.model_name, device=self.device, max_length=settings.rerank_max_length)
+        print("Rerank model loaded successfully")
+    
+    @staticmethod
+    def _cache_key(query: str, doc: Dict[str, Any]) -> Tuple[str, str, int]:
+        content = doc.get("content") or ""
+        return (query, str(doc.get("id")), hash(content))
+    
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> Tuple[List[float], int]:
+        """
+        (질의, 청크) 쌍 점수 계산 (캐시에 없는 쌍만 한 번의 배치 호출로 계산)
+        
+        Args:
+            query: 검색 쿼리
+            documents: 후보 청크 리스트 (content, id)
+            
+        Returns:
+            (청크 순서대로 점수 리스트, 캐시 적중 수)
+        """
+        keys = [self._cache_key(query, doc) for doc in documents]
+        scores: List[Optional[float]] = [None] * len(documents)
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+        
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            pairs = [(query, documents[i].get("content") or "") for i in missing]
+            predicted = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            with self._lock:
+                for i, value in zip(missing, predicted):
+                    scores[i] = float(value)
+                    if self.cache_size > 0:
+                        self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return scores, len(documents) - len(missing)
+    
+    def rerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_n: Optional[int] = None,
+        score_threshold: Optional[float] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        후보 청크를 점수 순으로 정렬하고 상위 청크만 남김
+        
+        Args:
+            query: 검색 쿼리
+            documents: 후보 청크 리스트
+            top_n: 남길 청크 수 (기본값: settings.rerank_top_n, 0이면 개수 제한 없음)
+            score_threshold: 이 점수 미만 청크 제외 (기본값: settings.rerank_score_threshold, None이면 사용 안 함)
+            
+        Returns:
+            (남긴 청크 리스트(rerank_score 포함, 점수 내림차순), 통계 딕셔너리)
+            - 점수 기준을 넘는 청크가 없어도 가장 높은 청크 하나는 남깁니다.
+        """
+        top_n = settings.rerank_top_n if top_n is None else top_n
+        score_threshold = settings.rerank_score_threshold if score_threshold is None else score_threshold
+        
+        started = time.perf_counter()
+        if not documents:
+            return [], {"candidates": 0, "kept": 0, "cache_hits": 0, "latency_ms": 0.0, "tokens_dropped": 0}
+        
+        scores, cache_hits = self.score(query, documents)
+        ranked = sorted(
+            ({**doc, "rerank_score": score} for doc, score in zip(documents, scores)),
+            key=lambda doc: doc["rerank_score"],
+            reverse=True
+        )
+        kept = ranked
+        if score_threshold is not None:
+            kept = [doc for doc in kept if doc["rerank_score"] >= score_threshold] or kept[:1]
+        if top_n > 0:
+            kept = kept[:top_n]
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        kept_ids = {id(doc) for doc in kept}
+        stats = {
+            "candidates": len(documents),
+            "kept": len(kept),
+            "cache_hits": cache_hits,
+            "latency_ms": round(latency_ms, 2),
+            "tokens_dropped": sum(
+                count_tokens(doc.get("content") or "") for doc in ranked if id(doc) not in kept_ids
+            ),
+        }
+        logger.info(
+            f"[CrossEncoderReranker] 후보 {stats['candidates']}개 -> {stats['kept']}개, "
+            f"{stats['latency_ms']:.1f}ms (캐시 적중 {cache_hits}개), 제외한 토큰 {stats['tokens_dropped']}"
+        )
+        return kept, stats
+    
+    def clear_cache(self) -> None:
+        """쌍 점수 캐시 삭제"""
+        with self._lock:
+            self._cache.clear()
@@ -2,24 +2,42 @@
 RAG 서비스 - 메인 모듈
 벡터 검색 및 LLM 응답 생성 통합 서비스
 """
+import copy
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple, Iterator, AsyncIterator
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from app.config import settings
 from app.ingest.embedder import Embedder
-from app.vectorstore.chroma import ChromaVectorStore
+from app.vectorstore.factory import VectorStore
+from app.vectorstore.lexical import is_identifier_query
 from .llm_manager import create_llm
 from .conversation import HistorySummarizer
+from .concurrency import run_in_executor, llm_slot
+from .answer_cache import get_answer_cache
+from .context_packer import pack_context
+from .reranker import CrossEncoderReranker
+from .relevance_gate import gate_documents
+from .intent_router import IntentRouter, ROUTE_DOCS
+from .singleflight import Singleflight, normalize_question, history_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# LLM이 빈 응답을 반환했을 때 대신 보내는 안내 문구 (답변 캐시에 저장하지 않음)
+EMPTY_RESPONSE_MESSAGE = "죄송하지만 응답을 생성하는 데 문제가 발생했습니다. 서버 로그를 확인해주세요."
+
+# 의도 라우터가 문서 외 경로(인사말 등)로 보낸 질문에 사용하는 짧은 시스템 프롬프트
+DIRECT_SYSTEM_PROMPT = """당신은 공식 문서 도우미 챗봇입니다.
+- 사용자의 질문 언어에 맞춰 짧고 자연스럽게 답변하세요.
+- 공식 문서에 관한 질문을 하도록 친절하게 유도해주세요."""
+
 
 class RAGService:
     """RAG 서비스 - 벡터 검색 + LLM 응답 생성"""
     
     def __init__(
         self,
-        vectorstore: Optional[ChromaVectorStore] = None,
+        vectorstore: Optional[VectorStore] = None,
         embedder: Optional[Embedder] = None,
         llm: Optional[Any] = None
     ):
@@ -39,38 +57,157 @@ class RAGService:
         
         # 히스토리 요약기 초기화
         self.history_summarizer = HistorySummarizer(self.llm)
+        
+        # 의미 기반 답변 캐시 (비활성화 시 None)
+        self.answer_cache = get_answer_cache()
+        
+        # cross-encoder 재순위화 (비활성화 시 None)
+        self.reranker = CrossEncoderReranker() if settings.rerank_enabled else None
+        
+        # 질의 의도 라우터 (비활성화 시 None)
+        self.intent_router = (
+            IntentRouter(embedder) if settings.intent_router_enabled and embedder is not None else None
+        )
+        
+        # 동시에 들어온 같은 요청의 LLM 호출 합치기 (비활성화 시 None, 비동기 경로에서만 사용)
+        self.singleflight = Singleflight() if settings.singleflight_enabled else None
+    
+    def with_vectorstore(self, vectorstore: VectorStore) -> "RAGService":
+        """
+        LLM/임베딩 모델을 공유하고 벡터 스토어만 바꾼 서비스 (요청별 컬렉션용)
+        
+        Args:
+            vectorstore: 사용할 벡터 스토어
+            
+        Returns:
+            새 서비스 인스턴스
+        """
+        service = copy.copy(self)
+        service.vectorstore = vectorstore
+        return service
     
     def retrieve_documents(
         self,
         query: str,
-        top_k: int = None
+        top_k: int = None,
+        retrieval_mode: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
-        벡터 검색으로 관련 문서 검색
+        관련 문서 검색 (벡터 검색 + BM25 어휘 검색을 RRF로 결합)
+        
+        hybrid_search_enabled가 꺼져 있으면 벡터 검색만, 식별자 형태의 질의는
+        어휘 검색 결과가 있으면 임베딩 없이 어휘 검색만 사용합니다.
+        retrieval_mode가 "two_stage"이면 벡터 검색을 문서 중심 벡터로 고른
+        상위 문서의 청크로 제한합니다.
         
         Args:
             query: 검색 쿼리
             top_k: 반환할 문서 수
+            retrieval_mode: "flat" 또는 "two_stage" (기본값: settings.retrieval_mode)
+            query_embedding: 미리 계산한 쿼리 임베딩 (선택적, 없으면 생성)
             
         Returns:
-            검색 결과 리스트
+            검색 결과 리스트 (content, metadata, distance, id, 결합 시 score)
+            
+        Raises:
+            ValueError: 벡터 스토어/임베딩 모델이 없거나 retrieval_mode가 잘못된 경우
         """
+        top_k, retrieval_mode = self._check_retrieval_args(top_k, retrieval_mode)
+        
+        lexical_results = self._lexical_fast_path(query, top_k)
+        if lexical_results is not None:
+            return lexical_results
+        
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
+        return self._search_with_embedding(query, query_embedding, top_k, retrieval_mode)
+    
+    def _check_retrieval_args(self, top_k: Optional[int], retrieval_mode: Optional[str]) -> Tuple[int, str]:
+        """검색 인자 기본값 적용 및 검증"""
         if not self.vectorstore or not self.embedder:
             raise ValueError("Vectorstore and embedder must be initialized")
         
         top_k = top_k or settings.retrieval_top_k
+        retrieval_mode = retrieval_mode or settings.retrieval_mode
+        if retrieval_mode not in ("flat", "two_stage"):
+            raise ValueError(f"Unsupported retrieval_mode: {retrieval_mode} (expected 'flat' or 'two_stage')")
+        if retrieval_mode == "two_stage" and self.vectorstore.centroid_index is None:
+            # 중심 벡터 색인을 쓰지 않는 경우 (설정으로 끔, 인덱스 서버 모드/멀티 워커)
+            retrieval_mode = "flat"
+        return top_k, retrieval_mode
+    
+    def _use_lexical(self) -> bool:
+        return settings.hybrid_search_enabled and self.vectorstore.lexical_index is not None
+    
+    def _lexical_fast_path(self, query: str, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        식별자 형태 질의(API 이름, 설정 키, 오류 코드)는 임베딩 없이 어휘 검색만 사용
         
-        # 쿼리 임베딩 생성
+        Returns:
+            어휘 검색 결과 (해당하지 않거나 결과가 없으면 None)
+        """
+        if not (self._use_lexical() and settings.lexical_fast_path_enabled and is_identifier_query(query)):
+            return None
+        lexical_hits = self.vectorstore.lexical_search(query, n_results=top_k)
+        if not lexical_hits:
+            return None
+        logger.info(f"[retrieve_documents] 식별자 질의 - 어휘 검색 결과 {len(lexical_hits)}개 사용")
+        return self._load_lexical_hits(lexical_hits)
+    
+    def _embed_query(self, query: str) -> List[float]:
+        """쿼리 임베딩 생성 (multilingual-e5는 "query: " prefix 사용)"""
         query_text = query
         if "multilingual-e5" in settings.embedding_model.lower():
             query_text = f"query: {query}"
+        return self.embedder.embed_text(query_text)
+    
+    def _search_with_embedding(
+        self,
+        query: str,
+        query_embedding: List[float],
+        top_k: int,
+        retrieval_mode: str
+    ) -> List[Dict[str, Any]]:
+        """
+        쿼리 임베딩으로 벡터 검색 후 (하이브리드 검색이면) 어휘 검색 결과와 결합
+        
+        MMR을 켜면 top_k x mmr_oversample개 후보를 만든 뒤 MMR로 top_k개를 고릅니다.
         
-        query_embedding = self.embedder.embed_text(query_text)
+        Args:
+            query: 검색 쿼리 (어휘 검색용)
+            query_embedding: 쿼리 임베딩 벡터
+            top_k: 반환할 문서 수
+            retrieval_mode: "flat" 또는 "two_stage"
+            
+        Returns:
+            검색 결과 리스트
+        """
+        use_lexical = self._use_lexical()
+        final_top_k = top_k
+        if settings.mmr_enabled:
+            top_k = top_k * settings.mmr_oversample
+        
+        # 하이브리드 검색이면 결합 전에 후보를 넉넉히 가져옴
+        n_candidates = top_k * settings.hybrid_candidate_multiplier if use_lexical else top_k
+        
+        # 2단계 검색: 중심 벡터로 상위 문서를 고른 뒤 그 문서의 청크만 검색
+        filter_metadata = None
+        if retrieval_mode == "two_stage":
+            document_ids = self.vectorstore.search_documents(
+                [query_embedding],
+                n_documents=settings.two_stage_top_documents
+            )[0]
+            if document_ids:
+                filter_metadata = {"document_id": {"$in": document_ids}}
+            else:
+                logger.info("[retrieve_documents] 문서 중심 벡터 색인이 비어 있어 전체 청크 검색")
         
         # 벡터 검색
         search_results = self.vectorstore.search(
             query_embedding=query_embedding,
-            n_results=top_k
+            n_results=n_candidates,
+            filter_metadata=filter_metadata
         )
         
         # 결과 포맷팅
@@ -88,40 +225,178 @@ class RAGService:
                 "id": doc_id
             })
         
+        if use_lexical:
+            lexical_hits = self.vectorstore.lexical_search(query, n_results=n_candidates)
+            results = self._fuse_results(results, lexical_hits, top_k)
+        
+        if settings.mmr_enabled:
+            selected = self.vectorstore.mmr_indices(
+                query_embedding, [result["id"] for result in results], final_top_k
+            )
+            results = [results[i] for i in selected]
         return results
     
-    def generate_response(
+    def _load_lexical_hits(self, lexical_hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        어휘 검색 결과의 본문/메타데이터를 조회하여 검색 결과 형식으로 변환
+        
+        Args:
+            lexical_hits: 어휘 검색 결과 (id, score)
+            
+        Returns:
+            검색 결과 리스트 (벡터 거리가 없으므로 distance는 None, score는 BM25 점수)
+        """
+        chunks = self.vectorstore.get_by_ids([hit["id"] for hit in lexical_hits])
+        scores = {hit["id"]: hit["score"] for hit in lexical_hits}
+        return [
+            {
+                "content": chunk.get("text", ""),
+                "metadata": chunk.get("metadata", {}),
+                "distance": None,
+                "id": chunk["id"],
+                "score": scores[chunk["id"]]
+            }
+            for chunk in chunks
+        ]
+    
+    def _fuse_results(
+        self,
+        vector_results: List[Dict[str, Any]],
+        lexical_hits: List[Dict[str, Any]],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        벡터/어휘 검색 결과를 Reciprocal Rank Fusion으로 결합
+        
+        Args:
+            vector_results: 벡터 검색 결과 (거리 오름차순)
+            lexical_hits: 어휘 검색 결과 (점수 내림차순)
+            top_k: 반환할 결과 수
+            
+        Returns:
+            결합된 검색 결과 리스트 (score는 RRF 점수)
+        """
+        rrf_scores: Dict[str, float] = {}
+        for ranked_ids in (
+            [result["id"] for result in vector_results],
+            [hit["id"] for hit in lexical_hits]
+        ):
+            for rank, doc_id in enumerate(ranked_ids, start=1):
+                rrf_scores[doc_id] = rrf_scores.get(doc_id, 0.0) + 1.0 / (settings.rrf_k + rank)
+        
+        top_ids = sorted(rrf_scores, key=rrf_scores.get, reverse=True)[:top_k]
+        
+        # 어휘 검색에서만 나온 청크는 본문을 따로 조회
+        by_id = {result["id"]: result for result in vector_results}
+        missing = [doc_id for doc_id in top_ids if doc_id not in by_id]
+        if missing:
+            for chunk in self.vectorstore.get_by_ids(missing):
+                by_id[chunk["id"]] = {
+                    "content": chunk.get("text", ""),
+                    "metadata": chunk.get("metadata", {}),
+                    "distance": None,
+                    "id": chunk["id"]
+                }
+        
+        fused = []
+        for doc_id in top_ids:
+            if doc_id in by_id:
+                fused.append({**by_id[doc_id], "score": rrf_scores[doc_id]})
+        return fused
+    
+    def _retrieve_context(
         self,
         question: str,
-        context_documents: Optional[List[Dict[str, Any]]] = None,
-        top_k: int = None,
-        similarity_threshold: Optional[float] = None,
+        top_k: Optional[int],
+        query_embedding: Optional[List[float]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        답변에 사용할 문서 검색 (재순위화를 켜면 후보를 넓게 검색한 뒤 상위 청크만 남김)
+        
+        relevance_gate_enabled이면 마지막에 거리 기준으로 관련도 낮은 청크를 제외합니다.
+        
+        Args:
+            question: 사용자 질문
+            top_k: 검색할 문서 수 (재순위화 시 후보 수의 하한)
+            query_embedding: 미리 계산한 쿼리 임베딩 (선택적)
+            similarity_threshold: 관련도 게이트 최대 거리 (기본값: settings.similarity_threshold)
+            
+        Returns:
+            (문서 리스트, 재순위화 통계 또는 None)
+        """
+        rerank_stats = None
+        if self.reranker is None:
+            documents = self.retrieve_documents(question, top_k=top_k, query_embedding=query_embedding)
+        else:
+            candidates = self.retrieve_documents(
+                question,
+                top_k=max(top_k or settings.retrieval_top_k, settings.rerank_candidates),
+                query_embedding=query_embedding
+            )
+            documents, rerank_stats = self.reranker.rerank(question, candidates)
+        if settings.relevance_gate_enabled:
+            documents, _ = gate_documents(documents, similarity_threshold)
+        return documents, rerank_stats
+    
+    async def _aretrieve_context(
+        self,
+        question: str,
+        top_k: Optional[int],
+        query_embedding: Optional[List[float]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """_retrieve_context의 비동기 버전 (cross-encoder 점수 계산은 임베딩 스레드 풀에서 실행)"""
+        rerank_stats = None
+        if self.reranker is None:
+            documents = await self.aretrieve_documents(question, top_k=top_k, query_embedding=query_embedding)
+        else:
+            candidates = await self.aretrieve_documents(
+                question,
+                top_k=max(top_k or settings.retrieval_top_k, settings.rerank_candidates),
+                query_embedding=query_embedding
+            )
+            documents, rerank_stats = await run_in_executor("embedding", self.reranker.rerank, question, candidates)
+        if settings.relevance_gate_enabled:
+            documents, _ = gate_documents(documents, similarity_threshold)
+        return documents, rerank_stats
+    
+    def _build_messages(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
         conversation_history: Optional[List[Dict[str, Any]]] = None
-    ) -> Dict[str, Any]:
+    ) -> Tuple[List[Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
         """
-        RAG 기반 응답 생성
+        검색된 문서와 대화 히스토리로 LLM 메시지 구성
+        
+        context_packing_enabled이면 토큰 예산 안에서 관련도 순으로 청크를 채우고
+        같은 문서의 인접 청크를 합쳐 오버랩과 반복되는 헤더 경로를 제거합니다.
         
         Args:
             question: 사용자 질문
-            context_documents: 컨텍스트 문서 (없으면 자동 검색)
-            top_k: 검색할 문서 수 (기본값: settings.retrieval_top_k)
-            similarity_threshold: (사용 안 함) LLM이 관련성을 판단하므로 이 파라미터는 무시됩니다.
+            context_documents: 컨텍스트 문서
             conversation_history: 이전 대화 히스토리 (선택적)
             
         Returns:
-            응답 딕셔너리 (response, sources, retrieved_docs)
+            (LangChain 메시지 리스트, 소스 정보 리스트, 컨텍스트 패킹 통계 또는 None)
         """
-        # 문서 검색 (없는 경우)
-        if context_documents is None:
-            context_documents = self.retrieve_documents(question, top_k=top_k)
-        
         # 컨텍스트 구성
         context_parts = []
         sources = []
+        context_stats = None
         has_documents = bool(context_documents)
         
         if context_documents:
-            # 모든 검색된 문서를 LLM에 전달 (필터링 없이)
+            if settings.context_packing_enabled:
+                packed_context, context_documents, context_stats = pack_context(context_documents)
+                context_parts.append(packed_context)
+                logger.info(
+                    f"[build_messages] 컨텍스트 패킹 - 청크 {context_stats['chunks_used']}/{context_stats['chunks']}개, "
+                    f"토큰 {context_stats['tokens_before']} -> {context_stats['tokens_after']}"
+                )
+            
+            # 검색된 문서를 LLM에 전달 (패킹을 끄면 필터링 없이 모두)
             for doc in context_documents:
                 content = doc["content"]
                 metadata = doc.get("metadata", {})
@@ -136,7 +411,8 @@ class RAGService:
                 sources.append(source_info)
                 
                 # 문서 내용만 컨텍스트에 추가
-                context_parts.append(content)
+                if context_stats is None:
+                    context_parts.append(content)
         
         context = "\n\n".join(context_parts) if context_parts else ""
         
@@ -186,140 +462,466 @@ class RAGService:
 답변:""")
         messages.append(user_message)
         
-        # LLM 호출
-        try:
-            logger.info(f"[generate_response] LLM 호출 시작 - 질문: {question[:50]}...")
-            logger.info(f"[generate_response] 메시지 구조 - 개수: {len(messages)}, 총 길이: {sum(len(str(msg.content)) for msg in messages if hasattr(msg, 'content'))} 문자")
-            
-            result = self.llm.invoke(messages)
+        return messages, sources, context_stats
+    
+    def _build_direct_messages(
+        self,
+        question: str,
+        conversation_history: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        문서 외 경로(인사말 등)용 LLM 메시지 구성 (짧은 시스템 프롬프트 + 히스토리 + 질문, 문서 컨텍스트 없음)
+        
+        Returns:
+            (LangChain 메시지 리스트, 빈 소스 리스트, None) - _build_messages와 같은 형식
+        """
+        messages = [SystemMessage(content=DIRECT_SYSTEM_PROMPT)]
+        messages.extend(self.history_summarizer.build_history_messages(conversation_history))
+        messages.append(HumanMessage(content=question))
+        return messages, [], None
+    
+    def _route_question(self, question: str, query_embedding: List[float]) -> str:
+        """의도 라우터로 질문 경로 결정"""
+        route, similarity = self.intent_router.classify(query_embedding)
+        logger.info(f"[intent_router] 경로 {route} (유사도 {similarity:.4f}) - 질문: {question[:50]}...")
+        return route
+    
+    def _routed(self, result: Dict[str, Any], route: Optional[str], started: float) -> Dict[str, Any]:
+        """응답 딕셔너리(또는 done 이벤트)에 경로를 넣고 경로별 응답 시간 기록 (라우터를 끄면 경로는 None)"""
+        result["route"] = route
+        if route is not None:
+            self.intent_router.record(route, time.perf_counter() - started)
+        return result
+    
+    @staticmethod
+    def _canned_result(route: str) -> Dict[str, Any]:
+        """LLM 호출 없이 보내는 경로별 고정 답변"""
+        return {
+            "response": settings.intent_canned_responses[route],
+            "sources": [],
+            "retrieved_docs": [],
+            "cached": False,
+            "context": None,
+            "rerank": None
+        }
+    
+    def _parse_llm_result(self, result: Any, messages: List[Any]) -> str:
+        """
+        LLM 호출 결과에서 응답 텍스트 추출 (빈 응답이면 원인을 로그로 남기고 안내 문구 반환)
+        
+        Args:
+            result: llm.invoke/ainvoke 결과
+            messages: LLM에 보낸 메시지 리스트 (로그용)
             
-            # 즉시 결과 확인
-            logger.info(f"[generate_response] LLM 호출 완료 - result 타입: {type(result)}")
-            if hasattr(result, 'content'):
-                logger.info(f"[generate_response] result.content 길이: {len(result.content) if result.content else 0} 문자")
+        Returns:
+            응답 텍스트
+        """
+        # 즉시 결과 확인
+        logger.info(f"[generate_response] LLM 호출 완료 - result 타입: {type(result)}")
+        if hasattr(result, 'content'):
+            logger.info(f"[generate_response] result.content 길이: {len(result.content) if result.content else 0} 문자")
+        
+        # 응답이 객체인 경우 content 속성 추출, 아니면 문자열로 변환
+        if isinstance(result, AIMessage):
+            response = result.content
+        elif hasattr(result, 'content'):
+            response = result.content
+        elif hasattr(result, 'text'):
+            response = result.text
+        else:
+            response = str(result)
+        
+        # 빈 응답 체크 및 로깅
+        if not response or (isinstance(response, str) and response.strip() == ""):
+            logger.error(f"[generate_response] ⚠️ LLM이 빈 응답을 반환했습니다!")
+            logger.error(f"[generate_response] result 타입: {type(result)}, result: {result}")
             
-            # 응답이 객체인 경우 content 속성 추출, 아니면 문자열로 변환
+            # AIMessage인지 확인
             if isinstance(result, AIMessage):
-                response = result.content
-            elif hasattr(result, 'content'):
-                response = result.content
-            elif hasattr(result, 'text'):
-                response = result.text
-            else:
-                response = str(result)
-            
-            # 빈 응답 체크 및 로깅
-            if not response or (isinstance(response, str) and response.strip() == ""):
-                logger.error(f"[generate_response] ⚠️ LLM이 빈 응답을 반환했습니다!")
-                logger.error(f"[generate_response] result 타입: {type(result)}, result: {result}")
+                logger.error(f"[generate_response] ✅ AIMessage 블록 진입 확인")
+                logger.error(f"[generate_response]   - content: '{result.content}'")
+                logger.error(f"[generate_response]   - content 타입: {type(result.content)}")
+                logger.error(f"[generate_response]   - content 길이: {len(result.content) if result.content else 0}")
+                
+                # AIMessage의 모든 속성 확인
+                all_attrs = [attr for attr in dir(result) if not attr.startswith('_')]
+                logger.error(f"[generate_response]   - AIMessage 속성 목록: {all_attrs}")
+                
+                # response_metadata 확인 (다양한 방법 시도)
+                # 방법 1: hasattr로 확인
+                has_metadata_attr = hasattr(result, 'response_metadata')
+                logger.error(f"[generate_response]   - hasattr(response_metadata): {has_metadata_attr}")
                 
-                # AIMessage인지 확인
-                if isinstance(result, AIMessage):
-                    logger.error(f"[generate_response] ✅ AIMessage 블록 진입 확인")
-                    logger.error(f"[generate_response]   - content: '{result.content}'")
-                    logger.error(f"[generate_response]   - content 타입: {type(result.content)}")
-                    logger.error(f"[generate_response]   - content 길이: {len(result.content) if result.content else 0}")
-                    
-                    # AIMessage의 모든 속성 확인
-                    all_attrs = [attr for attr in dir(result) if not attr.startswith('_')]
-                    logger.error(f"[generate_response]   - AIMessage 속성 목록: {all_attrs}")
-                    
-                    # response_metadata 확인 (다양한 방법 시도)
-                    # 방법 1: hasattr로 확인
-                    has_metadata_attr = hasattr(result, 'response_metadata')
-                    logger.error(f"[generate_response]   - hasattr(response_metadata): {has_metadata_attr}")
-                    
-                    # 방법 2: 직접 접근 시도
-                    try:
-                        if has_metadata_attr:
-                            metadata = result.response_metadata
-                            logger.error(f"[generate_response] ✅ response_metadata 직접 접근 성공")
-                            logger.error(f"[generate_response]   - response_metadata 타입: {type(metadata)}")
-                            logger.error(f"[generate_response]   - response_metadata 상세: {metadata}")
+                # 방법 2: 직접 접근 시도
+                try:
+                    if has_metadata_attr:
+                        metadata = result.response_metadata
+                        logger.error(f"[generate_response] ✅ response_metadata 직접 접근 성공")
+                        logger.error(f"[generate_response]   - response_metadata 타입: {type(metadata)}")
+                        logger.error(f"[generate_response]   - response_metadata 상세: {metadata}")
+                        
+                        if isinstance(metadata, dict):
+                            for key, value in metadata.items():
+                                logger.error(f"[generate_response]     - {key}: {value}")
                             
-                            if isinstance(metadata, dict):
-                                for key, value in metadata.items():
-                                    logger.error(f"[generate_response]     - {key}: {value}")
-                                
-                                # 핵심 정보 확인
-                                finish_reason = metadata.get('finish_reason')
-                                token_usage = metadata.get('token_usage', {})
-                                logger.error(f"[generate_response]   - finish_reason: {finish_reason}")
-                                logger.error(f"[generate_response]   - token_usage: {token_usage}")
-                                
-                                if finish_reason == "length":
-                                    logger.error(f"[generate_response] ⚠️ 토큰 제한으로 응답이 잘렸습니다!")
-                                    logger.error(f"[generate_response]   - max_completion_tokens 설정: {settings.max_tokens}")
-                                    if isinstance(token_usage, dict):
-                                        completion_tokens = token_usage.get('completion_tokens', 0)
-                                        logger.error(f"[generate_response]   - completion_tokens: {completion_tokens}")
-                                elif finish_reason:
-                                    logger.error(f"[generate_response]   - finish_reason: {finish_reason} (정상 종료 아님)")
-                    except AttributeError as e:
-                        logger.error(f"[generate_response] ⚠️ response_metadata 접근 실패: {e}")
-                    except Exception as e:
-                        logger.error(f"[generate_response] ⚠️ response_metadata 확인 중 오류: {e}", exc_info=True)
-                    
-                    # 방법 3: getattr로 확인
-                    metadata_via_getattr = getattr(result, 'response_metadata', None)
-                    if metadata_via_getattr is not None:
-                        logger.error(f"[generate_response] ✅ getattr로 response_metadata 발견: {metadata_via_getattr}")
-                    else:
-                        logger.error(f"[generate_response] ⚠️ getattr로도 response_metadata를 찾을 수 없습니다!")
-                    
-                    # usage_metadata 확인
-                    usage_metadata = getattr(result, 'usage_metadata', None)
-                    if usage_metadata is not None:
-                        logger.error(f"[generate_response]   - usage_metadata: {usage_metadata}")
-                    
-                    # 추가: id 속성 확인 (LangChain AIMessage)
-                    msg_id = getattr(result, 'id', None)
-                    if msg_id:
-                        logger.error(f"[generate_response]   - message id: {msg_id}")
-                    
-                    # 추가: response_metadata를 dict로 직접 접근 시도
-                    if isinstance(result, dict):
-                        logger.error(f"[generate_response]   - result가 dict 타입입니다: {result}")
-                    elif hasattr(result, '__dict__'):
-                        result_dict = result.__dict__
-                        logger.error(f"[generate_response]   - result.__dict__: {list(result_dict.keys())}")
-                        if 'response_metadata' in result_dict:
-                            logger.error(f"[generate_response] ✅ __dict__에 response_metadata 발견: {result_dict['response_metadata']}")
+                            # 핵심 정보 확인
+                            finish_reason = metadata.get('finish_reason')
+                            token_usage = metadata.get('token_usage', {})
+                            logger.error(f"[generate_response]   - finish_reason: {finish_reason}")
+                            logger.error(f"[generate_response]   - token_usage: {token_usage}")
+                            
+                            if finish_reason == "length":
+                                logger.error(f"[generate_response] ⚠️ 토큰 제한으로 응답이 잘렸습니다!")
+                                logger.error(f"[generate_response]   - max_completion_tokens 설정: {settings.max_tokens}")
+                                if isinstance(token_usage, dict):
+                                    completion_tokens = token_usage.get('completion_tokens', 0)
+                                    logger.error(f"[generate_response]   - completion_tokens: {completion_tokens}")
+                            elif finish_reason:
+                                logger.error(f"[generate_response]   - finish_reason: {finish_reason} (정상 종료 아님)")
+                except AttributeError as e:
+                    logger.error(f"[generate_response] ⚠️ response_metadata 접근 실패: {e}")
+                except Exception as e:
+                    logger.error(f"[generate_response] ⚠️ response_metadata 확인 중 오류: {e}", exc_info=True)
+                
+                # 방법 3: getattr로 확인
+                metadata_via_getattr = getattr(result, 'response_metadata', None)
+                if metadata_via_getattr is not None:
+                    logger.error(f"[generate_response] ✅ getattr로 response_metadata 발견: {metadata_via_getattr}")
                 else:
-                    logger.error(f"[generate_response] ⚠️ result가 AIMessage 타입이 아닙니다. 타입: {type(result)}")
+                    logger.error(f"[generate_response] ⚠️ getattr로도 response_metadata를 찾을 수 없습니다!")
                 
-                # LLM 설정 확인
-                model_kwargs_val = getattr(self.llm, 'model_kwargs', None)
-                logger.error(f"[generate_response] LLM 설정:")
-                logger.error(f"[generate_response]   - model_kwargs: {model_kwargs_val}")
-                logger.error(f"[generate_response]   - model_name: {getattr(self.llm, 'model_name', None)}")
-                logger.error(f"[generate_response]   - openai_api_base: {getattr(self.llm, 'openai_api_base', None)}")
+                # usage_metadata 확인
+                usage_metadata = getattr(result, 'usage_metadata', None)
+                if usage_metadata is not None:
+                    logger.error(f"[generate_response]   - usage_metadata: {usage_metadata}")
                 
-                # 메시지 길이 확인
-                total_length = sum(len(str(msg.content)) for msg in messages if hasattr(msg, 'content'))
-                logger.error(f"[generate_response] 총 메시지 길이: {total_length} 문자, 메시지 개수: {len(messages)}")
+                # 추가: id 속성 확인 (LangChain AIMessage)
+                msg_id = getattr(result, 'id', None)
+                if msg_id:
+                    logger.error(f"[generate_response]   - message id: {msg_id}")
                 
-                response = "죄송하지만 응답을 생성하는 데 문제가 발생했습니다. 서버 로그를 확인해주세요."
+                # 추가: response_metadata를 dict로 직접 접근 시도
+                if isinstance(result, dict):
+                    logger.error(f"[generate_response]   - result가 dict 타입입니다: {result}")
+                elif hasattr(result, '__dict__'):
+                    result_dict = result.__dict__
+                    logger.error(f"[generate_response]   - result.__dict__: {list(result_dict.keys())}")
+                    if 'response_metadata' in result_dict:
+                        logger.error(f"[generate_response] ✅ __dict__에 response_metadata 발견: {result_dict['response_metadata']}")
+            else:
+                logger.error(f"[generate_response] ⚠️ result가 AIMessage 타입이 아닙니다. 타입: {type(result)}")
+            
+            # LLM 설정 확인
+            model_kwargs_val = getattr(self.llm, 'model_kwargs', None)
+            logger.error(f"[generate_response] LLM 설정:")
+            logger.error(f"[generate_response]   - model_kwargs: {model_kwargs_val}")
+            logger.error(f"[generate_response]   - model_name: {getattr(self.llm, 'model_name', None)}")
+            logger.error(f"[generate_response]   - openai_api_base: {getattr(self.llm, 'openai_api_base', None)}")
+            
+            # 메시지 길이 확인
+            total_length = sum(len(str(msg.content)) for msg in messages if hasattr(msg, 'content'))
+            logger.error(f"[generate_response] 총 메시지 길이: {total_length} 문자, 메시지 개수: {len(messages)}")
+            
+            response = EMPTY_RESPONSE_MESSAGE
+        
+        return response
+    
+    def _cache_lookup(self, question: str, query_embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        답변 캐시 조회
+        
+        Returns:
+            캐시된 응답 딕셔너리 (response, sources, retrieved_docs, cached, context, rerank) 또는 None
+        """
+        hit = self.answer_cache.lookup(self.vectorstore.collection_name, query_embedding)
+        if hit is None:
+            return None
+        logger.info(
+            f"[answer_cache] 캐시 적중 - 유사도 {hit['similarity']:.4f}, "
+            f"질문: {question[:50]}... (저장된 질문: {hit['question'][:50]}...)"
+        )
+        return {
+            "response": hit["response"],
+            "sources": hit["sources"],
+            "retrieved_docs": [],
+            "cached": True,
+            "context": None,
+            "rerank": None
+        }
+    
+    def _cache_store(self, plan: Dict[str, Any], question: str, response: str) -> None:
+        """
+        답변을 캐시에 저장 (캐시를 쓰지 않는 요청, 안내 문구나 근거 문서가 없는 답변은 청크 변경으로 무효화할 수 없으므로 제외)
+        
+        Args:
+            plan: 요청 처리 계획 (_plan_request)
+            question: 사용자 질문
+            response: LLM 응답
+        """
+        if plan["generation"] is None or response == EMPTY_RESPONSE_MESSAGE or not plan["context_documents"]:
+            return
+        self.answer_cache.store(
+            self.vectorstore.collection_name,
+            question,
+            plan["query_embedding"],
+            response,
+            plan["sources"],
+            [doc["id"] for doc in plan["context_documents"]],
+            generation=plan["generation"]
+        )
+    
+    def _needs_query_embedding(self, context_documents: Optional[List[Dict[str, Any]]], use_cache: bool) -> bool:
+        """의도 라우팅이나 답변 캐시 조회에 쿼리 임베딩이 필요한지 (계산한 임베딩은 검색에 재사용)"""
+        if context_documents is not None:
+            return False
+        return self.intent_router is not None or (use_cache and self.answer_cache is not None)
+    
+    def _plan_request(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
+        query_embedding: Optional[List[float]],
+        use_cache: bool
+    ) -> Dict[str, Any]:
+        """
+        의도 라우팅과 답변 캐시 조회로 요청 처리 계획 작성 (동기/비동기, 일반/스트리밍 응답 공통)
+        
+        Args:
+            question: 사용자 질문
+            context_documents: 직접 넘긴 컨텍스트 문서 (있으면 라우팅/캐시 조회 생략)
+            query_embedding: 쿼리 임베딩 (_needs_query_embedding이 False면 None)
+            use_cache: 의미 기반 답변 캐시 사용 여부
+            
+        Returns:
+            계획 딕셔너리
+            - route: 의도 라우터 경로 (라우터를 끄면 None)
+            - use_documents: 문서 검색과 문서 프롬프트를 사용할지 여부
+            - result: LLM 호출 없이 바로 보낼 응답 (고정 답변 또는 캐시 적중, 없으면 None)
+            - generation: 답변 캐시 저장 시 사용할 세대 (캐시에 저장하지 않으면 None)
+            - query_embedding, context_documents, rerank_stats, timings
+        """
+        plan = {
+            "route": None,
+            "use_documents": True,
+            "result": None,
+            "generation": None,
+            "query_embedding": query_embedding,
+            "context_documents": context_documents,
+            "rerank_stats": None,
+            "timings": {}
+        }
+        
+        if self.intent_router is not None and context_documents is None:
+            plan["route"] = self._route_question(question, query_embedding)
+            plan["use_documents"] = plan["route"] == ROUTE_DOCS
+            if plan["route"] in settings.intent_canned_responses:
+                plan["result"] = self._canned_result(plan["route"])
+                return plan
+        
+        if plan["use_documents"] and use_cache and self.answer_cache is not None and context_documents is None:
+            plan["result"] = self._cache_lookup(question, query_embedding)
+            if plan["result"] is None:
+                plan["generation"] = self.answer_cache.generation(self.vectorstore.collection_name)
+        return plan
+    
+    def _prepare(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
+        top_k: Optional[int],
+        similarity_threshold: Optional[float],
+        conversation_history: Optional[List[Dict[str, Any]]],
+        use_cache: bool,
+        started: float
+    ) -> Dict[str, Any]:
+        """
+        LLM 호출 전 단계 실행 (라우팅, 캐시 조회, 검색, 메시지 구성) - generate_response/stream_response 공통
+        
+        Returns:
+            _plan_request의 계획 딕셔너리 (result가 없으면 messages, sources, context_stats 추가)
+        """
+        query_embedding = None
+        if self._needs_query_embedding(context_documents, use_cache):
+            query_embedding = self._embed_query(question)
+        plan = self._plan_request(question, context_documents, query_embedding, use_cache)
+        if plan["result"] is not None:
+            return plan
+        
+        if not plan["use_documents"]:
+            # 문서 외 경로는 검색 없이 짧은 프롬프트 사용
+            plan["messages"], plan["sources"], plan["context_stats"] = self._build_direct_messages(
+                question, conversation_history
+            )
+            return plan
+        
+        if plan["context_documents"] is None:
+            plan["context_documents"], plan["rerank_stats"] = self._retrieve_context(
+                question, top_k, query_embedding, similarity_threshold
+            )
+            plan["timings"]["retrieve"] = time.perf_counter() - started
+        plan["messages"], plan["sources"], plan["context_stats"] = self._build_messages(
+            question, plan["context_documents"], conversation_history
+        )
+        return plan
+    
+    async def _aprepare(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
+        top_k: Optional[int],
+        similarity_threshold: Optional[float],
+        conversation_history: Optional[List[Dict[str, Any]]],
+        use_cache: bool,
+        started: float
+    ) -> Dict[str, Any]:
+        """_prepare의 비동기 버전 (임베딩/검색/메시지 구성은 제한된 스레드 풀에서 실행)"""
+        query_embedding = None
+        if self._needs_query_embedding(context_documents, use_cache):
+            query_embedding = await run_in_executor("embedding", self._embed_query, question)
+        plan = self._plan_request(question, context_documents, query_embedding, use_cache)
+        if plan["result"] is not None:
+            return plan
+        
+        if not plan["use_documents"]:
+            plan["messages"], plan["sources"], plan["context_stats"] = await self._abuild_direct_messages(
+                question, conversation_history
+            )
+            return plan
+        
+        if plan["context_documents"] is None:
+            plan["context_documents"], plan["rerank_stats"] = await self._aretrieve_context(
+                question, top_k, query_embedding, similarity_threshold
+            )
+            plan["timings"]["retrieve"] = time.perf_counter() - started
+        plan["messages"], plan["sources"], plan["context_stats"] = await self._abuild_messages(
+            question, plan["context_documents"], conversation_history
+        )
+        return plan
+    
+    def _plan_result(
+        self,
+        plan: Dict[str, Any],
+        question: str,
+        response: str,
+        started: float,
+        store: bool = True
+    ) -> Dict[str, Any]:
+        """
+        LLM 응답으로 응답 딕셔너리 구성 (store이면 답변 캐시에 저장)
+        
+        Returns:
+            응답 딕셔너리 (response, sources, retrieved_docs, cached, context, rerank, route)
+        """
+        if store:
+            self._cache_store(plan, question, response)
+        return self._routed({
+            "response": response,
+            "sources": plan["sources"],
+            "retrieved_docs": plan["context_documents"] or [],
+            "cached": False,
+            "context": plan["context_stats"],
+            "rerank": plan["rerank_stats"]
+        }, plan["route"], started)
+    
+    def _plan_done_events(
+        self,
+        plan: Dict[str, Any],
+        question: str,
+        parts: List[str],
+        started: float,
+        log_name: str
+    ) -> List[Dict[str, Any]]:
+        """
+        스트리밍이 끝난 뒤 보낼 이벤트 구성 (빈 응답이면 안내 문구 토큰, 답변 캐시 저장, done)
+        
+        Args:
+            plan: 요청 처리 계획
+            question: 사용자 질문
+            parts: 받은 토큰 리스트
+            started: 요청 시작 시각
+            log_name: 로그에 표시할 메서드 이름
+            
+        Returns:
+            이벤트 리스트
+        """
+        events = []
+        response = "".join(parts)
+        if not response.strip():
+            logger.error(f"[{log_name}] ⚠️ LLM이 빈 응답을 반환했습니다!")
+            response = EMPTY_RESPONSE_MESSAGE
+            events.append({"type": "token", "content": response})
+        
+        self._cache_store(plan, question, response)
+        
+        timings = plan["timings"]
+        timings["total"] = time.perf_counter() - started
+        logger.info(f"[{log_name}] 스트리밍 완료 - {len(response)} 문자, {timings['total']:.3f}초")
+        events.append(self._routed({
+            "type": "done",
+            "response": response,
+            "cached": False,
+            "context": plan["context_stats"],
+            "rerank": plan["rerank_stats"],
+            "timings": {name: round(value, 3) for name, value in timings.items()}
+        }, plan["route"], started))
+        return events
+    
+    def generate_response(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]] = None,
+        top_k: int = None,
+        similarity_threshold: Optional[float] = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        RAG 기반 응답 생성
+        
+        Args:
+            question: 사용자 질문
+            context_documents: 컨텍스트 문서 (없으면 자동 검색)
+            top_k: 검색할 문서 수 (기본값: settings.retrieval_top_k)
+            similarity_threshold: 관련도 게이트 최대 거리 (기본값: settings.similarity_threshold,
+                relevance_gate_enabled일 때만 사용)
+            conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (이전 대화 없이 이해되는 독립 질문일 때만 True,
+                context_documents를 직접 넘기면 무시)
                 
+        Returns:
+            응답 딕셔너리 (response, sources, retrieved_docs, cached, context, rerank, route)
+        """
+        started = time.perf_counter()
+        
+        # 라우팅, 답변 캐시 조회, 검색(재순위화 포함), 메시지 구성
+        plan = self._prepare(
+            question, context_documents, top_k, similarity_threshold, conversation_history, use_cache, started
+        )
+        if plan["result"] is not None:
+            return self._routed(plan["result"], plan["route"], started)
+        messages = plan["messages"]
+        
+        # LLM 호출
+        try:
+            logger.info(f"[generate_response] LLM 호출 시작 - 질문: {question[:50]}...")
+            logger.info(f"[generate_response] 메시지 구조 - 개수: {len(messages)}, 총 길이: {sum(len(str(msg.content)) for msg in messages if hasattr(msg, 'content'))} 문자")
+            
+            result = self.llm.invoke(messages)
+            
+            response = self._parse_llm_result(result, messages)
+        
         except Exception as e:
             logger.error(f"[generate_response] LLM 호출 오류: {str(e)}", exc_info=True)
-            return {
-                "response": f"오류가 발생했습니다: {str(e)}",
-                "sources": sources,
-                "retrieved_docs": context_documents or []
-            }
+            return self._plan_result(plan, question, f"오류가 발생했습니다: {str(e)}", started, store=False)
         
-        return {
-            "response": response,
-            "sources": sources,
-            "retrieved_docs": context_documents or []
-        }
+        return self._plan_result(plan, question, response, started)
     
     def chat(
         self,
         question: str,
         top_k: int = None,
-        conversation_history: Optional[List[Dict[str, Any]]] = None
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
     ) -> Dict[str, Any]:
         """
         챗봇 인터페이스 - 질문을 받아 응답 반환
@@ -328,9 +930,305 @@ class RAGService:
             question: 사용자 질문
             top_k: 검색할 문서 수
             conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (독립 질문일 때만 True)
             
         Returns:
             응답 딕셔너리
         """
-        return self.generate_response(question, top_k=top_k, conversation_history=conversation_history)
-
+        return self.generate_response(
+            question,
+            top_k=top_k,
+            conversation_history=conversation_history,
+            use_cache=use_cache
+        )
+    
+    def stream_response(
+        self,
+        question: str,
+        top_k: int = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        RAG 기반 응답을 토큰 단위로 스트리밍 (LangChain llm.stream 사용)
+        
+        검색이 끝나면 소스를 먼저 보내고, LLM 토큰을 도착하는 대로 보낸 뒤
+        마지막에 전체 응답과 단계별 소요 시간을 보냅니다.
+        답변 캐시에 적중하면 저장된 답변을 토큰 이벤트 하나로 보냅니다.
+        
+        Args:
+            question: 사용자 질문
+            top_k: 검색할 문서 수 (기본값: settings.retrieval_top_k)
+            conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (독립 질문일 때만 True)
+            
+        Yields:
+            이벤트 딕셔너리
+            - {"type": "sources", "sources": [...]}
+            - {"type": "token", "content": "..."}
+            - {"type": "done", "response": "...", "cached": bool, "context": {...}, "rerank": {...}, "route": "...", "timings": {...}}
+            - {"type": "error", "message": "..."} (LLM 호출 오류 시, 이후 done은 보내지 않음)
+        """
+        started = time.perf_counter()
+        plan = self._prepare(question, None, top_k, None, conversation_history, use_cache, started)
+        if plan["result"] is not None:
+            yield from self._result_stream_events(plan["result"], plan["route"], started)
+            return
+        yield {"type": "sources", "sources": plan["sources"]}
+        
+        timings = plan["timings"]
+        parts = []
+        try:
+            logger.info(f"[stream_response] LLM 스트리밍 시작 - 질문: {question[:50]}...")
+            for chunk in self.llm.stream(plan["messages"]):
+                content = chunk.content if hasattr(chunk, "content") else str(chunk)
+                if not content:
+                    continue
+                if not parts:
+                    timings["first_token"] = time.perf_counter() - started
+                    logger.info(f"[stream_response] 첫 토큰까지 {timings['first_token']:.3f}초")
+                parts.append(content)
+                yield {"type": "token", "content": content}
+        except Exception as e:
+            logger.error(f"[stream_response] LLM 스트리밍 오류: {str(e)}", exc_info=True)
+            yield {"type": "error", "message": f"오류가 발생했습니다: {str(e)}"}
+            return
+        
+        yield from self._plan_done_events(plan, question, parts, started, "stream_response")
+    
+    def _result_stream_events(
+        self,
+        result: Dict[str, Any],
+        route: Optional[str],
+        started: float
+    ) -> List[Dict[str, Any]]:
+        """캐시된 답변/고정 답변을 스트리밍 이벤트 형식으로 변환 (sources, token 하나, done)"""
+        return [
+            {"type": "sources", "sources": result["sources"]},
+            {"type": "token", "content": result["response"]},
+            self._routed({
+                "type": "done",
+                "response": result["response"],
+                "cached": result["cached"],
+                "context": None,
+                "rerank": None,
+                "timings": {"total": round(time.perf_counter() - started, 3)}
+            }, route, started),
+        ]
+    
+    async def aretrieve_documents(
+        self,
+        query: str,
+        top_k: int = None,
+        retrieval_mode: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        retrieve_documents의 비동기 버전
+        
+        쿼리 임베딩은 임베딩 스레드 풀에서, 어휘/벡터 검색은 검색 스레드 풀에서 실행하여
+        이벤트 루프를 막지 않습니다.
+        
+        Args:
+            query: 검색 쿼리
+            top_k: 반환할 문서 수
+            retrieval_mode: "flat" 또는 "two_stage" (기본값: settings.retrieval_mode)
+            query_embedding: 미리 계산한 쿼리 임베딩 (선택적, 없으면 생성)
+            
+        Returns:
+            검색 결과 리스트
+        """
+        top_k, retrieval_mode = self._check_retrieval_args(top_k, retrieval_mode)
+        
+        lexical_results = await run_in_executor("search", self._lexical_fast_path, query, top_k)
+        if lexical_results is not None:
+            return lexical_results
+        
+        if query_embedding is None:
+            query_embedding = await run_in_executor("embedding", self._embed_query, query)
+        return await run_in_executor(
+            "search", self._search_with_embedding, query, query_embedding, top_k, retrieval_mode
+        )
+    
+    async def _abuild_messages(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
+        conversation_history: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """_build_messages를 검색 스레드 풀에서 실행 (리스트 히스토리는 요약 LLM 호출이 동기로 일어날 수 있음)"""
+        return await run_in_executor("search", self._build_messages, question, context_documents, conversation_history)
+    
+    def _flight_key(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]],
+        conversation_history: Optional[List[Dict[str, Any]]],
+        use_documents: bool
+    ) -> Optional[Tuple[Any, ...]]:
+        """
+        LLM 호출 합치기 키 (컬렉션, 경로, 정규화 질문, 검색 청크 집합, 히스토리가 같으면 같은 키)
+        
+        Returns:
+            합치기 키 (singleflight가 꺼져 있으면 None)
+        """
+        if self.singleflight is None:
+            return None
+        chunk_ids = tuple(sorted(str(doc.get("id") or doc.get("content")) for doc in context_documents or []))
+        return (
+            self.vectorstore.collection_name,
+            use_documents,
+            normalize_question(question),
+            chunk_ids,
+            history_fingerprint(conversation_history),
+        )
+    
+    async def _ainvoke_llm(self, messages: List[Any]) -> Any:
+        """LLM 슬롯 안에서 llm.ainvoke 호출"""
+        async with llm_slot():
+            return await self.llm.ainvoke(messages)
+    
+    async def _astream_llm(self, messages: List[Any]) -> AsyncIterator[str]:
+        """LLM 슬롯 안에서 llm.astream 호출 (빈 토큰 제외)"""
+        async with llm_slot():
+            async for chunk in self.llm.astream(messages):
+                content = chunk.content if hasattr(chunk, "content") else str(chunk)
+                if content:
+                    yield content
+    
+    async def _abuild_direct_messages(
+        self,
+        question: str,
+        conversation_history: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """_build_direct_messages를 검색 스레드 풀에서 실행"""
+        return await run_in_executor("search", self._build_direct_messages, question, conversation_history)
+    
+    async def agenerate_response(
+        self,
+        question: str,
+        context_documents: Optional[List[Dict[str, Any]]] = None,
+        top_k: int = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        generate_response의 비동기 버전 (llm.ainvoke 사용, 동시 LLM 호출 수는 llm_max_concurrency로 제한)
+        
+        singleflight_enabled이면 같은 질문/검색 청크/히스토리의 요청이 동시에 들어왔을 때 LLM 호출 하나를 공유합니다.
+        
+        Args:
+            question: 사용자 질문
+            context_documents: 컨텍스트 문서 (없으면 자동 검색)
+            top_k: 검색할 문서 수 (기본값: settings.retrieval_top_k)
+            conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (독립 질문일 때만 True)
+            
+        Returns:
+            응답 딕셔너리 (response, sources, retrieved_docs, cached, context, rerank, route)
+        """
+        started = time.perf_counter()
+        plan = await self._aprepare(
+            question, context_documents, top_k, None, conversation_history, use_cache, started
+        )
+        if plan["result"] is not None:
+            return self._routed(plan["result"], plan["route"], started)
+        messages = plan["messages"]
+        
+        try:
+            logger.info(f"[agenerate_response] LLM 호출 시작 - 질문: {question[:50]}...")
+            flight_key = self._flight_key(
+                question, plan["context_documents"], conversation_history, plan["use_documents"]
+            )
+            if flight_key is None:
+                result = await self._ainvoke_llm(messages)
+            else:
+                result = await self.singleflight.do(flight_key, lambda: self._ainvoke_llm(messages))
+            response = self._parse_llm_result(result, messages)
+        except Exception as e:
+            logger.error(f"[agenerate_response] LLM 호출 오류: {str(e)}", exc_info=True)
+            return self._plan_result(plan, question, f"오류가 발생했습니다: {str(e)}", started, store=False)
+        
+        return self._plan_result(plan, question, response, started)
+    
+    async def achat(
+        self,
+        question: str,
+        top_k: int = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        chat의 비동기 버전
+        
+        Args:
+            question: 사용자 질문
+            top_k: 검색할 문서 수
+            conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (독립 질문일 때만 True)
+            
+        Returns:
+            응답 딕셔너리
+        """
+        return await self.agenerate_response(
+            question,
+            top_k=top_k,
+            conversation_history=conversation_history,
+            use_cache=use_cache
+        )
+    
+    async def astream_response(
+        self,
+        question: str,
+        top_k: int = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        stream_response의 비동기 버전 (llm.astream 사용, 스트리밍하는 동안 LLM 슬롯 하나를 사용)
+        
+        singleflight_enabled이면 같은 질문/검색 청크/히스토리의 스트림이 진행 중일 때 그 토큰 스트림을
+        처음부터 함께 받습니다.
+        
+        Args:
+            question: 사용자 질문
+            top_k: 검색할 문서 수 (기본값: settings.retrieval_top_k)
+            conversation_history: 이전 대화 히스토리 (선택적)
+            use_cache: 의미 기반 답변 캐시 사용 여부 (독립 질문일 때만 True)
+            
+        Yields:
+            이벤트 딕셔너리 (stream_response와 같은 형식)
+        """
+        started = time.perf_counter()
+        plan = await self._aprepare(question, None, top_k, None, conversation_history, use_cache, started)
+        if plan["result"] is not None:
+            for event in self._result_stream_events(plan["result"], plan["route"], started):
+                yield event
+            return
+        yield {"type": "sources", "sources": plan["sources"]}
+        
+        messages = plan["messages"]
+        timings = plan["timings"]
+        parts = []
+        try:
+            logger.info(f"[astream_response] LLM 스트리밍 시작 - 질문: {question[:50]}...")
+            flight_key = self._flight_key(
+                question, plan["context_documents"], conversation_history, plan["use_documents"]
+            )
+            if flight_key is None:
+                tokens = self._astream_llm(messages)
+            else:
+                tokens = self.singleflight.stream(flight_key, lambda: self._astream_llm(messages))
+            async for content in tokens:
+                if not parts:
+                    timings["first_token"] = time.perf_counter() - started
+                    logger.info(f"[astream_response] 첫 토큰까지 {timings['first_token']:.3f}초")
+                parts.append(content)
+                yield {"type": "token", "content": content}
+        except Exception as e:
+            logger.error(f"[astream_response] LLM 스트리밍 오류: {str(e)}", exc_info=True)
+            yield {"type": "error", "message": f"오류가 발생했습니다: {str(e)}"}
+            return
+        
+        for event in self._plan_done_events(plan, question, parts, started, "astream_response"):
+            yield event
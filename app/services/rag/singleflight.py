@@ -0,0 +1,195 @@
+"""
+동일 요청 합치기 (singleflight)
+같은 질문이 동시에 여러 번 들어오면 LLM 호출 하나만 실행하고 결과(또는 토큰 스트림)를 모든 요청에 나눠 줌
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.。？！~]+$")
+
+
+def normalize_question(question: str) -> str:
+    """
+    합치기 키용 질문 정규화 (대소문자, 연속 공백, 끝 문장부호 차이 무시)
+    
+    Args:
+        question: 사용자 질문
+        
+    Returns:
+        정규화된 질문
+    """
+    question = _WHITESPACE.sub(" ", question.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", question)
+
+
+def _history_items(messages: List[Dict[str, Any]]) -> List[List[str]]:
+    return [[message.get("role", ""), normalize_question(message.get("content") or "")] for message in messages]
+
+
+def history_fingerprint(conversation_history: Any) -> str:
+    """
+    대화 히스토리 지문 (역할과 정규화한 내용만 사용하므로 timestamp가 달라도 같은 값)
+    
+    Args:
+        conversation_history: 대화 히스토리 (list 또는 {"summary", "recent"} dict)
+        
+    Returns:
+        SHA-1 hex 문자열 (히스토리가 없으면 빈 문자열)
+    """
+    if not conversation_history:
+        return ""
+    if isinstance(conversation_history, dict):
+        items = {
+            "summary": conversation_history.get("summary") or "",
+            "recent": _history_items(conversation_history.get("recent") or []),
+        }
+    else:
+        items = _history_items(conversation_history)
+    encoded = json.dumps(items, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class _Broadcast:
+    """선두 요청의 토큰 스트림을 버퍼에 쌓고 구독자마다 처음부터 다시 보내 주는 채널"""
+    
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+    
+    def publish(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+    
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+    
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    async def subscribe(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            if position < len(self.chunks):
+                position += 1
+                yield self.chunks[position - 1]
+                continue
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class Singleflight:
+    """
+    진행 중인 같은 키의 비동기 작업 공유
+    
+    선두 요청의 작업은 별도 태스크로 실행하므로 선두 클라이언트가 연결을 끊어도 함께 기다리던
+    요청은 결과를 받습니다. 스트림은 구독자가 모두 떠나면 LLM 스트리밍을 취소합니다.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self._counters = {"leaders": 0, "coalesced": 0, "stream_leaders": 0, "stream_coalesced": 0}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        같은 키의 작업이 진행 중이면 그 결과를 기다리고, 없으면 func를 실행
+        
+        Args:
+            key: 합치기 키
+            func: 결과를 만드는 코루틴 함수
+            
+        Returns:
+            작업 결과 (같은 키의 요청들이 같은 객체를 공유하므로 변경하지 말 것)
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self._counters["leaders"] += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            
+            def forget(done: asyncio.Task) -> None:
+                self._calls.pop(key, None)
+                if not done.cancelled():
+                    done.exception()  # 기다리는 요청이 모두 떠났어도 "never retrieved" 경고를 남기지 않음
+            
+            task.add_done_callback(forget)
+        else:
+            self._counters["coalesced"] += 1
+            logger.info("[Singleflight] 진행 중인 같은 요청의 LLM 호출 결과를 공유합니다")
+        return await asyncio.shield(task)
+    
+    async def stream(self, key: Hashable, func: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        같은 키의 스트림이 진행 중이면 그 스트림을 처음부터 받고, 없으면 func 스트림을 시작
+        
+        Args:
+            key: 합치기 키
+            func: 토큰(문자열)을 내보내는 비동기 이터레이터를 만드는 함수
+            
+        Yields:
+            토큰 문자열
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self._counters["stream_leaders"] += 1
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            
+            async def pump():
+                try:
+                    async for chunk in func():
+                        broadcast.publish(chunk)
+                    broadcast.finish()
+                except BaseException as e:
+                    broadcast.finish(e)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                finally:
+                    if self._streams.get(key) is broadcast:
+                        del self._streams[key]
+            
+            broadcast.task = asyncio.ensure_future(pump())
+        else:
+            self._counters["stream_coalesced"] += 1
+            logger.info("[Singleflight] 진행 중인 같은 요청의 토큰 스트림을 공유합니다")
+        
+        broadcast.subscribers += 1
+        try:
+            async for chunk in broadcast.subscribe():
+                yield chunk
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.done:
+                # 새 요청이 취소 중인 스트림에 붙지 않도록 먼저 제거
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                broadcast.task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        합치기 통계
+        
+        Returns:
+            통계 딕셔너리 (leaders/coalesced: 응답 요청, stream_*: 스트리밍 요청, in_flight: 진행 중인 작업 수)
+        """
+        return {
+            **self._counters,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
@@ -0,0 +1,131 @@
+"""
+시작 워밍업
+임베딩 모델, 벡터 인덱스, 페이지 캐시를 미리 데워 배포 직후 첫 질의의 지연을 없앰
+"""
+import logging
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from app.config import settings
+from app.services.rag.context_packer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# 더미 인코딩에 사용할 문장 (토크나이저가 실제 문서와 비슷한 길이를 처리하도록 반복)
+WARMUP_PASSAGE = "서비스 설정과 사용 방법을 설명하는 문서입니다. This document explains configuration and usage. " * 8
+
+
+class WarmupState:
+    """워밍업 진행 상태 (/ready 응답용)"""
+    
+    def __init__(self):
+        self.status = "pending"  # pending, running, ready
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "timings": self.timings,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# 전역 워밍업 상태
+warmup_state = WarmupState()
+
+
+def _timed(timings: Dict[str, float], name: str, func, *args, **kwargs):
+    """함수 실행 시간을 기록하고 결과 반환"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[name] = round(time.perf_counter() - started, 3)
+    logger.info(f"[Warmup] {name}: {timings[name]:.3f}초")
+    return result
+
+
+def run_warmup(
+    embedders: List[Any],
+    vectorstore,
+    rag_service=None,
+    state: Optional[WarmupState] = None
+) -> Dict[str, float]:
+    """
+    워밍업 실행
+    
+    1. 임베딩 모델마다 설정한 배치 크기로 더미 인코딩 (토크나이저/모델 지연 초기화)
+    2. 컨텍스트 패킹 토크나이저 로드 (tiktoken 인코딩 파일)
+    3. 컬렉션 인덱스 접근 (HNSW 로드, 메타데이터/어휘 색인 파일 캐시)
+    4. 합성 질의로 검색 (RAG 서비스가 있으면 하이브리드 검색 경로 전체와 재순위화 모델)
+    
+    워밍업 중 오류가 나도 서비스는 준비 상태로 전환하고 오류만 기록합니다.
+    
+    Args:
+        embedders: 워밍업할 Embedder 리스트 (같은 인스턴스는 한 번만)
+        vectorstore: 벡터 스토어
+        rag_service: RAG 서비스 (선택적)
+        state: 진행 상태를 기록할 WarmupState (기본값: 전역 warmup_state)
+        
+    Returns:
+        단계별 소요 시간 (초)
+    """
+    state = state or warmup_state
+    state.status = "running"
+    state.started_at = datetime.now().isoformat()
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    
+    try:
+        unique_embedders = list({id(embedder): embedder for embedder in embedders}.values())
+        for i, embedder in enumerate(unique_embedders):
+            for batch_size in settings.warmup_batch_sizes:
+                _timed(
+                    timings, f"embed[{i}] batch={batch_size}",
+                    embedder.embed_texts, [WARMUP_PASSAGE] * batch_size, instruction="passage:"
+                )
+        
+        if settings.context_packing_enabled:
+            _timed(timings, "tokenizer", count_tokens, WARMUP_PASSAGE)
+        
+        if rag_service is not None and rag_service.intent_router is not None:
+            _timed(timings, "intent centroids", rag_service.intent_router.load_centroids)
+        
+        count = _timed(timings, "index count", vectorstore.count)
+        if count > 0:
+            _timed(timings, "index touch", vectorstore.get, limit=1, include=["documents", "metadatas", "embeddings"])
+            
+            queries = settings.warmup_queries
+            embedder = unique_embedders[0]
+            query_embeddings = _timed(timings, "embed queries", embedder.embed_texts, queries, instruction="query:")
+            _timed(
+                timings, "search batch",
+                vectorstore.search_many, query_embeddings, n_results=settings.retrieval_top_k
+            )
+            if rag_service is not None:
+                for i, query in enumerate(queries):
+                    _timed(timings, f"retrieve[{i}]", rag_service.retrieve_documents, query)
+                if rag_service.reranker is not None:
+                    _timed(
+                        timings, "rerank",
+                        rag_service.reranker.score, queries[0], [{"id": "warmup", "content": WARMUP_PASSAGE}]
+                    )
+        else:
+            logger.info("[Warmup] 컬렉션이 비어 있어 검색 워밍업을 건너뜁니다")
+    except Exception as e:
+        state.error = str(e)
+        logger.warning(f"[Warmup] 워밍업 중 오류 (서비스는 계속 시작): {e}")
+    
+    timings["total"] = round(time.perf_counter() - started, 3)
+    state.timings = timings
+    state.finished_at = datetime.now().isoformat()
+    state.status = "ready"
+    logger.info(f"[Warmup] 완료 - {timings['total']:.3f}초")
+    return timings
@@ -3,7 +3,18 @@
 """
 
 from .chroma import ChromaVectorStore
+from .numpy_store import NumpyVectorStore
+from .base import CollectionNotFoundError
+from .factory import create_vectorstore, open_vectorstore, collection_registry, VectorStore
 
-__all__ = ["ChromaVectorStore"]
+__all__ = [
+    "ChromaVectorStore",
+    "NumpyVectorStore",
+    "create_vectorstore",
+    "open_vectorstore",
+    "collection_registry",
+    "VectorStore",
+    "CollectionNotFoundError"
+]
 
 
@@ -0,0 +1,418 @@
+"""
+벡터 스토어 공통 기능
+사이드카 메타데이터 인덱스(MetadataIndex)를 사용하는 문서 목록, 통계, 페이지 조회
+"""
+import base64
+import json
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from app.config import settings
+from app.vectorstore.centroids import DocumentCentroidIndex
+from app.vectorstore.lexical import LexicalIndex
+from app.vectorstore.mmr import mmr_select, take_results
+
+logger = logging.getLogger(__name__)
+
+# 청크 변경 리스너 (컬렉션 이름, 변경된 청크 ID 리스트 또는 전체 삭제 시 None) - 답변 캐시 무효화 등
+_chunk_change_listeners: List[Callable[[str, Optional[List[str]]], None]] = []
+
+
+class CollectionNotFoundError(LookupError):
+    """읽기 경로에서 존재하지 않는 컬렉션을 요청한 경우 (컬렉션은 저장 요청에서만 생성)"""
+
+
+def add_chunk_change_listener(listener: Callable[[str, Optional[List[str]]], None]) -> None:
+    """
+    청크가 추가/갱신/삭제될 때 호출할 함수 등록 (모든 컬렉션, 모든 백엔드 공통)
+    
+    Args:
+        listener: (컬렉션 이름, 청크 ID 리스트 또는 None)을 받는 함수
+    """
+    if listener not in _chunk_change_listeners:
+        _chunk_change_listeners.append(listener)
+
+
+def remove_chunk_change_listener(listener: Callable[[str, Optional[List[str]]], None]) -> None:
+    """등록한 청크 변경 리스너 제거"""
+    if listener in _chunk_change_listeners:
+        _chunk_change_listeners.remove(listener)
+
+
+class MetadataIndexMixin:
+    """
+    사이드카 인덱스 기반 조회 메서드 모음
+    
+    사용하는 클래스는 metadata_index, get_by_ids(), get(), count(), iter_records(), get_index_params()를 제공해야 합니다.
+    """
+    
+    # 본문도 메타데이터 인덱스에 저장할지 여부 (본문을 따로 저장하지 않는 백엔드만 True)
+    STORE_TEXTS_IN_INDEX = False
+    
+    # BM25 어휘 색인 (settings.lexical_index_enabled가 False면 None)
+    lexical_index: Optional[LexicalIndex] = None
+    
+    # 문서 중심 벡터 색인 (settings.document_centroids_enabled가 False면 None)
+    centroid_index: Optional[DocumentCentroidIndex] = None
+    
+    def _process_local_files_allowed(self, name: str) -> bool:
+        """
+        워커 프로세스마다 따로 상태를 들고 쓰는 파일 기반 색인을 열어도 되는지 확인
+        
+        인덱스 서버 모드이거나 워커가 여러 개(settings.web_concurrency > 1)이면 프로세스들이
+        같은 디렉토리의 파일을 서로 덮어써 변경이 유실되므로 사용하지 않습니다.
+        
+        Args:
+            name: 로그에 표시할 색인 이름
+            
+        Returns:
+            사용 가능 여부
+        """
+        if getattr(self, "mode", "embedded") == "server" or settings.web_concurrency > 1:
+            logger.warning(
+                f"[{type(self).__name__}] 인덱스 서버 모드 또는 멀티 워커 실행에서는 {name}을 사용하지 않습니다"
+            )
+            return False
+        return True
+    
+    def _open_lexical_index(self, directory: str) -> Optional[LexicalIndex]:
+        """설정에 따라 어휘 색인 열기 (단일 프로세스에서만, 없으면 하이브리드 검색과 빠른 경로도 꺼짐)"""
+        if not settings.lexical_index_enabled or not self._process_local_files_allowed("어휘 색인"):
+            return None
+        return LexicalIndex(directory, compact_min_docs=settings.lexical_compact_min_docs)
+    
+    def _close_sidecar_indexes(self) -> None:
+        """사이드카 인덱스(메타데이터 SQLite, 어휘 색인, 문서 중심 벡터 색인)의 파일 핸들/mmap 해제"""
+        self.metadata_index.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+        if self.centroid_index is not None:
+            self.centroid_index.close()
+    
+    def _open_centroid_index(self, directory: str) -> Optional[DocumentCentroidIndex]:
+        """설정에 따라 문서 중심 벡터 색인 열기 (단일 프로세스에서만, 없으면 2단계 검색은 전체 청크 검색으로 대체)"""
+        if not settings.document_centroids_enabled or not self._process_local_files_allowed("문서 중심 벡터 색인"):
+            return None
+        return DocumentCentroidIndex(directory, space=self.get_index_params()["space"])
+    
+    def _notify_chunk_change(self, ids: Optional[List[str]]) -> None:
+        """청크 변경 리스너 호출 (리스너 오류는 쓰기를 실패시키지 않음)"""
+        for listener in list(_chunk_change_listeners):
+            try:
+                listener(self.collection_name, ids)
+            except Exception as e:
+                logger.warning(f"[{type(self).__name__}] 청크 변경 리스너 오류: {e}")
+    
+    def _index_upsert(self, ids: List[str], metadatas: List[Dict[str, Any]], texts: List[str]) -> None:
+        """사이드카 인덱스(메타데이터, 어휘)에 청크 추가 또는 갱신"""
+        self.metadata_index.upsert(ids, metadatas, texts if self.STORE_TEXTS_IN_INDEX else None)
+        if self.lexical_index is not None:
+            self.lexical_index.upsert(ids, texts)
+        self._notify_chunk_change(ids)
+    
+    def _index_delete(self, ids: List[str]) -> None:
+        """사이드카 인덱스에서 청크 삭제"""
+        self.metadata_index.delete(ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete(ids)
+        self._notify_chunk_change(ids)
+    
+    def _index_clear(self) -> None:
+        """사이드카 인덱스 전체 삭제"""
+        self.metadata_index.clear()
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        if self.centroid_index is not None:
+            self.centroid_index.clear()
+        self._notify_chunk_change(None)
+    
+    def _sync_lexical_index(self, batch_size: int = 1000) -> None:
+        """
+        어휘 색인이 벡터 스토어와 어긋나 있으면 저장된 본문으로 다시 구축
+        
+        Args:
+            batch_size: 한 번에 읽어올 청크 수
+        """
+        if self.lexical_index is None:
+            return
+        total = self.count()
+        if len(self.lexical_index) == total:
+            return
+        
+        logger.info(f"[{type(self).__name__}] 어휘 색인 재구축 - 컬렉션 {self.collection_name}, 청크 {total}개")
+        self.lexical_index.clear()
+        for results in self.iter_records(batch_size=batch_size, include=["documents"]):
+            self.lexical_index.upsert(results["ids"], results["documents"])
+        self.lexical_index.compact()
+    
+    def _sync_centroid_index(self) -> None:
+        """중심 벡터 색인의 문서 수가 사이드카 인덱스와 다르면 다시 구축"""
+        if self.centroid_index is None:
+            return
+        if len(self.centroid_index) == self.count_documents():
+            return
+        self.rebuild_document_centroids()
+    
+    def rebuild_document_centroids(self, batch_size: int = 1000) -> int:
+        """
+        저장된 청크 임베딩으로 모든 문서의 중심 벡터 다시 계산 (스냅샷 가져오기 등 대량 적재 후)
+        
+        Args:
+            batch_size: 한 번에 읽어올 청크 수
+            
+        Returns:
+            중심 벡터를 만든 문서 수
+        """
+        if self.centroid_index is None:
+            return 0
+        logger.info(f"[{type(self).__name__}] 문서 중심 벡터 재구축 - 컬렉션 {self.collection_name}")
+        batches = (
+            (
+                [metadata.get("document_id") for metadata in results["metadatas"]],
+                results["embeddings"]
+            )
+            for results in self.iter_records(batch_size=batch_size, include=["metadatas", "embeddings"])
+        )
+        return self.centroid_index.rebuild(batches)
+    
+    def update_document_centroid(self, document_id: str, embeddings: Optional[List[List[float]]] = None) -> None:
+        """
+        문서 하나의 중심 벡터 갱신 (수집/삭제 후 호출)
+        
+        Args:
+            document_id: 문서 ID
+            embeddings: 문서의 전체 청크 임베딩 (없으면 저장된 청크에서 읽음, 청크가 없으면 중심 벡터 삭제)
+        """
+        if self.centroid_index is None:
+            return
+        if embeddings is None:
+            chunks = self.get_by_ids(self.get_document_chunk_ids(document_id), include=["embeddings"])
+            embeddings = [chunk["embedding"] for chunk in chunks if chunk.get("embedding") is not None]
+        self.centroid_index.update(document_id, embeddings)
+    
+    def search_documents(self, query_embeddings: List[List[float]], n_documents: int) -> List[List[str]]:
+        """
+        문서 중심 벡터로 쿼리마다 상위 문서 선택 (2단계 검색의 1단계)
+        
+        Args:
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_documents: 쿼리당 고를 문서 수
+            
+        Returns:
+            쿼리 순서대로 문서 ID 리스트 (중심 벡터 색인이 없거나 비어 있으면 빈 리스트)
+        """
+        if self.centroid_index is None:
+            return [[] for _ in query_embeddings]
+        return self.centroid_index.search_many(query_embeddings, n_documents)
+    
+    def mmr_indices(
+        self,
+        query_embedding: List[float],
+        ids: List[str],
+        k: int,
+        lambda_mult: Optional[float] = None
+    ) -> List[int]:
+        """
+        후보 청크 중 저장된 임베딩으로 MMR 선택
+        
+        Args:
+            query_embedding: 쿼리 임베딩 벡터
+            ids: 후보 청크 ID 리스트 (관련도 순)
+            k: 고를 청크 수
+            lambda_mult: 관련도 가중치 (기본값: settings.mmr_lambda)
+            
+        Returns:
+            고른 후보의 ids 내 위치 리스트 (선택 순서, 임베딩이 없는 후보는 제외)
+        """
+        if len(ids) <= 1:
+            return list(range(min(k, len(ids))))
+        embeddings = {
+            row["id"]: row.get("embedding")
+            for row in self.get_by_ids(list(dict.fromkeys(ids)), include=["embeddings"])
+        }
+        positions = [i for i, chunk_id in enumerate(ids) if embeddings.get(chunk_id) is not None]
+        if not positions:
+            return []
+        order = mmr_select(query_embedding, [embeddings[ids[i]] for i in positions], k, lambda_mult)
+        return [positions[i] for i in order]
+    
+    def search_mmr(
+        self,
+        query_embedding: List[float],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        oversample: Optional[int] = None,
+        lambda_mult: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        n_results x oversample개를 검색한 뒤 MMR로 n_results개를 골라 거의 같은 청크가 겹치지 않게 함
+        
+        Args:
+            query_embedding: 쿼리 임베딩 벡터
+            n_results: 반환할 결과 수
+            filter_metadata: 메타데이터 필터
+            oversample: 후보 배수 (기본값: settings.mmr_oversample)
+            lambda_mult: 관련도 가중치 (기본값: settings.mmr_lambda)
+            
+        Returns:
+            search와 같은 형식의 검색 결과 (MMR 선택 순서)
+        """
+        oversample = oversample or settings.mmr_oversample
+        result = self.search(query_embedding, n_results=n_results * oversample, filter_metadata=filter_metadata)
+        return take_results(result, self.mmr_indices(query_embedding, result["ids"], n_results, lambda_mult))
+    
+    def lexical_search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25 어휘 검색
+        
+        Args:
+            query: 질의 텍스트
+            n_results: 반환할 결과 수
+            
+        Returns:
+            결과 리스트 (id, score), 어휘 색인이 꺼져 있으면 빈 리스트
+        """
+        if self.lexical_index is None:
+            return []
+        return self.lexical_index.search(query, n_results)
+    
+    def get_document_chunk_ids(self, document_id: str) -> List[str]:
+        """
+        특정 문서에 속한 청크 ID 조회
+        
+        Args:
+            document_id: 문서 ID
+            
+        Returns:
+            청크 ID 리스트 (chunk_index 순)
+        """
+        return self.metadata_index.get_chunk_ids(document_id)
+    
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """
+        문서 목록 조회 (사이드카 인덱스 사용, 청크 텍스트는 읽지 않음)
+        
+        Returns:
+            문서 딕셔너리 리스트 (id, metadata, chunks_count)
+        """
+        return self.metadata_index.list_documents()
+    
+    def count_documents(self) -> int:
+        """
+        고유 문서 수 반환
+        
+        Returns:
+            문서 수
+        """
+        return self.metadata_index.count_documents()
+    
+    def list_chunks(
+        self,
+        document_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        include: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        청크 페이지 조회 (페이지 ID는 사이드카 인덱스에서, 본문은 해당 ID만 조회)
+        
+        Args:
+            document_id: 특정 문서의 청크만 조회 (선택적)
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            청크 리스트
+        """
+        page_ids = self.metadata_index.list_chunk_ids(document_id, limit=limit, offset=offset)
+        return self.get_by_ids(page_ids, include=include)
+    
+    def page_chunks(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        document_id: Optional[str] = None,
+        include: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        커서 기반 청크 페이지 조회 (페이지 크기에 비례하는 비용)
+        
+        Args:
+            limit: 최대 개수
+            cursor: 이전 응답의 next_cursor (없으면 처음부터)
+            document_id: 특정 문서의 청크만 조회 (선택적)
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            (청크 리스트, 다음 페이지 커서 또는 None)
+            
+        Raises:
+            ValueError: 커서가 잘못되었거나 다른 document_id로 발급된 경우
+        """
+        after = None
+        if cursor:
+            after = self._decode_cursor(cursor, document_id)
+        
+        page_ids, next_after = self.metadata_index.page_chunk_ids(
+            limit=limit,
+            after=after,
+            document_id=document_id
+        )
+        next_cursor = self._encode_cursor(next_after, document_id) if next_after is not None else None
+        return self.get_by_ids(page_ids, include=include), next_cursor
+    
+    @staticmethod
+    def _encode_cursor(after: Any, document_id: Optional[str]) -> str:
+        """페이지 키를 불투명한 커서 문자열로 인코딩"""
+        payload = json.dumps({"after": after, "document_id": document_id}, ensure_ascii=False)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, document_id: Optional[str]) -> Any:
+        """커서 문자열을 페이지 키로 디코딩"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if not isinstance(payload, dict):
+            raise ValueError("Invalid cursor: not a cursor object")
+        if payload.get("document_id") != document_id:
+            raise ValueError("Cursor was issued for a different document_id")
+        after = payload.get("after")
+        if after is None:
+            return None
+        if document_id:
+            # 문서별 조회는 [chunk_index 또는 -1, chunk_id]
+            if (
+                not isinstance(after, list) or len(after) != 2
+                or isinstance(after[0], bool) or not isinstance(after[0], (int, float, str))
+                or not isinstance(after[1], str)
+            ):
+                raise ValueError("Invalid cursor: bad page key")
+            return after
+        if not isinstance(after, str):
+            raise ValueError("Invalid cursor: bad page key")
+        return after
+    
+    def count_chunks(self, document_id: Optional[str] = None) -> int:
+        """
+        청크 수 반환
+        
+        Args:
+            document_id: 특정 문서의 청크만 셀 경우 문서 ID
+            
+        Returns:
+            청크 수
+        """
+        if document_id:
+            return self.metadata_index.count_document_chunks(document_id)
+        return self.count()
+    
+    def get_all_documents(self) -> List[Dict[str, Any]]:
+        """
+        모든 문서 조회 (전체를 읽으므로 목록/통계에는 사이드카 인덱스 사용)
+        
+        Returns:
+            문서 리스트
+        """
+        return self.get()
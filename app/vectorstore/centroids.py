@@ -0,0 +1,130 @@
+"""
+문서 중심 벡터 색인
+문서마다 청크 임베딩의 평균(중심 벡터)을 저장하여, 2단계 검색에서 전체 청크 대신
+상위 문서를 먼저 고르고 그 문서의 청크만 검색하도록 함
+"""
+import logging
+from typing import List, Dict, Iterable, Tuple
+
+import numpy as np
+
+from app.vectorstore.mmap_matrix import MmapMatrix
+from app.vectorstore.quantized import exact_distances, _normalize
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentCentroidIndex:
+    """
+    문서별 중심 벡터 색인 (MmapMatrix, 행 ID = document_id)
+    
+    cosine/ip 공간에서는 청크 벡터를 정규화한 뒤 평균을 내어 긴 문서의 큰 벡터가
+    중심을 끌어가지 않도록 하고, l2 공간에서는 원본 벡터의 평균을 사용합니다.
+    """
+    
+    def __init__(self, directory: str, space: str = "cosine"):
+        """
+        중심 벡터 색인 열기
+        
+        Args:
+            directory: 행렬 파일을 둘 디렉토리
+            space: 거리 공간 ("cosine", "l2", "ip")
+        """
+        self.space = space
+        self.matrix = MmapMatrix(directory, name="centroids")
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    def _centroid(self, embeddings) -> np.ndarray:
+        """청크 임베딩 평균 계산"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self.space != "l2":
+            vectors = _normalize(vectors)
+        return vectors.mean(axis=0)
+    
+    def update(self, document_id: str, embeddings) -> None:
+        """
+        문서 하나의 중심 벡터 갱신 (청크가 없으면 삭제)
+        
+        Args:
+            document_id: 문서 ID
+            embeddings: 문서의 전체 청크 임베딩 (리스트 또는 배열)
+        """
+        if embeddings is None or len(embeddings) == 0:
+            self.matrix.delete([document_id])
+            return
+        self.matrix.upsert([document_id], self._centroid(embeddings)[None, :])
+    
+    def delete(self, document_ids: List[str]) -> None:
+        """문서 중심 벡터 삭제"""
+        self.matrix.delete(document_ids)
+    
+    def clear(self) -> None:
+        """모든 중심 벡터 삭제"""
+        self.matrix.clear()
+    
+    def rebuild(self, batches: Iterable[Tuple[List[str], np.ndarray]], write_batch_size: int = 1000) -> int:
+        """
+        청크 배치를 순회하며 모든 문서의 중심 벡터를 다시 계산
+        
+        Args:
+            batches: (청크별 document_id 리스트, 청크 임베딩 배열) 이터러블
+            write_batch_size: 한 번에 행렬에 쓸 문서 수
+            
+        Returns:
+            중심 벡터를 만든 문서 수
+        """
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        for document_ids, embeddings in batches:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            if self.space != "l2":
+                vectors = _normalize(vectors)
+            for document_id, vector in zip(document_ids, vectors):
+                if document_id is None:
+                    continue
+                if document_id in sums:
+                    sums[document_id] += vector
+                    counts[document_id] += 1
+                else:
+                    sums[document_id] = vector.copy()
+                    counts[document_id] = 1
+        
+        self.matrix.clear()
+        document_ids = list(sums)
+        for start in range(0, len(document_ids), write_batch_size):
+            batch_ids = document_ids[start:start + write_batch_size]
+            centroids = np.stack([sums[document_id] / counts[document_id] for document_id in batch_ids])
+            self.matrix.upsert(batch_ids, centroids)
+        return len(document_ids)
+    
+    def search_many(self, query_embeddings, n_documents: int) -> List[List[str]]:
+        """
+        쿼리마다 중심 벡터가 가까운 상위 문서 선택
+        
+        Args:
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_documents: 쿼리당 고를 문서 수
+            
+        Returns:
+            쿼리 순서대로 문서 ID 리스트 (가까운 순, 색인이 비어 있으면 빈 리스트)
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if len(self.matrix) == 0:
+            return [[] for _ in range(queries.shape[0])]
+        
+        live_rows = np.flatnonzero(self.matrix.live_mask)
+        distances = exact_distances(self.matrix.vectors[live_rows], queries, self.space)
+        n_documents = min(n_documents, live_rows.shape[0])
+        if n_documents < live_rows.shape[0]:
+            top = np.argpartition(distances, n_documents - 1, axis=1)[:, :n_documents]
+        else:
+            top = np.tile(np.arange(live_rows.shape[0]), (queries.shape[0], 1))
+        order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return [self.matrix.ids_for(live_rows[row_indices]) for row_indices in top]
+    
+    def close(self) -> None:
+        """행렬 파일 닫기"""
+        self.matrix.close()
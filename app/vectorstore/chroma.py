@@ -3,23 +3,121 @@ ChromaDB 벡터 스토어 관리
 """
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import logging
 import os
+import threading
+import time
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.config import settings
+from app.vectorstore.base import MetadataIndexMixin, CollectionNotFoundError
+from app.vectorstore.metadata_index import MetadataIndex
+from app.vectorstore.quantized import QuantizedIndex
+
+logger = logging.getLogger(__name__)
+
+# get 계열 조회의 기본 projection (임베딩은 필요할 때만 조회)
+DEFAULT_INCLUDE = ["documents", "metadatas"]
 
 # 텔레메트리 비활성화
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
 
-class ChromaVectorStore:
+def hnsw_metadata(
+    collection_name: str,
+    space: Optional[str] = None,
+    m: Optional[int] = None,
+    construction_ef: Optional[int] = None,
+    search_ef: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    컬렉션 생성용 HNSW 메타데이터 구성
+    (명시한 값 > settings.chroma_hnsw_overrides[컬렉션] > 전역 settings 순으로 적용)
+    
+    Args:
+        collection_name: 컬렉션 이름
+        space: 거리 공간 ("cosine", "l2", "ip")
+        m: 노드당 연결 수
+        construction_ef: 구축 시 탐색 폭
+        search_ef: 검색 시 탐색 폭
+        
+    Returns:
+        ChromaDB 컬렉션 메타데이터
+    """
+    overrides = settings.chroma_hnsw_overrides.get(collection_name, {})
+    return {
+        "description": "RAG Chatbot document collection",
+        "hnsw:space": space or overrides.get("space", settings.chroma_hnsw_space),
+        "hnsw:M": m or overrides.get("m", settings.chroma_hnsw_m),
+        "hnsw:construction_ef": construction_ef or overrides.get("construction_ef", settings.chroma_hnsw_construction_ef),
+        "hnsw:search_ef": search_ef or overrides.get("search_ef", settings.chroma_hnsw_search_ef),
+    }
+
+
+class _PooledHTTPAdapter(HTTPAdapter):
+    """기본 타임아웃을 적용하는 연결 풀 어댑터"""
+    
+    def __init__(self, timeout: float, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_http_client():
+    """
+    로컬 인덱스 서버용 ChromaDB HTTP 클라이언트 생성
+    (워커 스레드 수만큼 keep-alive 연결을 재사용하도록 연결 풀 크기 설정)
+    
+    HttpClient는 requests 세션을 설정하는 공개 API가 없어 내부 속성(_server._session)에
+    어댑터를 연결합니다. requirements.txt에서 chromadb==0.4.18로 고정한 구조에 의존하므로,
+    버전을 올려 속성이 없으면 경고만 남기고 ChromaDB 기본 연결 설정을 사용합니다.
+    
+    Returns:
+        ChromaDB HttpClient
+    """
+    client = chromadb.HttpClient(
+        host=settings.index_server_host,
+        port=str(settings.index_server_port),
+        settings=ChromaSettings(anonymized_telemetry=False, allow_reset=False)
+    )
+    adapter = _PooledHTTPAdapter(
+        timeout=settings.index_server_timeout,
+        pool_connections=1,
+        pool_maxsize=settings.index_server_pool_size,
+        # 연결 실패만 재시도 (쓰기 요청이 중복 실행되지 않도록 읽기 타임아웃은 재시도하지 않음)
+        max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1)
+    )
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if session is None or not hasattr(session, "mount"):
+        logger.warning(
+            "[ChromaVectorStore] HttpClient 내부 세션을 찾을 수 없어 기본 연결 설정을 사용합니다 "
+            f"(chromadb {chromadb.__version__}, 0.4.18 기준으로 작성됨)"
+        )
+        return client
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return client
+
+
+class ChromaVectorStore(MetadataIndexMixin):
     """ChromaDB를 사용한 벡터 스토어"""
     
-    def __init__(self, collection_name: Optional[str] = None):
+    def __init__(self, collection_name: Optional[str] = None, create: bool = True):
         """
         ChromaDB 벡터 스토어 초기화
         
         Args:
             collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+            create: 컬렉션이 없으면 생성할지 여부
+            
+        Raises:
+            CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
         """
         self.collection_name = collection_name or settings.collection_name
         self.db_path = settings.chroma_db_path
@@ -27,31 +125,154 @@ class ChromaVectorStore:
         # 디렉토리 생성
         os.makedirs(self.db_path, exist_ok=True)
         
-        # ChromaDB 클라이언트 초기화
+        # ChromaDB 클라이언트 초기화 (embedded 또는 인덱스 서버 모드)
+        self.client, self.mode = self._create_client()
+        
+        # 쓰기 잠금 및 재구축 중 변경된 ID 추적 (온라인 재구축용)
+        self._write_lock = threading.RLock()
+        self._rebuild_dirty_ids: Optional[set] = None
+        
+        # 벡터 차원 (메모리 추정 시 처음 한 번 조회)
+        self._dim: Optional[int] = None
+        
+        # 컬렉션 가져오기 또는 생성
+        self.collection = self._get_or_create_collection(create)
+        
+        # 사이드카 메타데이터 인덱스 (문서 목록/통계/문서별 조회용)
+        self.metadata_index = MetadataIndex(self.db_path, self.collection_name)
+        self._sync_metadata_index()
+        
+        # BM25 어휘 색인 (하이브리드 검색용)
+        self.lexical_index = self._open_lexical_index(
+            os.path.join(self.db_path, "lexical", self.collection_name)
+        )
+        self._sync_lexical_index()
+        
+        # 문서 중심 벡터 색인 (2단계 검색용)
+        self.centroid_index = self._open_centroid_index(
+            os.path.join(self.db_path, "centroids", self.collection_name)
+        )
+        self._sync_centroid_index()
+        
+        # 양자화 후보 인덱스 (quantized_search_mode가 "off"가 아니면 HNSW 대신 검색에 사용)
+        self.quantized_index = self._open_quantized_index()
+    
+    def _create_client(self) -> Tuple[Any, str]:
+        """
+        ChromaDB 클라이언트 생성
+        
+        server 모드에서는 로컬 인덱스 서버(app.vectorstore.server)에 HTTP로 연결하고,
+        연결할 수 없으면 chroma_server_fallback 설정에 따라 embedded 모드로 대체합니다.
+        
+        Returns:
+            (클라이언트, 실제 사용 중인 모드)
+        """
+        if settings.vector_db_mode == "server":
+            try:
+                client = create_http_client()
+                client.heartbeat()
+                logger.info(
+                    f"[ChromaVectorStore] 인덱스 서버 연결 - "
+                    f"{settings.index_server_host}:{settings.index_server_port}"
+                )
+                return client, "server"
+            except Exception as e:
+                if not settings.index_server_fallback:
+                    raise
+                logger.warning(f"[ChromaVectorStore] 인덱스 서버 연결 실패, embedded 모드로 대체: {e}")
+        
         # 텔레메트리 완전히 비활성화
         chroma_settings = ChromaSettings(
             anonymized_telemetry=False,
             allow_reset=True
         )
         
-        self.client = chromadb.PersistentClient(
+        client = chromadb.PersistentClient(
             path=self.db_path,
             settings=chroma_settings
         )
-        
-        # 컬렉션 가져오기 또는 생성
-        self.collection = self._get_or_create_collection()
+        return client, "embedded"
     
-    def _get_or_create_collection(self):
-        """컬렉션 가져오기 또는 생성"""
+    def _get_or_create_collection(self, create: bool = True):
+        """컬렉션 가져오기 또는 생성 (create가 False면 없을 때 CollectionNotFoundError)"""
         try:
             return self.client.get_collection(name=self.collection_name)
         except Exception:
+            pass
+        
+        # 재구축 교체 도중 중단되어 원본이 백업 이름으로만 남은 경우 원래 이름으로 복구
+        try:
+            backup = self.client.get_collection(name=f"{self.collection_name}__old")
+            backup.modify(name=self.collection_name)
+            logger.warning(f"[ChromaVectorStore] 재구축 중단으로 남은 백업 컬렉션 복구 - {self.collection_name}")
+            return backup
+        except Exception:
+            if not create:
+                raise CollectionNotFoundError(f"Collection not found: {self.collection_name}")
             return self.client.create_collection(
                 name=self.collection_name,
-                metadata={"description": "RAG Chatbot document collection"}
+                metadata=hnsw_metadata(self.collection_name)
+            )
+    
+    def _sync_metadata_index(self, batch_size: int = 5000) -> None:
+        """
+        사이드카 인덱스가 컬렉션과 어긋나 있으면 컬렉션에서 다시 구축
+        (기존 컬렉션에 처음 적용하거나 외부에서 컬렉션이 변경된 경우)
+        
+        Args:
+            batch_size: 한 번에 읽어올 청크 수
+        """
+        collection_count = self.collection.count()
+        if self.metadata_index.count_chunks() == collection_count:
+            return
+        
+        logger.info(
+            f"[ChromaVectorStore] 메타데이터 인덱스 재구축 - 컬렉션 {self.collection_name}, "
+            f"청크 {collection_count}개"
+        )
+        self.metadata_index.clear()
+        for offset in range(0, collection_count, batch_size):
+            results = self.collection.get(
+                include=["metadatas"],
+                limit=batch_size,
+                offset=offset
+            )
+            self.metadata_index.upsert(
+                results["ids"],
+                [metadata or {} for metadata in results["metadatas"]]
             )
     
+    def _open_quantized_index(self, batch_size: int = 1000) -> Optional[QuantizedIndex]:
+        """
+        설정에 따라 양자화 인덱스를 열고, 컬렉션과 어긋나 있으면 저장된 임베딩으로 다시 구축
+        
+        Args:
+            batch_size: 한 번에 읽어올 청크 수
+            
+        Returns:
+            양자화 인덱스 (사용하지 않으면 None)
+        """
+        if settings.quantized_search_mode == "off":
+            return None
+        if not self._process_local_files_allowed("양자화 검색"):
+            # 인덱스 서버를 공유하는 워커마다 같은 파일을 쓰게 되므로 지원하지 않음
+            return None
+        
+        index = QuantizedIndex(
+            os.path.join(self.db_path, "quantized", self.collection_name),
+            mode=settings.quantized_search_mode
+        )
+        total = self.collection.count()
+        if len(index) != total:
+            logger.info(
+                f"[ChromaVectorStore] 양자화 인덱스 재구축 - 컬렉션 {self.collection_name}, "
+                f"{index.mode}, 청크 {total}개"
+            )
+            index.clear()
+            for results in self.iter_records(batch_size=batch_size, include=["embeddings"]):
+                index.upsert(results["ids"], results["embeddings"])
+        return index
+    
     def add_documents(
         self,
         texts: List[str],
@@ -79,15 +300,136 @@ class ChromaVectorStore:
             metadatas = [{} for _ in texts]
         
         # ChromaDB에 추가
-        self.collection.add(
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        with self._write_lock:
+            self.collection.add(
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas,
+                ids=ids
+            )
+            self._index_upsert(ids, metadatas, texts)
+            if self.quantized_index is not None:
+                self.quantized_index.upsert(ids, embeddings)
+            self._mark_dirty(ids)
+        
+        return ids
+    
+    def upsert_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        문서를 벡터 스토어에 추가하거나 같은 ID가 있으면 덮어쓰기
+        
+        Args:
+            texts: 문서 텍스트 리스트
+            embeddings: 임베딩 벡터 리스트
+            metadatas: 메타데이터 리스트
+            ids: 문서 ID 리스트 (없으면 자동 생성)
+            
+        Returns:
+            저장된 문서 ID 리스트
+        """
+        if ids is None:
+            import uuid
+            ids = [str(uuid.uuid4()) for _ in texts]
+        
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+        
+        # ChromaDB에 upsert (기존 ID는 갱신, 새 ID는 추가)
+        with self._write_lock:
+            self.collection.upsert(
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas,
+                ids=ids
+            )
+            self._index_upsert(ids, metadatas, texts)
+            if self.quantized_index is not None:
+                self.quantized_index.upsert(ids, embeddings)
+            self._mark_dirty(ids)
         
         return ids
     
+    @staticmethod
+    def _rows_from_results(results: Dict[str, Any], include: List[str]) -> List[Dict[str, Any]]:
+        """
+        collection.get 결과를 청크 딕셔너리 리스트로 변환
+        
+        Args:
+            results: collection.get 결과
+            include: 조회한 필드 ("documents", "metadatas", "embeddings")
+            
+        Returns:
+            청크 리스트 (id + include에 따라 text, metadata, embedding)
+        """
+        rows = []
+        for i, doc_id in enumerate(results["ids"]):
+            row = {"id": doc_id}
+            if "documents" in include:
+                row["text"] = results["documents"][i] if results["documents"] else ""
+            if "metadatas" in include:
+                row["metadata"] = results["metadatas"][i] if results["metadatas"] else {}
+            if "embeddings" in include:
+                row["embedding"] = results["embeddings"][i] if results["embeddings"] is not None else None
+            rows.append(row)
+        return rows
+    
+    def get_by_ids(
+        self,
+        ids: List[str],
+        include: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        청크 ID로 청크 조회 (요청한 ID 순서 유지, 없는 ID는 제외)
+        
+        Args:
+            ids: 청크 ID 리스트
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            청크 리스트 (id + include에 따라 text, metadata, embedding)
+        """
+        if not ids:
+            return []
+        
+        include = include if include is not None else DEFAULT_INCLUDE
+        results = self.collection.get(ids=ids, include=include)
+        by_id = {row["id"]: row for row in self._rows_from_results(results, include)}
+        return [by_id[chunk_id] for chunk_id in ids if chunk_id in by_id]
+    
+    def get(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        메타데이터 필터/limit/offset을 ChromaDB에 그대로 전달하여 청크 조회
+        
+        Args:
+            where: 메타데이터 필터 (예: {"document_id": "doc-1"})
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            청크 리스트 (id + include에 따라 text, metadata, embedding)
+        """
+        include = include if include is not None else DEFAULT_INCLUDE
+        results = self.collection.get(
+            where=where or None,
+            limit=limit,
+            offset=offset,
+            include=include
+        )
+        return self._rows_from_results(results, include)
+    
     def search(
         self,
         query_embedding: List[float],
@@ -105,39 +447,121 @@ class ChromaVectorStore:
         Returns:
             검색 결과 딕셔너리 (documents, distances, metadatas, ids)
         """
+        return self.search_many([query_embedding], n_results=n_results, filter_metadata=filter_metadata)[0]
+    
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: int = 256
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 쿼리를 한 번의 collection.query 호출로 검색
+        
+        Args:
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_results: 쿼리당 반환할 결과 수
+            filter_metadata: 메타데이터 필터 (모든 쿼리에 공통 적용)
+            batch_size: 한 번의 query 호출에 보낼 최대 쿼리 수
+            
+        Returns:
+            쿼리 순서대로 검색 결과 딕셔너리 리스트 (documents, distances, metadatas, ids)
+        """
+        if self.quantized_index is not None:
+            return self._quantized_search_many(query_embeddings, n_results, filter_metadata)
+        
         where = filter_metadata if filter_metadata else None
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            where=where
-        )
+        all_results = []
+        for start in range(0, len(query_embeddings), batch_size):
+            batch = query_embeddings[start:start + batch_size]
+            results = self.collection.query(
+                query_embeddings=batch,
+                n_results=n_results,
+                where=where
+            )
+            for i in range(len(batch)):
+                all_results.append({
+                    "documents": results["documents"][i] if results["documents"] else [],
+                    "distances": results["distances"][i] if results["distances"] else [],
+                    "metadatas": results["metadatas"][i] if results["metadatas"] else [],
+                    "ids": results["ids"][i] if results["ids"] else []
+                })
         
-        return {
-            "documents": results["documents"][0] if results["documents"] else [],
-            "distances": results["distances"][0] if results["distances"] else [],
-            "metadatas": results["metadatas"][0] if results["metadatas"] else [],
-            "ids": results["ids"][0] if results["ids"] else []
-        }
+        return all_results
     
-    def get_all_documents(self) -> List[Dict[str, Any]]:
+    def _quantized_search_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        모든 문서 조회
+        양자화 인덱스로 후보를 뽑아 float32 벡터로 재채점한 뒤 본문/메타데이터를 한 번에 조회
         
+        Args:
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_results: 쿼리당 반환할 결과 수
+            filter_metadata: 메타데이터 필터 (사이드카 인덱스로 대상 행을 제한)
+            
         Returns:
-            문서 리스트
+            search_many와 같은 형식의 검색 결과 리스트
         """
-        results = self.collection.get()
+        allowed_mask = None
+        if filter_metadata:
+            allowed_mask = self.quantized_index.matrix.mask_for(
+                self.metadata_index.find_chunk_ids(filter_metadata)
+            )
         
-        documents = []
-        for i, doc_id in enumerate(results["ids"]):
-            documents.append({
-                "id": doc_id,
-                "text": results["documents"][i] if results["documents"] else "",
-                "metadata": results["metadatas"][i] if results["metadatas"] else {}
-            })
+        hits = self.quantized_index.search_many(
+            np.asarray(query_embeddings, dtype=np.float32),
+            n_results=n_results,
+            space=self.get_index_params()["space"],
+            allowed_mask=allowed_mask,
+            oversample=settings.quantized_oversample
+        )
+        
+        unique_ids = list(dict.fromkeys(chunk_id for ids, _ in hits for chunk_id in ids))
+        rows = {row["id"]: row for row in self.get_by_ids(unique_ids)}
         
-        return documents
+        all_results = []
+        for ids, distances in hits:
+            result = {"documents": [], "distances": [], "metadatas": [], "ids": []}
+            for chunk_id, distance in zip(ids, distances):
+                row = rows.get(chunk_id)
+                if row is None:
+                    continue
+                result["documents"].append(row["text"])
+                result["distances"].append(distance)
+                result["metadatas"].append(row["metadata"])
+                result["ids"].append(chunk_id)
+            all_results.append(result)
+        return all_results
+    
+    def quantization_stats(self, recall_queries: int = 0, k: int = 10) -> Dict[str, Any]:
+        """
+        양자화 인덱스 메모리 사용량과 (선택적으로) 정확 검색 대비 recall@k
+        
+        Args:
+            recall_queries: recall 측정에 사용할 쿼리 수 (0이면 측정하지 않음)
+            k: recall 기준 top-k
+            
+        Returns:
+            통계 딕셔너리 (양자화를 사용하지 않으면 {"mode": "off"})
+        """
+        if self.quantized_index is None:
+            return {"mode": "off"}
+        stats = self.quantized_index.stats()
+        stats["oversample"] = settings.quantized_oversample
+        if recall_queries > 0:
+            stats["recall"] = self.quantized_index.evaluate_recall(
+                num_queries=recall_queries,
+                k=k,
+                space=self.get_index_params()["space"],
+                oversample=settings.quantized_oversample
+            )
+        return stats
     
     def delete_documents(self, ids: List[str]) -> bool:
         """
@@ -150,7 +574,12 @@ class ChromaVectorStore:
             성공 여부
         """
         try:
-            self.collection.delete(ids=ids)
+            with self._write_lock:
+                self.collection.delete(ids=ids)
+                self._index_delete(ids)
+                if self.quantized_index is not None:
+                    self.quantized_index.delete(ids)
+                self._mark_dirty(ids)
             return True
         except Exception as e:
             print(f"Error deleting documents: {e}")
@@ -173,10 +602,15 @@ class ChromaVectorStore:
             성공 여부
         """
         try:
-            # 모든 문서 ID 가져오기
-            all_ids = self.collection.get()["ids"]
-            if all_ids:
-                self.collection.delete(ids=all_ids)
+            with self._write_lock:
+                # 모든 문서 ID 가져오기 (본문/메타데이터는 읽지 않음)
+                all_ids = self.collection.get(include=[])["ids"]
+                if all_ids:
+                    self.collection.delete(ids=all_ids)
+                self._index_clear()
+                if self.quantized_index is not None:
+                    self.quantized_index.clear()
+                self._mark_dirty(all_ids)
             return True
         except Exception as e:
             print(f"Error deleting all documents: {e}")
@@ -191,11 +625,268 @@ class ChromaVectorStore:
         """
         try:
             self.client.delete_collection(name=self.collection_name)
+            self._index_clear()
+            if self.quantized_index is not None:
+                self.quantized_index.clear()
             # 컬렉션 재생성
             self.collection = self._get_or_create_collection()
             return True
         except Exception as e:
             print(f"Error deleting collection: {e}")
             return False
-
-
+    
+    def estimate_memory_bytes(self) -> int:
+        """
+        이 컬렉션의 검색 인덱스 메모리 추정 (컬렉션 LRU 기준)
+        
+        양자화 검색을 사용하면 양자화 코드 크기, 아니면 HNSW 인덱스
+        (벡터 float32 + 노드당 링크 2M개) 크기로 추정합니다.
+        
+        Returns:
+            추정 바이트 수
+        """
+        if self.quantized_index is not None:
+            return self.quantized_index.stats()["quantized_bytes"]
+        count = self.collection.count()
+        if count == 0:
+            return 0
+        if self._dim is None:
+            sample = self.collection.get(limit=1, include=["embeddings"])
+            if not sample["ids"]:
+                return 0
+            self._dim = len(sample["embeddings"][0])
+        return count * (self._dim * 4 + self.get_index_params()["m"] * 2 * 4)
+    
+    def release(self) -> None:
+        """
+        컬렉션 LRU에서 내보낼 때 사이드카 인덱스 파일 핸들과 ChromaDB가 메모리에 올린 세그먼트(HNSW 인덱스) 해제
+        
+        세그먼트 해제는 embedded 모드에서만 동작하며, 다음 접근 시 ChromaDB가 디스크에서 다시 로드합니다.
+        (ChromaDB 0.4.x는 세그먼트를 직접 내리는 API가 없어 세그먼트 매니저 캐시에서 제거,
+        requirements.txt의 chromadb==0.4.18 내부 구조에 의존하므로 구조가 다르면 해제하지 않고 경고만 남김)
+        """
+        with self._write_lock:
+            self._close_sidecar_indexes()
+            if self.quantized_index is not None:
+                self.quantized_index.close()
+        
+        if self.mode != "embedded":
+            return
+        manager = getattr(getattr(self.client, "_server", None), "_manager", None)
+        if manager is None or not all(
+            hasattr(manager, name) for name in ("_lock", "_segment_cache", "_instances")
+        ):
+            logger.warning(
+                f"[ChromaVectorStore] 세그먼트 매니저 내부 구조를 찾을 수 없어 컬렉션 세그먼트를 해제하지 않습니다 "
+                f"- {self.collection_name} (chromadb {chromadb.__version__}, 0.4.18 기준으로 작성됨)"
+            )
+            return
+        collection_id = self.collection.id
+        with self._write_lock, manager._lock:
+            segments = manager._segment_cache.pop(collection_id, {})
+            file_handle_cache = getattr(manager, "_vector_instances_file_handle_cache", None)
+            if file_handle_cache is not None:
+                file_handle_cache.cache.pop(collection_id, None)
+            for segment in segments.values():
+                instance = manager._instances.pop(segment["id"], None)
+                if instance is None:
+                    continue
+                instance.stop()
+                if hasattr(instance, "close_persistent_index"):
+                    instance.close_persistent_index()
+        logger.info(f"[ChromaVectorStore] 컬렉션 세그먼트 해제 - {self.collection_name}")
+    
+    def _mark_dirty(self, ids: List[str]) -> None:
+        """재구축 진행 중이면 변경된 ID 기록 (마지막 단계에서 다시 복사)"""
+        if self._rebuild_dirty_ids is not None:
+            self._rebuild_dirty_ids.update(ids)
+    
+    def get_index_params(self) -> Dict[str, Any]:
+        """
+        현재 컬렉션의 HNSW 인덱스 설정 조회
+        
+        Returns:
+            인덱스 설정 딕셔너리 (space, m, construction_ef, search_ef)
+        """
+        metadata = self.collection.metadata or {}
+        return {
+            "space": metadata.get("hnsw:space", "l2"),
+            "m": metadata.get("hnsw:M", 16),
+            "construction_ef": metadata.get("hnsw:construction_ef", 100),
+            "search_ef": metadata.get("hnsw:search_ef", 10),
+        }
+    
+    def iter_records(
+        self,
+        batch_size: int = 1000,
+        include: Optional[List[str]] = None,
+        collection: Optional[Any] = None
+    ):
+        """
+        컬렉션 전체를 배치 단위로 순회
+        
+        Args:
+            batch_size: 배치당 청크 수
+            include: 조회할 필드 (기본값: ["documents", "metadatas", "embeddings"])
+            collection: 순회할 컬렉션 (기본값: 현재 컬렉션)
+            
+        Yields:
+            collection.get 결과 딕셔너리 (ids, documents, metadatas, embeddings)
+        """
+        include = include if include is not None else ["documents", "metadatas", "embeddings"]
+        collection = collection or self.collection
+        offset = 0
+        while True:
+            results = collection.get(include=include, limit=batch_size, offset=offset)
+            if not results["ids"]:
+                break
+            yield results
+            offset += len(results["ids"])
+    
+    def _copy_ids(self, target, ids: List[str], batch_size: int) -> int:
+        """현재 컬렉션의 지정한 ID들을 대상 컬렉션으로 복사 (없는 ID는 대상에서도 삭제)"""
+        copied = 0
+        for start in range(0, len(ids), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            results = self.collection.get(
+                ids=batch_ids,
+                include=["documents", "metadatas", "embeddings"]
+            )
+            if results["ids"]:
+                target.upsert(
+                    ids=results["ids"],
+                    embeddings=results["embeddings"],
+                    documents=results["documents"],
+                    metadatas=results["metadatas"]
+                )
+                copied += len(results["ids"])
+            missing = set(batch_ids) - set(results["ids"])
+            if missing:
+                target.delete(ids=list(missing))
+        return copied
+    
+    def rebuild_index(
+        self,
+        space: Optional[str] = None,
+        m: Optional[int] = None,
+        construction_ef: Optional[int] = None,
+        search_ef: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        다른 HNSW 설정으로 컬렉션을 온라인 재구축
+        
+        시작 시점의 전체 청크 ID 목록을 먼저 확보하고, 그 ID로 새 설정의 임시
+        컬렉션에 임베딩을 그대로 복사하는 동안 기존 컬렉션은 계속 검색/쓰기를
+        처리합니다 (오프셋 페이지 조회는 동시 삭제 시 행을 건너뛸 수 있음).
+        복사 중 변경된 ID는 마지막에 쓰기 잠금을 잡은 상태로 다시 복사한 뒤,
+        새 컬렉션으로 교체하고 원래 이름으로 바꿉니다.
+        
+        교체는 기존 컬렉션을 백업 이름({컬렉션}__old)으로 옮긴 뒤 새 컬렉션의 이름을 바꾸고,
+        성공한 뒤에만 백업을 삭제합니다 (이름 변경이 실패하면 기존 컬렉션을 되돌림).
+        
+        다른 프로세스가 들고 있는 컬렉션 핸들은 교체를 알 수 없으므로, 인덱스 서버 모드나
+        멀티 워커(settings.web_concurrency > 1)에서는 재구축하지 않습니다.
+        
+        거리 공간을 바꾸면(예: 기존 l2 컬렉션 -> cosine) 검색 거리 값의 범위가 달라지므로
+        similarity_threshold, relevance_gap 등 거리 기준 설정도 새 공간에 맞게 다시 정해야 합니다.
+        
+        Args:
+            space: 거리 공간 ("cosine", "l2", "ip")
+            m: 노드당 연결 수
+            construction_ef: 구축 시 탐색 폭
+            search_ef: 검색 시 탐색 폭
+            batch_size: 복사 배치 크기
+            
+        Returns:
+            재구축 결과 (copied, seconds, old_params, new_params)
+            
+        Raises:
+            ValueError: 인덱스 서버 모드이거나 멀티 워커로 실행 중인 경우
+        """
+        if self.mode == "server" or settings.web_concurrency > 1:
+            raise ValueError(
+                "Online index rebuild is only supported in embedded mode with a single worker "
+                "(other processes would keep handles to the replaced collection)"
+            )
+        
+        started = time.perf_counter()
+        old_params = self.get_index_params()
+        temp_name = f"{self.collection_name}__rebuild"
+        backup_name = f"{self.collection_name}__old"
+        
+        # 이전 재구축이 중단되어 남은 임시/백업 컬렉션 정리 (원본은 생성 시 백업에서 복구됨)
+        for name in (temp_name, backup_name):
+            try:
+                self.client.delete_collection(name=name)
+            except Exception:
+                pass
+        
+        metadata = hnsw_metadata(
+            self.collection_name,
+            space=space or old_params["space"],
+            m=m or old_params["m"],
+            construction_ef=construction_ef or old_params["construction_ef"],
+            search_ef=search_ef or old_params["search_ef"]
+        )
+        target = self.client.create_collection(name=temp_name, metadata=metadata)
+        
+        # 변경 추적 시작과 같은 시점에 ID 목록 확보 (이후 변경분은 모두 dirty로 기록됨)
+        with self._write_lock:
+            self._rebuild_dirty_ids = set()
+            snapshot_ids = self.metadata_index.find_chunk_ids()
+        
+        try:
+            # 1. 잠금 없이 확보한 ID 목록 복사 (기존 컬렉션은 계속 서비스)
+            copied = self._copy_ids(target, snapshot_ids, batch_size)
+            
+            # 2. 쓰기 잠금 후 복사 중 변경분 반영 및 교체
+            with self._write_lock:
+                dirty_ids = sorted(self._rebuild_dirty_ids)
+                self._rebuild_dirty_ids = None
+                if dirty_ids:
+                    self._copy_ids(target, dirty_ids, batch_size)
+                
+                # 기존 컬렉션을 백업 이름으로 옮긴 뒤 새 컬렉션 이름 변경 (실패하면 되돌림)
+                old_collection = self.collection
+                old_collection.modify(name=backup_name)
+                try:
+                    target.modify(name=self.collection_name)
+                except Exception:
+                    old_collection.modify(name=self.collection_name)
+                    raise
+                self.collection = target
+        except Exception:
+            with self._write_lock:
+                self._rebuild_dirty_ids = None
+            if self.collection is not target:
+                try:
+                    self.client.delete_collection(name=temp_name)
+                except Exception:
+                    pass
+            raise
+        
+        try:
+            self.client.delete_collection(name=backup_name)
+        except Exception as e:
+            logger.warning(f"[ChromaVectorStore] 재구축 후 백업 컬렉션 삭제 실패 - {backup_name}: {e}")
+        
+        # 거리 공간이 바뀌면 중심 벡터도 새 공간 기준으로 다시 계산
+        if self.centroid_index is not None and self.centroid_index.space != self.get_index_params()["space"]:
+            self.centroid_index.space = self.get_index_params()["space"]
+            self.rebuild_document_centroids(batch_size=batch_size)
+        
+        seconds = time.perf_counter() - started
+        logger.info(
+            f"[ChromaVectorStore] 인덱스 재구축 완료 - 컬렉션 {self.collection_name}, "
+            f"청크 {copied}개, {seconds:.1f}초, {old_params} -> {self.get_index_params()}"
+        )
+        
+        return {
+            "collection_name": self.collection_name,
+            "copied": copied,
+            "changed_during_rebuild": len(dirty_ids),
+            "seconds": round(seconds, 3),
+            "old_params": old_params,
+            "new_params": self.get_index_params()
+        }
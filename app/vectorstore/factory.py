@@ -0,0 +1,54 @@
+"""
+벡터 스토어 생성
+settings.vector_db_type 에 따라 백엔드 선택
+"""
+from typing import Optional, Union
+from app.config import settings
+from app.vectorstore.chroma import ChromaVectorStore
+from app.vectorstore.numpy_store import NumpyVectorStore
+from app.vectorstore.registry import CollectionRegistry
+
+VectorStore = Union[ChromaVectorStore, NumpyVectorStore]
+
+
+def open_vectorstore(collection_name: Optional[str] = None, create: bool = True) -> VectorStore:
+    """
+    설정된 백엔드의 벡터 스토어를 새로 열기 (캐시하지 않음)
+    
+    Args:
+        collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+        create: 컬렉션이 없으면 생성할지 여부
+        
+    Returns:
+        벡터 스토어 인스턴스
+        
+    Raises:
+        ValueError: 지원하지 않는 vector_db_type인 경우
+        CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
+    """
+    backend = settings.vector_db_type.lower()
+    if backend == "chroma":
+        return ChromaVectorStore(collection_name=collection_name, create=create)
+    if backend == "numpy":
+        return NumpyVectorStore(collection_name=collection_name, create=create)
+    raise ValueError(f"Unsupported vector_db_type: {settings.vector_db_type} (expected 'chroma' or 'numpy')")
+
+
+# 프로세스 내 열린 컬렉션 LRU (행렬/어휘 색인 등 메모리 상태를 라우터 간에 공유)
+collection_registry = CollectionRegistry(open_vectorstore)
+
+
+def create_vectorstore(collection_name: Optional[str] = None) -> VectorStore:
+    """
+    설정된 백엔드의 벡터 스토어 반환 (없으면 생성, 같은 백엔드/컬렉션은 하나의 인스턴스를 공유)
+    
+    Args:
+        collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+        
+    Returns:
+        벡터 스토어 인스턴스
+        
+    Raises:
+        ValueError: 지원하지 않는 vector_db_type인 경우
+    """
+    return collection_registry.get(collection_name, create=True)
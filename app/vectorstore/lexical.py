@@ -0,0 +1,510 @@
+"""
+BM25 역색인 (어휘 검색)
+API 이름, 설정 키, 오류 코드처럼 정확한 용어가 중요한 질의를 위한 색인
+
+저장 구조:
+    - 기본 세그먼트: 용어별 포스팅(행 번호, 빈도)을 int32/uint16 배열로 이어 붙여 .npy로 저장하고 mmap으로 읽음
+    - 델타: 기본 세그먼트 이후 추가/삭제는 메모리 딕셔너리 + 추가 전용 로그(delta.jsonl)에 기록
+    - 델타가 커지면 백그라운드 스레드에서 기본 세그먼트와 병합하여 새 세대(gen_N 디렉토리)로 교체
+      (병합하는 동안의 변경은 교체 후 다시 적용, CURRENT 파일을 원자적으로 교체)
+    - 검색은 잠금을 잡은 동안 세그먼트/델타 참조만 확보하고 점수 계산은 잠금 밖에서 수행
+"""
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 영문/숫자 식별자 (점, 하이픈, 슬래시, 콜론으로 이어진 경우 하나로) 또는 한글 연속 문자열
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_]+(?:[.\-/:][A-Za-z0-9_]+)*|[가-힣]+")
+SUBWORD_SPLIT = re.compile(r"[._\-/:]+")
+CAMEL_PARTS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def _is_hangul(char: str) -> bool:
+    return "가" <= char <= "힣"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어/식별자 인식 토크나이저
+    
+    - 한글: 문자 bigram (조사/어미가 붙어도 어간 부분이 일치하도록)
+    - 영문/숫자: 소문자 전체 토큰 + 구분자(_ . - / :)와 camelCase 기준 하위 토큰
+      (예: "ingest_batch_size" -> ingest_batch_size, ingest, batch, size)
+      
+    Args:
+        text: 입력 텍스트
+        
+    Returns:
+        토큰 리스트
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        word = match.group(0)
+        if _is_hangul(word[0]):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+        
+        lower = word.lower()
+        tokens.append(lower)
+        parts = set(SUBWORD_SPLIT.split(lower))
+        parts.update(part.lower() for part in CAMEL_PARTS.findall(word))
+        parts.discard(lower)
+        parts.discard("")
+        tokens.extend(sorted(parts))
+    return tokens
+
+
+def is_identifier_query(query: str) -> bool:
+    """
+    식별자 형태의 질의인지 판단 (어휘 검색만으로 충분한 경우)
+    
+    공백 없는 단일 토큰이면서 구분자(snake_case, 점/하이픈/슬래시/콜론 구분)가 있거나
+    대소문자가 섞인 경우(camelCase, CamelCase)
+    ("API", "JWT" 같은 약어나 "E1001" 같은 단어는 일반 질문에도 흔하므로 하이브리드 검색을 사용)
+    
+    Args:
+        query: 사용자 질의
+        
+    Returns:
+        식별자 형태 여부
+    """
+    stripped = query.strip().strip("`'\"")
+    if not stripped or not TOKEN_PATTERN.fullmatch(stripped) or _is_hangul(stripped[0]):
+        return False
+    
+    has_separator = bool(re.search(r"[._\-/:]", stripped))
+    is_camel = bool(re.search(r"[a-z][A-Z]", stripped))
+    return has_separator or is_camel
+
+
+class LexicalIndex:
+    """BM25 역색인 (mmap 기본 세그먼트 + 델타 로그)"""
+    
+    def __init__(
+        self,
+        directory: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+        compact_min_docs: int = 5000
+    ):
+        """
+        역색인 열기 (기존 세그먼트와 델타 로그가 있으면 불러옴)
+        
+        Args:
+            directory: 색인 파일 디렉토리
+            k1: BM25 용어 빈도 포화 계수
+            b: BM25 문서 길이 정규화 계수
+            compact_min_docs: 델타 문서 수가 이 값과 기본 세그먼트의 25% 중 큰 값을 넘으면 병합
+        """
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.compact_min_docs = compact_min_docs
+        self._lock = threading.RLock()
+        # 병합은 한 번에 하나만 실행하며, 병합 중의 변경은 _pending에 모아 교체 후 다시 적용
+        self._compact_lock = threading.Lock()
+        self._compact_scheduled = False
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+    
+    def _gen_dir(self, generation: int) -> str:
+        return os.path.join(self.directory, f"gen_{generation}")
+    
+    def _load(self) -> None:
+        """현재 세대의 기본 세그먼트를 mmap으로 열고 델타 로그 재생"""
+        current_path = os.path.join(self.directory, "CURRENT")
+        self.generation = 0
+        if os.path.exists(current_path):
+            with open(current_path, "r", encoding="utf-8") as f:
+                self.generation = int(f.read().strip() or 0)
+        
+        gen_dir = self._gen_dir(self.generation)
+        os.makedirs(gen_dir, exist_ok=True)
+        meta_path = os.path.join(gen_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._base_terms: Dict[str, List[int]] = meta["terms"]
+            base_ids: List[str] = meta["ids"]
+            self._base_rows = np.load(os.path.join(gen_dir, "postings.npy"), mmap_mode="r")
+            self._base_tfs = np.load(os.path.join(gen_dir, "tfs.npy"), mmap_mode="r")
+            base_doclen = np.load(os.path.join(gen_dir, "doclen.npy"))
+        else:
+            self._base_terms = {}
+            base_ids = []
+            self._base_rows = np.zeros(0, dtype=np.int32)
+            self._base_tfs = np.zeros(0, dtype=np.uint16)
+            base_doclen = np.zeros(0, dtype=np.int32)
+        
+        self._base_size = len(base_ids)
+        self._ids: List[Optional[str]] = list(base_ids)
+        self._row_of: Dict[str, int] = {chunk_id: row for row, chunk_id in enumerate(base_ids)}
+        self._doclen = np.zeros(max(len(base_ids), 1024), dtype=np.int32)
+        self._doclen[:len(base_ids)] = base_doclen
+        self._live = np.zeros(len(self._doclen), dtype=bool)
+        self._live[:len(base_ids)] = True
+        self._total_len = int(base_doclen.sum())
+        
+        # 델타: 용어 -> {행: 빈도}, 행 -> {용어: 빈도}
+        self._delta: Dict[str, Dict[int, int]] = {}
+        self._delta_docs: Dict[int, Dict[str, int]] = {}
+        
+        self._log_path = os.path.join(gen_dir, "delta.jsonl")
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 마지막 줄이 기록 도중 중단된 경우
+                        continue
+                    if entry["op"] == "add":
+                        self._apply_add(entry["id"], entry["tf"])
+                    elif entry["op"] == "del":
+                        self._apply_delete(entry["id"])
+        self._log = open(self._log_path, "a", encoding="utf-8")
+    
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        """델타 로그에 기록 후 디스크에 반영 (병합 중이면 교체 후 다시 적용하도록 보관)"""
+        for entry in entries:
+            self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        if self._pending is not None:
+            self._pending.extend(entries)
+    
+    def _apply_add(self, chunk_id: str, term_freqs: Dict[str, int]) -> None:
+        """문서 하나를 델타에 추가 (기존 ID는 먼저 삭제)"""
+        if chunk_id in self._row_of:
+            self._apply_delete(chunk_id)
+        
+        row = len(self._ids)
+        if row >= len(self._doclen):
+            grown = max(len(self._doclen) * 2, 1024)
+            self._doclen = np.concatenate([self._doclen, np.zeros(grown - len(self._doclen), dtype=np.int32)])
+            self._live = np.concatenate([self._live, np.zeros(grown - len(self._live), dtype=bool)])
+        
+        length = sum(term_freqs.values())
+        self._ids.append(chunk_id)
+        self._row_of[chunk_id] = row
+        self._doclen[row] = length
+        self._live[row] = True
+        self._total_len += length
+        self._delta_docs[row] = term_freqs
+        for term, tf in term_freqs.items():
+            self._delta.setdefault(term, {})[row] = tf
+    
+    def _apply_delete(self, chunk_id: str) -> None:
+        """문서 삭제 (기본 세그먼트 문서는 삭제 표시만, 병합 시 제거)"""
+        row = self._row_of.pop(chunk_id, None)
+        if row is None:
+            return
+        self._live[row] = False
+        self._total_len -= int(self._doclen[row])
+        self._ids[row] = None
+        term_freqs = self._delta_docs.pop(row, None)
+        if term_freqs:
+            for term in term_freqs:
+                postings = self._delta.get(term)
+                if postings is not None:
+                    postings.pop(row, None)
+                    if not postings:
+                        del self._delta[term]
+    
+    def upsert(self, ids: List[str], texts: List[str]) -> None:
+        """
+        문서 추가 또는 갱신
+        
+        Args:
+            ids: 청크 ID 리스트
+            texts: 청크 본문 리스트
+        """
+        entries = [
+            {"op": "add", "id": chunk_id, "tf": dict(Counter(tokenize(text or "")))}
+            for chunk_id, text in zip(ids, texts)
+        ]
+        with self._lock:
+            self._append_log(entries)
+            for entry in entries:
+                self._apply_add(entry["id"], entry["tf"])
+            self._maybe_compact()
+    
+    def delete(self, ids: List[str]) -> None:
+        """
+        문서 삭제
+        
+        Args:
+            ids: 청크 ID 리스트
+        """
+        with self._lock:
+            entries = [{"op": "del", "id": chunk_id} for chunk_id in ids if chunk_id in self._row_of]
+            if not entries:
+                return
+            self._append_log(entries)
+            for entry in entries:
+                self._apply_delete(entry["id"])
+    
+    def clear(self) -> None:
+        """모든 문서 삭제 (빈 새 세대로 교체)"""
+        with self._lock:
+            self._switch_generation(None)
+    
+    def __len__(self) -> int:
+        return len(self._row_of)
+    
+    def _maybe_compact(self) -> None:
+        """델타가 충분히 커졌으면 백그라운드 스레드에서 기본 세그먼트와 병합 (잠금을 잡은 상태로 호출)"""
+        if self._compact_scheduled or len(self._delta_docs) <= max(self.compact_min_docs, self._base_size // 4):
+            return
+        self._compact_scheduled = True
+        threading.Thread(target=self._background_compact, name="lexical-compact", daemon=True).start()
+    
+    def _background_compact(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"[LexicalIndex] 백그라운드 병합 실패 - {self.directory}: {e}")
+        finally:
+            with self._lock:
+                self._compact_scheduled = False
+    
+    def compact(self) -> None:
+        """
+        기본 세그먼트 + 델타를 병합하여 새 세대로 교체 (삭제된 문서 제거)
+        
+        병합 대상은 잠금을 잡은 동안 확보하고, 새 세그먼트 계산과 파일 쓰기는 잠금 밖에서 하므로
+        그동안 검색과 추가/삭제는 계속 처리됩니다. 그 사이의 변경은 교체 후 다시 적용합니다.
+        """
+        with self._compact_lock:
+            with self._lock:
+                if self._closed:
+                    return
+                generation = self.generation
+                size = len(self._ids)
+                ids = list(self._ids)
+                live = self._live[:size].copy()
+                doclen = self._doclen[:size].copy()
+                base_terms = self._base_terms
+                base_rows_all = self._base_rows
+                base_tfs_all = self._base_tfs
+                delta_docs = dict(self._delta_docs)
+                self._pending = []
+            
+            try:
+                segment = self._build_segment(ids, live, doclen, base_terms, base_rows_all, base_tfs_all, delta_docs)
+                tmp_dir = os.path.join(self.directory, "compact.tmp")
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                self._write_segment(tmp_dir, segment)
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+            
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if self._closed or self.generation != generation:
+                    # 병합하는 동안 색인이 비워졌거나 닫힘
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    return
+                self._switch_generation(tmp_dir, replay=pending)
+                logger.info(
+                    f"[LexicalIndex] 병합 완료 - 세대 {self.generation}, "
+                    f"문서 {len(segment['ids'])}개, 용어 {len(segment['terms'])}개, 병합 중 변경 {len(pending)}건"
+                )
+    
+    @staticmethod
+    def _build_segment(
+        ids: List[Optional[str]],
+        live: np.ndarray,
+        doclen: np.ndarray,
+        base_terms: Dict[str, List[int]],
+        base_rows_all: np.ndarray,
+        base_tfs_all: np.ndarray,
+        delta_docs: Dict[int, Dict[str, int]]
+    ) -> Dict[str, Any]:
+        """확보한 기본 세그먼트/델타에서 삭제된 문서를 제외한 새 세그먼트 계산"""
+        live_rows = np.flatnonzero(live)
+        new_row = np.full(len(ids), -1, dtype=np.int64)
+        new_row[live_rows] = np.arange(len(live_rows))
+        
+        delta_terms: Dict[str, Dict[int, int]] = {}
+        for row, term_freqs in delta_docs.items():
+            if row < len(ids) and live[row]:
+                for term, tf in term_freqs.items():
+                    delta_terms.setdefault(term, {})[row] = tf
+        
+        terms = {}
+        postings_parts = []
+        tfs_parts = []
+        offset = 0
+        for term in sorted(set(base_terms) | set(delta_terms)):
+            rows_part = []
+            tfs_part = []
+            if term in base_terms:
+                start, count = base_terms[term]
+                base_rows = new_row[np.asarray(base_rows_all[start:start + count])]
+                keep = base_rows >= 0
+                rows_part.append(base_rows[keep])
+                tfs_part.append(np.asarray(base_tfs_all[start:start + count])[keep])
+            delta = delta_terms.get(term)
+            if delta:
+                rows_part.append(new_row[np.fromiter(delta.keys(), dtype=np.int64, count=len(delta))])
+                tfs_part.append(np.fromiter(delta.values(), dtype=np.int64, count=len(delta)))
+            rows = np.concatenate(rows_part) if rows_part else np.zeros(0, dtype=np.int64)
+            if len(rows) == 0:
+                continue
+            terms[term] = [offset, len(rows)]
+            postings_parts.append(rows.astype(np.int32))
+            tfs_parts.append(np.minimum(np.concatenate(tfs_part), np.iinfo(np.uint16).max).astype(np.uint16))
+            offset += len(rows)
+        
+        return {
+            "terms": terms,
+            "ids": [ids[row] for row in live_rows],
+            "postings": np.concatenate(postings_parts) if postings_parts else np.zeros(0, dtype=np.int32),
+            "tfs": np.concatenate(tfs_parts) if tfs_parts else np.zeros(0, dtype=np.uint16),
+            "doclen": doclen[live_rows].astype(np.int32),
+        }
+    
+    @staticmethod
+    def _write_segment(directory: str, segment: Optional[Dict[str, Any]]) -> None:
+        """세그먼트 파일 쓰기 (segment가 None이면 빈 디렉토리)"""
+        os.makedirs(directory)
+        if segment is None:
+            return
+        np.save(os.path.join(directory, "postings.npy"), segment["postings"])
+        np.save(os.path.join(directory, "tfs.npy"), segment["tfs"])
+        np.save(os.path.join(directory, "doclen.npy"), segment["doclen"])
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"terms": segment["terms"], "ids": segment["ids"]}, f, ensure_ascii=False)
+    
+    def _switch_generation(self, segment_dir: Optional[str], replay: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        세그먼트 디렉토리를 새 세대로 옮기고 CURRENT를 원자적으로 교체한 뒤 다시 로드 (잠금을 잡은 상태로 호출)
+        
+        Args:
+            segment_dir: 새 세그먼트 디렉토리 (None이면 빈 세대)
+            replay: 새 세대의 델타로 다시 적용할 로그 항목
+        """
+        old_generation = self.generation
+        new_generation = old_generation + 1
+        gen_dir = self._gen_dir(new_generation)
+        shutil.rmtree(gen_dir, ignore_errors=True)
+        if segment_dir is None:
+            self._write_segment(gen_dir, None)
+        else:
+            os.replace(segment_dir, gen_dir)
+        if replay:
+            # 새 세대의 델타 로그로 기록해 두면 아래 _load()에서 적용됨 (교체 직후 중단되어도 유실되지 않음)
+            with open(os.path.join(gen_dir, "delta.jsonl"), "w", encoding="utf-8") as f:
+                for entry in replay:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        
+        tmp_path = os.path.join(self.directory, "CURRENT.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(new_generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, "CURRENT"))
+        
+        self._log.close()
+        self._load()
+        shutil.rmtree(self._gen_dir(old_generation), ignore_errors=True)
+    
+    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25 검색
+        
+        Args:
+            query: 질의 텍스트
+            n_results: 반환할 결과 수
+            
+        Returns:
+            결과 리스트 (id, score), 점수 내림차순
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        
+        # 잠금 동안에는 참조와 델타 포스팅만 확보 (기본 세그먼트는 세대마다 불변, 행 번호는 세대 안에서 고정)
+        with self._lock:
+            num_docs = len(self._row_of)
+            if num_docs == 0:
+                return []
+            avg_len = max(self._total_len / num_docs, 1.0)
+            size = len(self._ids)
+            ids = self._ids
+            doclen = self._doclen[:size]
+            live = self._live[:size]
+            base_rows_all = self._base_rows
+            base_tfs_all = self._base_tfs
+            postings = []
+            for term in terms:
+                base_range = self._base_terms.get(term)
+                delta = self._delta.get(term)
+                delta_rows = delta_tfs = None
+                if delta:
+                    delta_rows = np.fromiter(delta.keys(), dtype=np.int64, count=len(delta))
+                    delta_tfs = np.fromiter(delta.values(), dtype=np.float32, count=len(delta))
+                if base_range is not None or delta_rows is not None:
+                    postings.append((base_range, delta_rows, delta_tfs))
+        
+        scores = np.zeros(size, dtype=np.float32)
+        for base_range, delta_rows, delta_tfs in postings:
+            rows_part = []
+            tfs_part = []
+            if base_range is not None:
+                start, count = base_range
+                rows_part.append(np.asarray(base_rows_all[start:start + count], dtype=np.int64))
+                tfs_part.append(np.asarray(base_tfs_all[start:start + count], dtype=np.float32))
+            if delta_rows is not None:
+                rows_part.append(delta_rows)
+                tfs_part.append(delta_tfs)
+            
+            rows = np.concatenate(rows_part)
+            tfs = np.concatenate(tfs_part)
+            # 기본 세그먼트의 삭제 표시 문서는 병합 전까지 df에 포함됨 (근사)
+            df = len(rows)
+            idf = math.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doclen[rows] / avg_len)
+            scores[rows] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+        
+        # 확보 이후 삭제된 문서는 live/ids에서 빠지므로 결과에서도 제외됨
+        scores[~live] = 0.0
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+        k = min(n_results, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for row in top:
+            chunk_id = ids[row]
+            if chunk_id is not None:
+                results.append({"id": chunk_id, "score": float(scores[row])})
+        return results
+    
+    def close(self) -> None:
+        """로그 파일 닫기 및 기본 세그먼트 mmap 해제 (진행 중인 병합은 교체하지 않고 버림)"""
+        with self._lock:
+            self._closed = True
+            self._log.close()
+            self._base_rows = np.zeros(0, dtype=np.int32)
+            self._base_tfs = np.zeros(0, dtype=np.uint16)
@@ -0,0 +1,370 @@
+"""
+청크 메타데이터 사이드카 인덱스
+벡터 스토어와 함께 유지되는 SQLite 인덱스 (document_id -> 청크 ID, 개수, 메타데이터)
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+# where 필터 비교 연산자 -> SQL 연산자
+COMPARISON_OPERATORS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+class MetadataIndex:
+    """청크 메타데이터 사이드카 인덱스 (SQLite)"""
+    
+    def __init__(self, db_path: str, collection_name: str):
+        """
+        사이드카 인덱스 초기화
+        
+        Args:
+            db_path: 인덱스 파일을 둘 디렉토리 (벡터 DB 경로)
+            collection_name: 컬렉션 이름 (컬렉션마다 별도 파일)
+        """
+        os.makedirs(db_path, exist_ok=True)
+        self.path = os.path.join(db_path, f"{collection_name}.meta.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id TEXT PRIMARY KEY,
+                document_id TEXT,
+                chunk_index INTEGER,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks (document_id, chunk_index)"
+        )
+        # 문서별 키셋 페이지 조회용 (chunk_index가 없는 청크도 -1로 정렬)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunks_document_page "
+            "ON chunks (document_id, COALESCE(chunk_index, -1), chunk_id)"
+        )
+        # 본문 컬럼 (본문을 따로 저장하지 않는 백엔드용, 이전 버전 파일에는 추가)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        if "text" not in columns:
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN text TEXT")
+        self._conn.commit()
+    
+    def upsert(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        texts: Optional[List[str]] = None
+    ) -> None:
+        """
+        청크 메타데이터 추가 또는 갱신
+        
+        Args:
+            ids: 청크 ID 리스트
+            metadatas: 메타데이터 리스트
+            texts: 청크 본문 리스트 (본문도 함께 저장할 경우)
+        """
+        texts = texts if texts is not None else [None] * len(ids)
+        rows = [
+            (
+                chunk_id,
+                metadata.get("document_id"),
+                metadata.get("chunk_index"),
+                json.dumps(metadata, ensure_ascii=False),
+                text
+            )
+            for chunk_id, metadata, text in zip(ids, metadatas, texts)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, document_id, chunk_index, metadata, text) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+    
+    def delete(self, ids: Iterable[str]) -> None:
+        """
+        청크 메타데이터 삭제
+        
+        Args:
+            ids: 삭제할 청크 ID 리스트
+        """
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?",
+                [(chunk_id,) for chunk_id in ids]
+            )
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """모든 청크 메타데이터 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+    
+    def count_chunks(self) -> int:
+        """
+        인덱스된 청크 수
+        
+        Returns:
+            청크 수
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    
+    def count_documents(self) -> int:
+        """
+        고유 문서 수
+        
+        Returns:
+            문서 수
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(DISTINCT document_id) FROM chunks WHERE document_id IS NOT NULL"
+            ).fetchone()[0]
+    
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """
+        문서 목록 (문서별 첫 청크의 메타데이터와 청크 수)
+        
+        Returns:
+            문서 딕셔너리 리스트 (id, metadata, chunks_count)
+        """
+        with self._lock:
+            # SQLite는 MIN() 집계 시 나머지 컬럼을 최솟값 행에서 가져옴
+            rows = self._conn.execute(
+                """
+                SELECT document_id, COUNT(*), metadata, MIN(chunk_index)
+                FROM chunks
+                WHERE document_id IS NOT NULL
+                GROUP BY document_id
+                ORDER BY document_id
+                """
+            ).fetchall()
+        
+        return [
+            {
+                "id": document_id,
+                "metadata": json.loads(metadata),
+                "chunks_count": chunks_count
+            }
+            for document_id, chunks_count, metadata, _ in rows
+        ]
+    
+    def get_chunk_ids(self, document_id: str) -> List[str]:
+        """
+        문서에 속한 청크 ID (chunk_index 순)
+        
+        Args:
+            document_id: 문서 ID
+            
+        Returns:
+            청크 ID 리스트
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id FROM chunks WHERE document_id = ? ORDER BY chunk_index",
+                (document_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def list_chunk_ids(
+        self,
+        document_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[str]:
+        """
+        청크 ID 페이지 조회
+        
+        Args:
+            document_id: 특정 문서의 청크만 조회 (선택적)
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            
+        Returns:
+            청크 ID 리스트
+        """
+        with self._lock:
+            if document_id:
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM chunks WHERE document_id = ? "
+                    "ORDER BY COALESCE(chunk_index, -1), chunk_id LIMIT ? OFFSET ?",
+                    (document_id, limit, offset)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM chunks ORDER BY chunk_id LIMIT ? OFFSET ?",
+                    (limit, offset)
+                ).fetchall()
+        return [row[0] for row in rows]
+    
+    def page_chunk_ids(
+        self,
+        limit: int = 100,
+        after: Optional[Any] = None,
+        document_id: Optional[str] = None
+    ) -> Tuple[List[str], Optional[Any]]:
+        """
+        키셋(커서) 방식 청크 ID 페이지 조회 (OFFSET 없이 인덱스 탐색)
+        
+        Args:
+            limit: 최대 개수
+            after: 이전 페이지의 마지막 키 (전체 조회는 chunk_id, 문서별 조회는 [chunk_index 또는 -1, chunk_id])
+            document_id: 특정 문서의 청크만 조회 (선택적)
+            
+        Returns:
+            (청크 ID 리스트, 다음 페이지 시작 키 또는 None)
+        """
+        with self._lock:
+            if document_id:
+                # chunk_index가 없는 청크(이전 데이터, 스냅샷 가져오기 등)도 빠지지 않도록 -1로 간주하고 chunk_id로 구분
+                if after is None:
+                    rows = self._conn.execute(
+                        """
+                        SELECT chunk_id, COALESCE(chunk_index, -1) FROM chunks
+                        WHERE document_id = ?
+                        ORDER BY COALESCE(chunk_index, -1), chunk_id LIMIT ?
+                        """,
+                        (document_id, limit)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        """
+                        SELECT chunk_id, COALESCE(chunk_index, -1) FROM chunks
+                        WHERE document_id = ? AND (COALESCE(chunk_index, -1), chunk_id) > (?, ?)
+                        ORDER BY COALESCE(chunk_index, -1), chunk_id LIMIT ?
+                        """,
+                        (document_id, after[0], after[1], limit)
+                    ).fetchall()
+                next_after = [rows[-1][1], rows[-1][0]] if len(rows) == limit else None
+            else:
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM chunks WHERE chunk_id > ? ORDER BY chunk_id LIMIT ?",
+                    (after if after is not None else "", limit)
+                ).fetchall()
+                next_after = rows[-1][0] if len(rows) == limit else None
+        
+        return [row[0] for row in rows], next_after
+    
+    def count_document_chunks(self, document_id: str) -> int:
+        """
+        문서에 속한 청크 수
+        
+        Args:
+            document_id: 문서 ID
+            
+        Returns:
+            청크 수
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chunks WHERE document_id = ?",
+                (document_id,)
+            ).fetchone()[0]
+    
+    def get_records(self, ids: List[str]) -> Dict[str, Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        청크 ID로 메타데이터와 본문 조회
+        
+        Args:
+            ids: 청크 ID 리스트
+            
+        Returns:
+            {청크 ID: (메타데이터, 본문)} 딕셔너리 (없는 ID는 제외)
+        """
+        records = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT chunk_id, metadata, text FROM chunks WHERE chunk_id IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for chunk_id, metadata, text in rows:
+                    records[chunk_id] = (json.loads(metadata), text)
+        return records
+    
+    @staticmethod
+    def _field_expr(key: str) -> str:
+        """메타데이터 키를 SQL 식으로 변환 (인덱스된 컬럼은 직접 사용)"""
+        if key in ("document_id", "chunk_index"):
+            return key
+        escaped = key.replace('"', '""').replace("'", "''")
+        return f"json_extract(metadata, '$.\"{escaped}\"')"
+    
+    def _where_sql(self, where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        ChromaDB where 필터를 SQL 조건으로 변환
+        ($eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $and, $or 지원)
+        """
+        clauses = []
+        params: List[Any] = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._where_sql(sub) for sub in condition]
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+                for _, sub_params in parts:
+                    params.extend(sub_params)
+                continue
+            
+            expr = self._field_expr(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for operator, value in condition.items():
+                if operator in ("$in", "$nin"):
+                    placeholders = ",".join("?" * len(value)) or "NULL"
+                    negate = "NOT " if operator == "$nin" else ""
+                    clauses.append(f"({expr} IS NOT NULL AND {expr} {negate}IN ({placeholders}))")
+                    params.extend(value)
+                elif operator in COMPARISON_OPERATORS:
+                    clauses.append(f"({expr} IS NOT NULL AND {expr} {COMPARISON_OPERATORS[operator]} ?)")
+                    params.append(value)
+                else:
+                    raise ValueError(f"Unsupported where operator: {operator}")
+        return " AND ".join(clauses) or "1", params
+    
+    def find_chunk_ids(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[str]:
+        """
+        메타데이터 필터에 맞는 청크 ID 조회 (chunk_id 순)
+        
+        Args:
+            where: ChromaDB 형식의 메타데이터 필터
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            
+        Returns:
+            청크 ID 리스트
+        """
+        sql, params = self._where_sql(where or {})
+        query = f"SELECT chunk_id FROM chunks WHERE {sql} ORDER BY chunk_id LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(
+                query,
+                params + [limit if limit is not None else -1, offset or 0]
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def close(self) -> None:
+        """SQLite 연결 종료"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,265 @@
+"""
+메모리 매핑 벡터 행렬
+float32 벡터를 .npy 파일에 행 단위로 저장하고 (np.memmap), 청크 ID <-> 행 번호 매핑은 SQLite에 저장
+"""
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+# 행렬 파일을 처음 만들거나 늘릴 때의 최소 행 수
+MIN_CAPACITY = 1024
+
+
+class MmapMatrix:
+    """행 단위로 추가/갱신/삭제할 수 있는 메모리 매핑 float32 행렬"""
+    
+    def __init__(self, directory: str, name: str = "vectors"):
+        """
+        행렬 열기 (파일이 있으면 기존 행렬과 ID 매핑을 불러옴)
+        
+        Args:
+            directory: 파일을 둘 디렉토리
+            name: 파일 이름 접두사 ({name}.npy, {name}.rows.sqlite3)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.npy")
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, f"{name}.rows.sqlite3"),
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (chunk_id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE)"
+        )
+        self._conn.commit()
+        
+        self._matrix: Optional[np.memmap] = None
+        if os.path.exists(self.path):
+            self._matrix = np.load(self.path, mmap_mode="r+")
+        
+        # 메모리에는 ID 매핑과 사용 중인 행 마스크만 유지
+        self._row_of: Dict[str, int] = {}
+        for chunk_id, row in self._conn.execute("SELECT chunk_id, row FROM rows"):
+            self._row_of[chunk_id] = row
+        self.size = max(self._row_of.values(), default=-1) + 1
+        self._ids: List[Optional[str]] = [None] * self.size
+        for chunk_id, row in self._row_of.items():
+            self._ids[row] = chunk_id
+        self._free_rows = [row for row in range(self.size - 1, -1, -1) if self._ids[row] is None]
+        self._live = np.zeros(self.capacity, dtype=bool)
+        self._live[list(self._row_of.values())] = True
+    
+    @property
+    def dim(self) -> Optional[int]:
+        """벡터 차원 (아직 벡터가 없으면 None)"""
+        return self._matrix.shape[1] if self._matrix is not None else None
+    
+    @property
+    def capacity(self) -> int:
+        """파일에 할당된 행 수"""
+        return self._matrix.shape[0] if self._matrix is not None else 0
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """사용 중인 영역의 행렬 뷰 (삭제된 행 포함, live_mask로 구분)"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[:self.size]
+    
+    @property
+    def live_mask(self) -> np.ndarray:
+        """사용 중인 영역에서 살아있는 행 마스크"""
+        return self._live[:self.size]
+    
+    def __len__(self) -> int:
+        return len(self._row_of)
+    
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._row_of
+    
+    def _ensure_capacity(self, dim: int, rows_needed: int) -> None:
+        """필요한 행 수만큼 파일 확장 (두 배씩 늘려 재할당 횟수를 줄임)"""
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            raise ValueError(f"Vector dimension mismatch: expected {self._matrix.shape[1]}, got {dim}")
+        if rows_needed <= self.capacity:
+            return
+        
+        new_capacity = max(rows_needed, self.capacity * 2, MIN_CAPACITY)
+        tmp_path = f"{self.path}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(new_capacity, dim))
+        if self._matrix is not None:
+            grown[:self.size] = self._matrix[:self.size]
+        grown.flush()
+        del grown
+        self._matrix = None
+        os.replace(tmp_path, self.path)
+        self._matrix = np.load(self.path, mmap_mode="r+")
+        
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+    
+    def upsert(self, ids: List[str], vectors: np.ndarray) -> np.ndarray:
+        """
+        벡터 추가 또는 갱신 (기존 ID는 같은 행을 덮어쓰고, 새 ID는 빈 행을 재사용하거나 뒤에 추가)
+        
+        Args:
+            ids: 청크 ID 리스트
+            vectors: (len(ids), dim) float32 배열
+            
+        Returns:
+            각 ID가 저장된 행 번호 배열
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not ids:
+            return np.zeros(0, dtype=np.int64)
+        
+        with self._lock:
+            new_ids = [chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id not in self._row_of]
+            reused = min(len(new_ids), len(self._free_rows))
+            self._ensure_capacity(vectors.shape[1], self.size + len(new_ids) - reused)
+            
+            assigned = {}
+            for chunk_id in new_ids:
+                if self._free_rows:
+                    row = self._free_rows.pop()
+                else:
+                    row = self.size
+                    self.size += 1
+                    self._ids.append(None)
+                assigned[chunk_id] = row
+            
+            rows = np.array(
+                [assigned.get(chunk_id, self._row_of.get(chunk_id)) for chunk_id in ids],
+                dtype=np.int64
+            )
+            # 벡터를 먼저 기록한 뒤 매핑을 커밋 (중간에 중단되면 매핑 없는 행은 빈 행으로 취급)
+            self._matrix[rows] = vectors
+            self._matrix.flush()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rows (chunk_id, row) VALUES (?, ?)",
+                list(assigned.items())
+            )
+            self._conn.commit()
+            
+            for chunk_id, row in assigned.items():
+                self._row_of[chunk_id] = row
+                self._ids[row] = chunk_id
+            self._live[rows] = True
+            return rows
+    
+    def delete(self, ids: List[str]) -> List[int]:
+        """
+        벡터 삭제 (행은 비워 두고 다음 추가 시 재사용)
+        
+        Args:
+            ids: 청크 ID 리스트
+            
+        Returns:
+            비워진 행 번호 리스트
+        """
+        with self._lock:
+            removed = [(chunk_id, self._row_of[chunk_id]) for chunk_id in dict.fromkeys(ids) if chunk_id in self._row_of]
+            if not removed:
+                return []
+            self._conn.executemany(
+                "DELETE FROM rows WHERE chunk_id = ?",
+                [(chunk_id,) for chunk_id, _ in removed]
+            )
+            self._conn.commit()
+            
+            rows = [row for _, row in removed]
+            for chunk_id, row in removed:
+                del self._row_of[chunk_id]
+                self._ids[row] = None
+                self._free_rows.append(row)
+            self._live[rows] = False
+            self._matrix[rows] = 0.0
+            return rows
+    
+    def clear(self) -> None:
+        """모든 행과 파일 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM rows")
+            self._conn.commit()
+            self._matrix = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._row_of = {}
+            self._ids = []
+            self._free_rows = []
+            self.size = 0
+            self._live = np.zeros(0, dtype=bool)
+    
+    def rows_for(self, ids: List[str]) -> List[Optional[int]]:
+        """
+        청크 ID의 행 번호 조회
+        
+        Args:
+            ids: 청크 ID 리스트
+            
+        Returns:
+            행 번호 리스트 (없는 ID는 None)
+        """
+        return [self._row_of.get(chunk_id) for chunk_id in ids]
+    
+    def ids_for(self, rows) -> List[Optional[str]]:
+        """
+        행 번호의 청크 ID 조회
+        
+        Args:
+            rows: 행 번호 리스트 또는 배열
+            
+        Returns:
+            청크 ID 리스트 (빈 행은 None)
+        """
+        return [self._ids[int(row)] for row in rows]
+    
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, List[Optional[str]]]:
+        """
+        사용 중인 영역의 행렬 뷰, 살아있는 행 마스크 복사본, 행 -> 청크 ID 목록 복사본을 한 번에 확보
+        (잠금 밖에서 계산한 점수와 행 번호를 확보 시점의 청크로 해석할 때 사용)
+        
+        Returns:
+            (행렬 뷰, 마스크, 청크 ID 리스트)
+        """
+        with self._lock:
+            return self.vectors, self.live_mask.copy(), self._ids[:self.size]
+    
+    def ids_snapshot(self) -> List[Optional[str]]:
+        """
+        사용 중인 영역의 행 번호 -> 청크 ID 목록 복사본
+        (잠금 밖에서 계산한 행 번호를 확보 시점의 청크 ID로 해석할 때 사용)
+        
+        Returns:
+            행 순서대로 청크 ID 리스트 (빈 행은 None)
+        """
+        with self._lock:
+            return self._ids[:self.size]
+    
+    def mask_for(self, ids: List[str]) -> np.ndarray:
+        """
+        청크 ID 집합을 행 비트마스크로 변환
+        
+        Args:
+            ids: 청크 ID 리스트
+            
+        Returns:
+            사용 중인 영역 크기의 bool 배열
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        rows = [row for row in self.rows_for(ids) if row is not None]
+        if rows:
+            mask[rows] = True
+        return mask
+    
+    def close(self) -> None:
+        """SQLite 연결과 메모리 매핑 해제"""
+        with self._lock:
+            self._matrix = None
+            self._conn.close()
@@ -0,0 +1,70 @@
+"""
+MMR(Maximal Marginal Relevance) 다양화
+과다 추출한 후보 중에서 질의와의 관련도는 높고 이미 고른 청크와는 덜 비슷한 청크를 차례로 골라
+형제 페이지의 같은 문단이나 겹치는 청크 윈도우가 상위 결과를 모두 차지하지 않도록 함
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def mmr_select(
+    query_embedding,
+    candidate_embeddings,
+    k: int,
+    lambda_mult: Optional[float] = None
+) -> List[int]:
+    """
+    MMR로 후보 k개 선택
+    
+    후보 간 코사인 유사도 행렬을 한 번 계산하고, 후보마다 "이미 고른 청크와의 최대 유사도"를
+    고를 때마다 한 행씩 갱신하므로 O(n^2 + k*n)입니다.
+    
+    Args:
+        query_embedding: 쿼리 임베딩 벡터
+        candidate_embeddings: 후보 임베딩 (n x dim)
+        k: 고를 후보 수
+        lambda_mult: 관련도 가중치 (1이면 관련도 순서 그대로, 0이면 다양성만, 기본값: settings.mmr_lambda)
+        
+    Returns:
+        고른 후보의 인덱스 리스트 (선택 순서)
+    """
+    lambda_mult = settings.mmr_lambda if lambda_mult is None else lambda_mult
+    candidates = _unit_rows(np.asarray(candidate_embeddings, dtype=np.float32))
+    n = candidates.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return []
+    
+    query = _unit_rows(np.asarray(query_embedding, dtype=np.float32))
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+    
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+def take_results(search_result: Dict[str, Any], indices: List[int]) -> Dict[str, Any]:
+    """
+    검색 결과 딕셔너리(documents, distances, metadatas, ids, 병합 검색 시 collections)에서
+    indices 순서대로 항목만 남긴 결과
+    """
+    return {key: [values[i] for i in indices] for key, values in search_result.items()}
+
@@ -0,0 +1,519 @@
+"""
+NumPy 정확 검색 벡터 스토어
+벡터는 메모리 매핑된 .npy 행렬에, 본문/메타데이터는 SQLite 사이드카 인덱스에 저장하고
+검색은 행렬 곱 + argpartition 으로 전체 벡터에 대해 정확한 top-k 를 계산
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.vectorstore.base import MetadataIndexMixin, CollectionNotFoundError
+from app.vectorstore.metadata_index import MetadataIndex
+from app.vectorstore.mmap_matrix import MmapMatrix
+
+logger = logging.getLogger(__name__)
+
+# get 계열 조회의 기본 projection (ChromaVectorStore와 동일)
+DEFAULT_INCLUDE = ["documents", "metadatas"]
+
+# 필터 통과 행 비율이 이보다 작으면 해당 행만 모아서 계산 (크면 전체 계산 후 마스킹)
+GATHER_RATIO = 0.25
+
+# 필터 비트마스크 캐시 크기 (쓰기 시 전체 무효화)
+MASK_CACHE_SIZE = 128
+
+# 배치 검색 시 한 번에 만드는 점수 행렬 최대 원소 수 (float32 기준 약 128MB)
+SCORE_BLOCK_ELEMENTS = 32 * 1024 * 1024
+
+SUPPORTED_SPACES = ("cosine", "ip")
+
+
+class NumpyVectorStore(MetadataIndexMixin):
+    """메모리 매핑 행렬 기반 정확 검색 벡터 스토어 (ChromaVectorStore와 같은 인터페이스)"""
+    
+    # 본문은 메타데이터 인덱스(SQLite)에 저장
+    STORE_TEXTS_IN_INDEX = True
+    
+    def __init__(self, collection_name: Optional[str] = None, create: bool = True):
+        """
+        NumPy 벡터 스토어 초기화
+        
+        Args:
+            collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+            create: 컬렉션이 없으면 생성할지 여부
+            
+        Raises:
+            CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
+        """
+        self.collection_name = collection_name or settings.collection_name
+        self.db_path = settings.numpy_db_path or os.path.join(settings.chroma_db_path, "numpy")
+        self.store_dir = os.path.join(self.db_path, self.collection_name)
+        if not create and not os.path.exists(os.path.join(self.store_dir, "store.json")):
+            raise CollectionNotFoundError(f"Collection not found: {self.collection_name}")
+        os.makedirs(self.store_dir, exist_ok=True)
+        
+        self._write_lock = threading.RLock()
+        self._mask_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        self.space = self._load_space()
+        self.matrix = MmapMatrix(self.store_dir)
+        self.metadata_index = MetadataIndex(self.store_dir, self.collection_name)
+        self._reconcile()
+        
+        # BM25 어휘 색인 (하이브리드 검색용)
+        self.lexical_index = self._open_lexical_index(os.path.join(self.store_dir, "lexical"))
+        self._sync_lexical_index()
+        
+        # 문서 중심 벡터 색인 (2단계 검색용)
+        self.centroid_index = self._open_centroid_index(os.path.join(self.store_dir, "centroids"))
+        self._sync_centroid_index()
+    
+    def _load_space(self) -> str:
+        """컬렉션 거리 공간 로드 (처음 생성 시 settings.numpy_space로 고정)"""
+        config_path = os.path.join(self.store_dir, "store.json")
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                return json.load(f)["space"]
+        
+        space = settings.numpy_space
+        if space not in SUPPORTED_SPACES:
+            raise ValueError(f"Unsupported numpy_space: {space} (expected one of {SUPPORTED_SPACES})")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"space": space}, f)
+        return space
+    
+    def _reconcile(self) -> None:
+        """행렬과 사이드카 인덱스 중 한쪽에만 있는 청크 제거 (쓰기 도중 중단된 경우)"""
+        if len(self.matrix) == self.metadata_index.count_chunks():
+            return
+        
+        indexed_ids = set(self.metadata_index.find_chunk_ids())
+        matrix_ids = set(chunk_id for chunk_id in self.matrix.ids_for(range(self.matrix.size)) if chunk_id)
+        orphan_vectors = list(matrix_ids - indexed_ids)
+        orphan_records = list(indexed_ids - matrix_ids)
+        logger.warning(
+            f"[NumpyVectorStore] 행렬/인덱스 불일치 정리 - 컬렉션 {self.collection_name}, "
+            f"벡터만 있음 {len(orphan_vectors)}개, 메타데이터만 있음 {len(orphan_records)}개"
+        )
+        self.matrix.delete(orphan_vectors)
+        self.metadata_index.delete(orphan_records)
+    
+    def _prepare_vectors(self, embeddings) -> np.ndarray:
+        """임베딩을 float32 행렬로 변환 (cosine은 단위 벡터로 정규화하여 내적 = 코사인 유사도)"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if self.space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors
+    
+    def _write(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]],
+        ids: Optional[List[str]],
+        upsert: bool
+    ) -> List[str]:
+        """add/upsert 공통 처리"""
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in texts]
+        
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+        
+        with self._write_lock:
+            if not upsert:
+                existing = [chunk_id for chunk_id in ids if chunk_id in self.matrix]
+                if existing:
+                    # ChromaDB add와 동일하게 기존 ID는 건너뜀
+                    logger.warning(f"[NumpyVectorStore] 이미 존재하는 ID {len(existing)}개는 추가하지 않음")
+                    keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in self.matrix]
+                    texts = [texts[i] for i in keep]
+                    embeddings = [embeddings[i] for i in keep]
+                    metadatas = [metadatas[i] for i in keep]
+                    ids_to_write = [ids[i] for i in keep]
+                else:
+                    ids_to_write = ids
+            else:
+                ids_to_write = ids
+            
+            if ids_to_write:
+                # 벡터 -> 메타데이터 순으로 기록 (중단 시 다음 시작에서 _reconcile로 정리)
+                self.matrix.upsert(ids_to_write, self._prepare_vectors(embeddings))
+                self._index_upsert(ids_to_write, metadatas, texts)
+                self._mask_cache.clear()
+        
+        return ids
+    
+    def add_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        문서를 벡터 스토어에 추가
+        
+        Args:
+            texts: 문서 텍스트 리스트
+            embeddings: 임베딩 벡터 리스트
+            metadatas: 메타데이터 리스트
+            ids: 문서 ID 리스트 (없으면 자동 생성)
+            
+        Returns:
+            저장된 문서 ID 리스트
+        """
+        return self._write(texts, embeddings, metadatas, ids, upsert=False)
+    
+    def upsert_documents(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        문서를 벡터 스토어에 추가하거나 같은 ID가 있으면 덮어쓰기
+        
+        Args:
+            texts: 문서 텍스트 리스트
+            embeddings: 임베딩 벡터 리스트
+            metadatas: 메타데이터 리스트
+            ids: 문서 ID 리스트 (없으면 자동 생성)
+            
+        Returns:
+            저장된 문서 ID 리스트
+        """
+        return self._write(texts, embeddings, metadatas, ids, upsert=True)
+    
+    def get_by_ids(
+        self,
+        ids: List[str],
+        include: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        청크 ID로 청크 조회 (요청한 ID 순서 유지, 없는 ID는 제외)
+        
+        Args:
+            ids: 청크 ID 리스트
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            청크 리스트 (id + include에 따라 text, metadata, embedding)
+        """
+        if not ids:
+            return []
+        
+        include = include if include is not None else DEFAULT_INCLUDE
+        records = self.metadata_index.get_records(ids)
+        found_ids = [chunk_id for chunk_id in ids if chunk_id in records]
+        
+        # 임베딩은 행 번호를 한 번에 찾아 한 번의 인덱싱으로 읽음
+        embeddings: Dict[str, List[float]] = {}
+        if "embeddings" in include and found_ids:
+            pairs = [
+                (chunk_id, matrix_row)
+                for chunk_id, matrix_row in zip(found_ids, self.matrix.rows_for(found_ids))
+                if matrix_row is not None
+            ]
+            if pairs:
+                vectors = self.matrix.vectors[[matrix_row for _, matrix_row in pairs]]
+                embeddings = {chunk_id: vector.tolist() for (chunk_id, _), vector in zip(pairs, vectors)}
+        
+        rows = []
+        for chunk_id in found_ids:
+            metadata, text = records[chunk_id]
+            row = {"id": chunk_id}
+            if "documents" in include:
+                row["text"] = text or ""
+            if "metadatas" in include:
+                row["metadata"] = metadata
+            if "embeddings" in include:
+                row["embedding"] = embeddings.get(chunk_id)
+            rows.append(row)
+        return rows
+    
+    def get(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        메타데이터 필터/limit/offset으로 청크 조회 (사이드카 인덱스에서 ID를 찾은 뒤 해당 청크만 조회)
+        
+        Args:
+            where: 메타데이터 필터 (ChromaDB 형식, 예: {"document_id": "doc-1"})
+            limit: 최대 개수
+            offset: 건너뛸 개수
+            include: 조회할 필드 (기본값: ["documents", "metadatas"])
+            
+        Returns:
+            청크 리스트 (id + include에 따라 text, metadata, embedding)
+        """
+        page_ids = self.metadata_index.find_chunk_ids(where, limit=limit, offset=offset or 0)
+        return self.get_by_ids(page_ids, include=include)
+    
+    def _filter_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """
+        메타데이터 필터를 행 비트마스크로 변환 (같은 필터는 다음 쓰기 전까지 캐시)
+        
+        Args:
+            where: ChromaDB 형식의 메타데이터 필터
+            
+        Returns:
+            행렬 사용 영역 크기의 bool 배열
+        """
+        key = json.dumps(where, sort_keys=True, ensure_ascii=False)
+        mask = self._mask_cache.get(key)
+        if mask is not None and len(mask) == self.matrix.size:
+            self._mask_cache.move_to_end(key)
+            return mask
+        
+        mask = self.matrix.mask_for(self.metadata_index.find_chunk_ids(where))
+        self._mask_cache[key] = mask
+        if len(self._mask_cache) > MASK_CACHE_SIZE:
+            self._mask_cache.popitem(last=False)
+        return mask
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        유사한 문서 검색 (전체 벡터 정확 검색)
+        
+        Args:
+            query_embedding: 쿼리 임베딩 벡터
+            n_results: 반환할 결과 수
+            filter_metadata: 메타데이터 필터 (비트마스크로 사전 필터링)
+            
+        Returns:
+            검색 결과 딕셔너리 (documents, distances, metadatas, ids)
+        """
+        return self.search_many([query_embedding], n_results=n_results, filter_metadata=filter_metadata)[0]
+    
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 쿼리를 행렬 곱 한 번(블록 단위)으로 검색
+        
+        Args:
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_results: 쿼리당 반환할 결과 수
+            filter_metadata: 메타데이터 필터 (모든 쿼리에 공통 적용)
+            batch_size: 한 번에 계산할 쿼리 수 (기본값: 점수 행렬이 SCORE_BLOCK_ELEMENTS를 넘지 않도록 자동 결정)
+            
+        Returns:
+            쿼리 순서대로 검색 결과 딕셔너리 리스트 (documents, distances, metadatas, ids)
+        """
+        empty = [{"documents": [], "distances": [], "metadatas": [], "ids": []} for _ in query_embeddings]
+        if len(self.matrix) == 0 or not query_embeddings:
+            return empty
+        
+        queries = self._prepare_vectors(query_embeddings)
+        
+        # 쓰기와 겹치지 않도록 행렬 뷰, 마스크, 행 -> 청크 ID 목록을 잠금 안에서 함께 확보
+        # (잠금 밖에서 삭제 후 빈 행이 재사용되어도 점수를 다른 청크 ID에 매핑하지 않도록)
+        with self._write_lock:
+            vectors = self.matrix.vectors
+            mask = self.matrix.live_mask.copy()
+            row_ids = self.matrix.ids_snapshot()
+            if filter_metadata:
+                mask &= self._filter_mask(filter_metadata)
+        
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return empty
+        
+        if len(candidates) < len(mask) * GATHER_RATIO:
+            # 선택된 행만 모아서 계산
+            vectors = vectors[candidates]
+            rows = candidates
+            row_mask = None
+        else:
+            rows = None
+            row_mask = ~mask
+        
+        k = min(n_results, len(candidates))
+        batch_size = batch_size or max(1, SCORE_BLOCK_ELEMENTS // vectors.shape[0])
+        top_rows_per_query = []
+        top_scores_per_query = []
+        for start in range(0, len(queries), batch_size):
+            scores = queries[start:start + batch_size] @ vectors.T
+            if row_mask is not None:
+                scores[:, row_mask] = -np.inf
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            top_rows_per_query.extend(rows[top] if rows is not None else top)
+            top_scores_per_query.extend(top_scores)
+        
+        # 모든 쿼리의 결과 청크를 한 번에 조회
+        top_ids_per_query = [[row_ids[int(row)] for row in top_rows] for top_rows in top_rows_per_query]
+        records = self.metadata_index.get_records(
+            list({chunk_id for top_ids in top_ids_per_query for chunk_id in top_ids if chunk_id})
+        )
+        
+        all_results = []
+        for top_ids, top_scores in zip(top_ids_per_query, top_scores_per_query):
+            result = {"documents": [], "distances": [], "metadatas": [], "ids": []}
+            for chunk_id, score in zip(top_ids, top_scores):
+                if chunk_id not in records:
+                    continue
+                metadata, text = records[chunk_id]
+                result["ids"].append(chunk_id)
+                result["documents"].append(text or "")
+                result["metadatas"].append(metadata)
+                # ChromaDB cosine/ip 공간과 같은 거리 정의 (1 - 내적)
+                result["distances"].append(float(1.0 - score))
+            all_results.append(result)
+        return all_results
+    
+    def delete_documents(self, ids: List[str]) -> bool:
+        """
+        문서 삭제
+        
+        Args:
+            ids: 삭제할 문서 ID 리스트
+            
+        Returns:
+            성공 여부
+        """
+        try:
+            with self._write_lock:
+                self.matrix.delete(ids)
+                self._index_delete(ids)
+                self._mask_cache.clear()
+            return True
+        except Exception as e:
+            logger.error(f"[NumpyVectorStore] 문서 삭제 실패: {e}")
+            return False
+    
+    def count(self) -> int:
+        """
+        저장된 문서 수 반환
+        
+        Returns:
+            문서 수
+        """
+        return len(self.matrix)
+    
+    def delete_all(self) -> bool:
+        """
+        컬렉션의 모든 문서 삭제
+        
+        Returns:
+            성공 여부
+        """
+        try:
+            with self._write_lock:
+                self.matrix.clear()
+                self._index_clear()
+                self._mask_cache.clear()
+            return True
+        except Exception as e:
+            logger.error(f"[NumpyVectorStore] 전체 삭제 실패: {e}")
+            return False
+    
+    def delete_collection(self) -> bool:
+        """
+        컬렉션 전체 삭제 (NumPy 백엔드는 파일을 비우는 것과 동일)
+        
+        Returns:
+            성공 여부
+        """
+        return self.delete_all()
+    
+    def estimate_memory_bytes(self) -> int:
+        """
+        검색 시 메모리에 올라오는 행렬 크기 추정 (컬렉션 LRU 기준)
+        
+        Returns:
+            추정 바이트 수
+        """
+        return self.matrix.size * (self.matrix.dim or 0) * 4
+    
+    def release(self) -> None:
+        """컬렉션 LRU에서 내보낼 때 필터 마스크 캐시 해제 및 행렬/사이드카 인덱스의 파일 핸들과 mmap 해제"""
+        with self._write_lock:
+            self._mask_cache.clear()
+            self._close_sidecar_indexes()
+            self.matrix.close()
+    
+    def get_index_params(self) -> Dict[str, Any]:
+        """
+        현재 컬렉션의 인덱스 설정 조회
+        
+        Returns:
+            인덱스 설정 딕셔너리 (backend, space, dim, rows, capacity)
+        """
+        return {
+            "backend": "numpy",
+            "space": self.space,
+            "dim": self.matrix.dim,
+            "rows": len(self.matrix),
+            "capacity": self.matrix.capacity,
+        }
+    
+    def iter_records(
+        self,
+        batch_size: int = 1000,
+        include: Optional[List[str]] = None
+    ):
+        """
+        컬렉션 전체를 배치 단위로 순회 (ChromaVectorStore.iter_records와 같은 형식)
+        
+        Args:
+            batch_size: 배치당 청크 수
+            include: 조회할 필드 (기본값: ["documents", "metadatas", "embeddings"])
+            
+        Yields:
+            딕셔너리 (ids, documents, metadatas, embeddings)
+        """
+        include = include if include is not None else ["documents", "metadatas", "embeddings"]
+        offset = 0
+        while True:
+            rows = self.get(limit=batch_size, offset=offset, include=include)
+            if not rows:
+                break
+            yield {
+                "ids": [row["id"] for row in rows],
+                "documents": [row.get("text") for row in rows] if "documents" in include else None,
+                "metadatas": [row.get("metadata") for row in rows] if "metadatas" in include else None,
+                "embeddings": [row.get("embedding") for row in rows] if "embeddings" in include else None,
+            }
+            offset += len(rows)
+    
+    def rebuild_index(self, **kwargs) -> Dict[str, Any]:
+        """
+        정확 검색 백엔드는 근사 인덱스가 없으므로 재구축할 것이 없음
+        
+        Raises:
+            ValueError: 항상 (요청 오류로 처리)
+        """
+        raise ValueError(
+            "Index rebuild is only supported by the chroma backend "
+            "(the numpy backend uses exact search and has no HNSW index; "
+            "its distance space is fixed when the collection is created)"
+        )
@@ -0,0 +1,411 @@
+"""
+양자화 후보 인덱스
+벡터를 int8 또는 1비트로 압축한 사본만 메모리에 두고 전수 스캔하여 후보를 넉넉히 뽑은 뒤,
+디스크(mmap)에 있는 float32 원본 벡터로 다시 거리를 계산하여 최종 순위를 정함
+"""
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.vectorstore.mmap_matrix import MmapMatrix, MIN_CAPACITY
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("int8", "binary")
+
+# 근사 점수 계산 시 한 번에 변환/스캔할 행 수
+SCAN_BLOCK_ROWS = 32768
+
+# 쿼리 묶음 하나의 (쿼리 수 x 행 수) 점수 행렬 최대 원소 수 (float32 기준 128MB)
+SCORE_BLOCK_ELEMENTS = 32 * 1024 * 1024
+
+# uint8 값별 1비트 개수 (해밍 거리 계산용)
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def exact_distances(vectors: np.ndarray, queries: np.ndarray, space: str) -> np.ndarray:
+    """
+    ChromaDB와 같은 정의로 정확한 거리 계산
+    
+    Args:
+        vectors: (행 수, dim) float32 배열
+        queries: (쿼리 수, dim) float32 배열
+        space: 거리 공간 ("cosine", "l2", "ip")
+        
+    Returns:
+        (쿼리 수, 행 수) 거리 배열 (작을수록 가까움)
+    """
+    dots = queries @ vectors.T
+    if space == "cosine":
+        vector_norms = np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+        query_norms = np.maximum(np.linalg.norm(queries, axis=1), 1e-12)
+        return 1.0 - dots / (query_norms[:, None] * vector_norms[None, :])
+    if space == "ip":
+        return 1.0 - dots
+    # l2 (제곱 거리)
+    return np.sum(queries ** 2, axis=1)[:, None] - 2 * dots + np.sum(vectors ** 2, axis=1)[None, :]
+
+
+class QuantizedIndex:
+    """
+    int8/1비트 양자화 후보 인덱스 + float32 재채점
+    
+    - int8: 정규화한 벡터를 행별 스케일로 int8 변환 (dim + 4바이트/벡터)
+    - binary: 차원별 기준값보다 큰지 여부를 비트로 저장 (dim/8바이트/벡터), 해밍 거리로 스캔
+    
+    원본 벡터는 MmapMatrix(.npy 메모리 매핑)에 저장하고 재채점할 후보 행만 읽습니다.
+    양자화 코드는 파일로 저장하지 않고 열 때 원본 행렬에서 다시 계산합니다.
+    """
+    
+    def __init__(self, directory: str, mode: str = "int8"):
+        """
+        양자화 인덱스 열기
+        
+        Args:
+            directory: 원본 벡터 행렬과 설정 파일을 둘 디렉토리
+            mode: 양자화 방식 ("int8" 또는 "binary")
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.mode = mode
+        self._meta_path = os.path.join(directory, "quantized.json")
+        self._lock = threading.RLock()
+        self.matrix = MmapMatrix(directory, name="vectors")
+        
+        meta = self._load_meta()
+        # binary 모드의 차원별 기준값 (처음 추가되는 배치의 평균으로 보정)
+        self._thresholds: Optional[np.ndarray] = None
+        if meta.get("mode") != mode:
+            # 다른 방식으로 만든 인덱스는 비우고 새로 구축
+            self.matrix.clear()
+            self._save_meta()
+        elif meta.get("thresholds") is not None:
+            self._thresholds = np.asarray(meta["thresholds"], dtype=np.float32)
+        
+        self._codes = np.zeros((0, 0), dtype=self._code_dtype)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._requantize()
+    
+    @property
+    def _code_dtype(self):
+        return np.int8 if self.mode == "int8" else np.uint8
+    
+    def _code_width(self, dim: int) -> int:
+        """벡터 하나의 코드 바이트 수"""
+        return dim if self.mode == "int8" else (dim + 7) // 8
+    
+    def _load_meta(self) -> Dict[str, Any]:
+        if not os.path.exists(self._meta_path):
+            return {}
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _save_meta(self) -> None:
+        meta = {
+            "mode": self.mode,
+            "thresholds": self._thresholds.tolist() if self._thresholds is not None else None,
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+    
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        float32 벡터를 양자화 코드로 변환
+        
+        Returns:
+            (코드 배열, 행별 스케일 배열 또는 None)
+        """
+        unit = _normalize(vectors)
+        if self.mode == "int8":
+            scales = np.maximum(np.abs(unit).max(axis=1), 1e-12) / 127.0
+            codes = np.rint(unit / scales[:, None]).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return np.packbits(unit > self._thresholds, axis=1), None
+    
+    def _ensure_code_capacity(self, dim: int, rows_needed: int) -> None:
+        """코드 배열 확장 (두 배씩 늘림)"""
+        if self._codes.shape[0] >= rows_needed and self._codes.shape[1] == self._code_width(dim):
+            return
+        capacity = max(rows_needed, self._codes.shape[0] * 2, MIN_CAPACITY)
+        codes = np.zeros((capacity, self._code_width(dim)), dtype=self._code_dtype)
+        scales = np.zeros(capacity, dtype=np.float32)
+        if self._codes.shape[1] == codes.shape[1]:
+            codes[:self._codes.shape[0]] = self._codes
+            scales[:len(self._scales)] = self._scales
+        # 검색 중인 스레드는 이전 배열을 계속 참조하므로 교체만 함
+        self._codes, self._scales = codes, scales
+    
+    def _requantize(self) -> None:
+        """원본 행렬 전체에서 양자화 코드 다시 계산"""
+        with self._lock:
+            size = self.matrix.size
+            if size == 0 or self.matrix.dim is None:
+                return
+            vectors = self.matrix.vectors
+            live = self.matrix.live_mask
+            if self.mode == "binary" and self._thresholds is None:
+                self._thresholds = _normalize(np.asarray(vectors[live][:SCAN_BLOCK_ROWS], dtype=np.float32)).mean(axis=0)
+                self._save_meta()
+            self._ensure_code_capacity(self.matrix.dim, size)
+            for start in range(0, size, SCAN_BLOCK_ROWS):
+                end = min(start + SCAN_BLOCK_ROWS, size)
+                codes, scales = self._quantize(np.asarray(vectors[start:end], dtype=np.float32))
+                self._codes[start:end] = codes
+                if scales is not None:
+                    self._scales[start:end] = scales
+            logger.info(f"[QuantizedIndex] 양자화 코드 로드 - {self.mode}, 벡터 {len(self.matrix)}개")
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    def upsert(self, ids: List[str], vectors) -> None:
+        """
+        벡터 추가 또는 갱신
+        
+        Args:
+            ids: 청크 ID 리스트
+            vectors: (len(ids), dim) 벡터 리스트 또는 배열
+        """
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.mode == "binary" and self._thresholds is None:
+                self._thresholds = _normalize(vectors).mean(axis=0)
+                self._save_meta()
+            rows = self.matrix.upsert(ids, vectors)
+            codes, scales = self._quantize(vectors)
+            self._ensure_code_capacity(vectors.shape[1], self.matrix.size)
+            self._codes[rows] = codes
+            if scales is not None:
+                self._scales[rows] = scales
+    
+    def delete(self, ids: List[str]) -> None:
+        """
+        벡터 삭제
+        
+        Args:
+            ids: 청크 ID 리스트
+        """
+        with self._lock:
+            self.matrix.delete(ids)
+    
+    def clear(self) -> None:
+        """모든 벡터 삭제 (binary 기준값도 다음 추가 시 다시 보정)"""
+        with self._lock:
+            self.matrix.clear()
+            self._thresholds = None
+            self._codes = np.zeros((0, 0), dtype=self._code_dtype)
+            self._scales = np.zeros(0, dtype=np.float32)
+            self._save_meta()
+    
+    def _approx_scores(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        queries: np.ndarray,
+        query_bits: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """코드 블록의 근사 점수 (쿼리 수, 행 수), 클수록 가까움"""
+        if self.mode == "int8":
+            return (queries @ codes.astype(np.float32).T) * scales[None, :]
+        scores = np.empty((len(query_bits), codes.shape[0]), dtype=np.float32)
+        for i, bits in enumerate(query_bits):
+            # 해밍 거리가 작을수록 가까우므로 부호를 바꿔 점수로 사용 (부호 없는 합이라 먼저 변환)
+            scores[i] = -POPCOUNT[np.bitwise_xor(codes, bits)].sum(axis=1, dtype=np.int32)
+        return scores
+    
+    def search_many(
+        self,
+        queries,
+        n_results: int,
+        space: str = "cosine",
+        allowed_mask: Optional[np.ndarray] = None,
+        oversample: int = 10
+    ) -> List[Tuple[List[str], List[float]]]:
+        """
+        양자화 코드로 후보를 뽑고 원본 벡터로 재채점
+        
+        Args:
+            queries: (쿼리 수, dim) 쿼리 벡터
+            n_results: 쿼리당 반환할 결과 수
+            space: 재채점 거리 공간 ("cosine", "l2", "ip")
+            allowed_mask: 검색 대상 행 마스크 (메타데이터 필터 결과, 선택적)
+            oversample: 후보 수 배율 (후보 수 = n_results x oversample)
+            
+        Returns:
+            쿼리 순서대로 (청크 ID 리스트, 거리 리스트)
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        
+        # 쓰기와 겹쳐도 일관된 배열을 보도록 코드/행렬 참조, 마스크, 행 -> 청크 ID 목록을 잠금 안에서 함께 확보
+        # (잠금 밖에서 삭제 후 빈 행이 재사용되어도 거리를 다른 청크 ID에 매핑하지 않도록)
+        with self._lock:
+            codes, scales = self._codes, self._scales
+            vectors, live, row_ids = self.matrix.snapshot()
+        size = min(len(live), codes.shape[0])
+        mask = live[:size]
+        if allowed_mask is not None:
+            allowed = np.zeros(size, dtype=bool)
+            allowed[:min(size, len(allowed_mask))] = allowed_mask[:size]
+            mask &= allowed
+        
+        num_live = int(mask.sum())
+        if num_live == 0:
+            return [([], []) for _ in range(len(queries))]
+        num_candidates = min(num_live, max(n_results, n_results * oversample))
+        
+        unit_queries = _normalize(queries)
+        query_bits = np.packbits(unit_queries > self._thresholds, axis=1) if self.mode == "binary" else None
+        
+        results = []
+        query_chunk = max(1, SCORE_BLOCK_ELEMENTS // size)
+        for q_start in range(0, len(queries), query_chunk):
+            q_end = min(q_start + query_chunk, len(queries))
+            scores = np.empty((q_end - q_start, size), dtype=np.float32)
+            for start in range(0, size, SCAN_BLOCK_ROWS):
+                end = min(start + SCAN_BLOCK_ROWS, size)
+                scores[:, start:end] = self._approx_scores(
+                    codes[start:end],
+                    scales[start:end],
+                    unit_queries[q_start:q_end],
+                    query_bits[q_start:q_end] if query_bits is not None else None
+                )
+            scores[:, ~mask] = -np.inf
+            
+            if num_candidates < size:
+                candidates = np.argpartition(-scores, num_candidates - 1, axis=1)[:, :num_candidates]
+            else:
+                candidates = np.tile(np.arange(size), (q_end - q_start, 1))
+            
+            for i, rows in enumerate(candidates):
+                # 디스크 접근 순서를 맞추기 위해 행 번호 순으로 읽음
+                rows = np.sort(rows[mask[rows]])
+                distances = exact_distances(
+                    np.asarray(vectors[rows], dtype=np.float32),
+                    queries[q_start + i:q_start + i + 1],
+                    space
+                )[0]
+                order = np.argsort(distances, kind="stable")[:n_results]
+                ids = [row_ids[int(row)] for row in rows[order]]
+                results.append((
+                    [chunk_id for chunk_id in ids if chunk_id is not None],
+                    [float(distances[j]) for j, chunk_id in zip(order, ids) if chunk_id is not None]
+                ))
+        return results
+    
+    @staticmethod
+    def _exact_top_rows(
+        vectors: np.ndarray,
+        live: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        space: str
+    ) -> np.ndarray:
+        """확보해 둔 원본 벡터 전수 스캔으로 정확한 top-k 행 번호 계산 (recall 측정용)"""
+        size = len(live)
+        distances = np.empty((len(queries), size), dtype=np.float32)
+        for start in range(0, size, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, size)
+            distances[:, start:end] = exact_distances(np.asarray(vectors[start:end]), queries, space)
+        distances[:, ~live] = np.inf
+        k = min(k, int(live.sum()))
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+        return np.take_along_axis(top, order, axis=1)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        메모리 사용량 통계
+        
+        Returns:
+            통계 딕셔너리 (mode, count, dim, quantized_bytes, float32_bytes, compression_ratio)
+        """
+        count = len(self.matrix)
+        dim = self.matrix.dim or 0
+        quantized_bytes = count * (self._code_width(dim) + (4 if self.mode == "int8" else 0))
+        if self._thresholds is not None:
+            quantized_bytes += self._thresholds.nbytes
+        float32_bytes = count * dim * 4
+        return {
+            "mode": self.mode,
+            "count": count,
+            "dim": dim,
+            "quantized_bytes": quantized_bytes,
+            "float32_bytes": float32_bytes,
+            "compression_ratio": round(float32_bytes / quantized_bytes, 2) if quantized_bytes else None,
+            "memory_saved_bytes": float32_bytes - quantized_bytes,
+        }
+    
+    def evaluate_recall(
+        self,
+        num_queries: int = 100,
+        k: int = 10,
+        space: str = "cosine",
+        oversample: int = 10,
+        seed: int = 0
+    ) -> Dict[str, Any]:
+        """
+        저장된 벡터 일부를 쿼리로 사용하여 정확 검색 대비 recall@k 측정
+        (쿼리 자신은 양쪽 결과에서 제외)
+        
+        Args:
+            num_queries: 쿼리 수
+            k: recall 기준 top-k
+            space: 거리 공간
+            oversample: 후보 수 배율
+            seed: 난수 시드
+            
+        Returns:
+            측정 결과 (k, queries, oversample, recall)
+        """
+        # 정확 검색과 쿼리 ID는 같은 시점에 확보한 행렬/마스크/ID 목록으로 계산
+        with self._lock:
+            vectors, live, row_ids = self.matrix.snapshot()
+        live_rows = np.flatnonzero(live)
+        if len(live_rows) < 2:
+            return {"k": k, "queries": 0, "oversample": oversample, "recall": None}
+        
+        rng = np.random.default_rng(seed)
+        query_rows = np.sort(rng.choice(live_rows, size=min(num_queries, len(live_rows)), replace=False))
+        queries = np.asarray(vectors[query_rows], dtype=np.float32)
+        query_ids = [row_ids[int(row)] for row in query_rows]
+        
+        approx = self.search_many(queries, k + 1, space=space, oversample=oversample)
+        exact_rows = self._exact_top_rows(vectors, live, queries, k + 1, space)
+        
+        hits = 0
+        total = 0
+        for query_id, (approx_ids, _), rows in zip(query_ids, approx, exact_rows):
+            expected = [row_ids[int(row)] for row in rows]
+            expected = [chunk_id for chunk_id in expected if chunk_id is not None and chunk_id != query_id][:k]
+            found = [chunk_id for chunk_id in approx_ids if chunk_id != query_id][:k]
+            hits += len(set(expected) & set(found))
+            total += len(expected)
+        
+        return {
+            "k": k,
+            "queries": len(query_ids),
+            "oversample": oversample,
+            "recall": round(hits / total, 4) if total else None,
+        }
+    
+    def close(self) -> None:
+        """원본 행렬 파일 닫기"""
+        self.matrix.close()
@@ -0,0 +1,401 @@
+"""
+컬렉션 레지스트리
+요청마다 지정한 컬렉션을 지연해서 열고 (생성은 저장 요청에서만), 열린 컬렉션 수와 추정 메모리 사용량을 기준으로
+가장 오래 사용하지 않은 컬렉션부터 내보내는 LRU
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from app.config import settings
+from app.vectorstore.base import CollectionNotFoundError, add_chunk_change_listener
+from app.vectorstore.mmr import mmr_select, take_results
+
+logger = logging.getLogger(__name__)
+
+# ChromaDB 컬렉션 이름 규칙 (3~63자, 영숫자로 시작/끝, 영숫자/_/- 허용)
+COLLECTION_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_-]{1,61}[a-zA-Z0-9]$")
+
+# 여러 컬렉션 동시 검색용 스레드 풀
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_executor_lock = threading.Lock()
+
+
+def validate_collection_name(collection_name: str) -> str:
+    """
+    요청으로 받은 컬렉션 이름 검증
+    
+    Args:
+        collection_name: 컬렉션 이름
+        
+    Returns:
+        검증된 컬렉션 이름
+        
+    Raises:
+        ValueError: 이름 형식이 잘못되었거나 허용 목록(allowed_collections)에 없는 경우
+    """
+    if not COLLECTION_NAME_PATTERN.match(collection_name):
+        raise ValueError(f"Invalid collection name: {collection_name}")
+    allowed = settings.allowed_collections
+    if allowed is not None and collection_name != settings.collection_name and collection_name not in allowed:
+        raise ValueError(f"Collection not allowed: {collection_name}")
+    return collection_name
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    global _fanout_executor
+    with _fanout_executor_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=settings.fanout_max_workers,
+                thread_name_prefix="collection-fanout"
+            )
+        return _fanout_executor
+
+
+class CollectionRegistry:
+    """
+    열린 벡터 스토어 LRU
+    
+    - 기본 컬렉션(settings.collection_name)은 내보내지 않음
+    - lease()로 사용 중인 컬렉션은 내보내지 않음
+    - 내보낸 스토어는 release()로 인덱스 메모리를 해제하고, 다음 요청 시 다시 엶
+    """
+    
+    def __init__(
+        self,
+        opener: Callable[[str], Any],
+        max_open: Optional[int] = None,
+        memory_budget_mb: Optional[int] = None
+    ):
+        """
+        레지스트리 초기화
+        
+        Args:
+            opener: (컬렉션 이름, create)를 받아 새 벡터 스토어를 여는 함수
+                (create가 False이고 컬렉션이 없으면 CollectionNotFoundError)
+            max_open: 최대 열린 컬렉션 수 (기본값: settings.max_open_collections)
+            memory_budget_mb: 열린 컬렉션의 추정 메모리 합계 상한 (기본값: settings.collection_memory_budget_mb, 0이면 제한 없음)
+        """
+        self._opener = opener
+        self._max_open = max_open
+        self._memory_budget_mb = memory_budget_mb
+        self._stores: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._in_use: Dict[Tuple[str, str], int] = {}
+        # 컬렉션을 여는 중인 키 (같은 컬렉션을 동시에 요청하면 먼저 연 쪽의 결과를 기다림)
+        self._opening: Dict[Tuple[str, str], Future] = {}
+        # 스토어별 추정 메모리 (열 때 측정하고, 쓰기가 있었던 스토어만 다음 반납 시 다시 측정)
+        self._estimates: Dict[Tuple[str, str], int] = {}
+        self._stale_estimates: set = set()
+        self._lock = threading.RLock()
+        add_chunk_change_listener(self._on_chunk_change)
+    
+    @property
+    def max_open(self) -> int:
+        return self._max_open if self._max_open is not None else settings.max_open_collections
+    
+    @property
+    def memory_budget_bytes(self) -> int:
+        budget_mb = self._memory_budget_mb if self._memory_budget_mb is not None else settings.collection_memory_budget_mb
+        return budget_mb * 1024 * 1024
+    
+    @staticmethod
+    def _key(collection_name: Optional[str]) -> Tuple[str, str]:
+        return settings.vector_db_type.lower(), collection_name or settings.collection_name
+    
+    def _is_pinned(self, key: Tuple[str, str]) -> bool:
+        return key[1] == settings.collection_name
+    
+    def _on_chunk_change(self, collection_name: str, ids: Optional[List[str]]) -> None:
+        """청크 변경 리스너 (해당 컬렉션의 메모리 추정치를 다시 측정하도록 표시)"""
+        with self._lock:
+            for key in self._stores:
+                if key[1] == collection_name:
+                    self._stale_estimates.add(key)
+    
+    @staticmethod
+    def _measure(key: Tuple[str, str], store) -> int:
+        """스토어 추정 메모리 측정 (server 모드에서는 HTTP 호출이므로 잠금 밖에서 호출)"""
+        try:
+            return store.estimate_memory_bytes()
+        except Exception as e:
+            logger.warning(f"[CollectionRegistry] 메모리 추정 실패 - {key[1]}: {e}")
+            return 0
+    
+    def get(self, collection_name: Optional[str] = None, create: bool = False):
+        """
+        컬렉션의 벡터 스토어 반환 (열려 있지 않으면 열고, 한도를 넘으면 오래된 컬렉션을 내보냄)
+        
+        Args:
+            collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+            create: 컬렉션이 없으면 생성할지 여부 (저장 요청에서만 True, 기본 컬렉션은 항상 생성)
+            
+        Returns:
+            벡터 스토어 인스턴스
+            
+        Raises:
+            CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
+        """
+        return self._acquire(collection_name, create, lease=False)
+    
+    def _acquire(self, collection_name: Optional[str], create: bool, lease: bool):
+        """
+        스토어 반환 (lease면 같은 잠금 구간에서 사용 중으로 표시)
+        
+        컬렉션 열기(사이드카 색인 동기화 포함)는 레지스트리 잠금 밖에서 실행하여
+        다른 컬렉션 요청을 막지 않고, 같은 컬렉션을 동시에 열면 한 번만 엽니다.
+        """
+        key = self._key(collection_name)
+        while True:
+            with self._lock:
+                store = self._stores.get(key)
+                if store is not None:
+                    self._stores.move_to_end(key)
+                    if lease:
+                        self._in_use[key] = self._in_use.get(key, 0) + 1
+                    return store
+                future = self._opening.get(key)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self._opening[key] = future
+            
+            if not owner:
+                try:
+                    future.result()
+                except CollectionNotFoundError:
+                    # 먼저 연 요청은 생성하지 않는 요청이었음 (생성 요청이면 직접 다시 엶)
+                    if not create:
+                        raise
+                # 열린 스토어를 다시 확인 (그 사이 내보내졌으면 다시 엶)
+                continue
+            
+            logger.info(f"[CollectionRegistry] 컬렉션 열기 - {key[1]} ({key[0]})")
+            try:
+                store = self._opener(key[1], create=create or self._is_pinned(key))
+                estimate = self._measure(key, store)
+            except BaseException as e:
+                with self._lock:
+                    del self._opening[key]
+                future.set_exception(e)
+                raise
+            
+            with self._lock:
+                del self._opening[key]
+                self._stores[key] = store
+                self._estimates[key] = estimate
+                if lease:
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                victims = self._pick_victims(keep=key)
+            future.set_result(store)
+            self._release(victims)
+            return store
+    
+    @contextmanager
+    def lease(self, collection_name: Optional[str] = None, create: bool = False):
+        """
+        요청 처리 동안 컬렉션을 사용 중으로 표시 (그동안 LRU에서 내보내지 않음)
+        
+        Args:
+            collection_name: 컬렉션 이름 (기본값: settings.collection_name)
+            create: 컬렉션이 없으면 생성할지 여부 (저장 요청에서만 True)
+            
+        Yields:
+            벡터 스토어 인스턴스
+            
+        Raises:
+            CollectionNotFoundError: create가 False이고 컬렉션이 없는 경우
+        """
+        key = self._key(collection_name)
+        store = self._acquire(collection_name, create, lease=True)
+        try:
+            yield store
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if self._in_use[key] == 0:
+                    del self._in_use[key]
+                stale = key in self._stale_estimates and self._stores.get(key) is store
+                if stale:
+                    self._stale_estimates.discard(key)
+            if stale:
+                # 쓰기가 있었던 경우에만 다시 측정
+                estimate = self._measure(key, store)
+                with self._lock:
+                    if self._stores.get(key) is store:
+                        self._estimates[key] = estimate
+            # 한도를 넘은 경우에만 정리 (사용 중이라 내보내지 못했던 컬렉션 포함)
+            with self._lock:
+                victims = self._pick_victims() if self._over_limit() else []
+            self._release(victims)
+    
+    def _over_limit(self) -> bool:
+        """열린 컬렉션 수 또는 추정 메모리 합계(측정해 둔 값)가 한도를 넘었는지 여부 (잠금을 잡은 상태로 호출)"""
+        budget = self.memory_budget_bytes
+        return len(self._stores) > self.max_open or (budget > 0 and sum(self._estimates.values()) > budget)
+    
+    def _pick_victims(self, keep: Optional[Tuple[str, str]] = None) -> List[Tuple[Tuple[str, str], Any, int]]:
+        """
+        한도 안으로 들어올 때까지 오래 사용하지 않은 컬렉션부터 LRU에서 빼기 (잠금을 잡은 상태로 호출)
+        
+        Returns:
+            뺀 (키, 스토어, 추정 바이트) 리스트 (release()는 잠금 밖에서 호출)
+        """
+        victims = []
+        for key in list(self._stores.keys()):
+            if not self._over_limit():
+                break
+            if key == keep or self._is_pinned(key) or self._in_use.get(key):
+                continue
+            store = self._stores.pop(key)
+            self._stale_estimates.discard(key)
+            victims.append((key, store, self._estimates.pop(key, 0)))
+        return victims
+    
+    def _release(self, victims: List[Tuple[Tuple[str, str], Any, int]]) -> None:
+        """LRU에서 뺀 스토어의 인덱스 메모리와 파일 핸들 해제"""
+        for key, store, freed in victims:
+            try:
+                store.release()
+            except Exception as e:
+                logger.warning(f"[CollectionRegistry] 컬렉션 해제 실패 - {key[1]}: {e}")
+            logger.info(
+                f"[CollectionRegistry] 컬렉션 내보냄 - {key[1]} "
+                f"(추정 {freed / 1024 / 1024:.1f}MB, 열린 컬렉션 {len(self._stores)}개)"
+            )
+    
+    def evict(self, collection_name: str) -> bool:
+        """
+        컬렉션을 즉시 내보내기 (기본 컬렉션과 사용 중인 컬렉션은 제외)
+        
+        Args:
+            collection_name: 컬렉션 이름
+            
+        Returns:
+            내보냈는지 여부
+        """
+        key = self._key(collection_name)
+        with self._lock:
+            if key not in self._stores or self._is_pinned(key) or self._in_use.get(key):
+                return False
+            store = self._stores.pop(key)
+            self._stale_estimates.discard(key)
+            freed = self._estimates.pop(key, 0)
+        self._release([(key, store, freed)])
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        열린 컬렉션 통계 (추정 메모리는 열 때/쓰기 후 측정해 둔 값)
+        
+        Returns:
+            통계 딕셔너리 (max_open, memory_budget_bytes, collections: LRU 순서, 최근 사용이 마지막)
+        """
+        with self._lock:
+            return {
+                "max_open": self.max_open,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "estimated_bytes": sum(self._estimates.values()),
+                "collections": [
+                    {
+                        "collection": key[1],
+                        "backend": key[0],
+                        "estimated_bytes": self._estimates.get(key, 0),
+                        "in_use": self._in_use.get(key, 0),
+                        "pinned": self._is_pinned(key),
+                    }
+                    for key in self._stores
+                ],
+            }
+    
+    def search_collections(
+        self,
+        collection_names: List[str],
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        mmr: bool = False,
+        lambda_mult: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 컬렉션을 병렬로 검색하고 거리 순으로 top-k 병합
+        
+        컬렉션들이 같은 임베딩 모델과 거리 공간을 사용해야 거리를 비교할 수 있습니다.
+        
+        Args:
+            collection_names: 검색할 컬렉션 이름 리스트
+            query_embeddings: 쿼리 임베딩 벡터 리스트
+            n_results: 쿼리당 반환할 결과 수
+            filter_metadata: 메타데이터 필터 (모든 컬렉션에 공통 적용)
+            mmr: 병합한 후보(n_results x mmr_oversample)에서 MMR로 n_results개 선택
+            lambda_mult: MMR 관련도 가중치 (기본값: settings.mmr_lambda)
+            
+        Returns:
+            쿼리 순서대로 병합된 검색 결과 (documents, distances, metadatas, ids, collections)
+            
+        Raises:
+            CollectionNotFoundError: 없는 컬렉션이 포함된 경우
+        """
+        collection_names = list(dict.fromkeys(collection_names))
+        final_n_results = n_results
+        if mmr:
+            n_results = n_results * settings.mmr_oversample
+        
+        def search_one(collection_name: str) -> List[Dict[str, Any]]:
+            with self.lease(collection_name) as store:
+                return store.search_many(query_embeddings, n_results=n_results, filter_metadata=filter_metadata)
+        
+        executor = _get_fanout_executor()
+        per_collection = list(executor.map(search_one, collection_names))
+        
+        merged = []
+        for query_index in range(len(query_embeddings)):
+            hits = []
+            for collection_name, results in zip(collection_names, per_collection):
+                result = results[query_index]
+                for doc, distance, metadata, doc_id in zip(
+                    result["documents"], result["distances"], result["metadatas"], result["ids"]
+                ):
+                    hits.append((distance, collection_name, doc_id, doc, metadata))
+            hits.sort(key=lambda hit: hit[0])
+            hits = hits[:n_results]
+            merged.append({
+                "documents": [hit[3] for hit in hits],
+                "distances": [hit[0] for hit in hits],
+                "metadatas": [hit[4] for hit in hits],
+                "ids": [hit[2] for hit in hits],
+                "collections": [hit[1] for hit in hits],
+            })
+        
+        if mmr:
+            merged = [
+                self._mmr_merged(query_embedding, result, final_n_results, lambda_mult)
+                for query_embedding, result in zip(query_embeddings, merged)
+            ]
+        return merged
+    
+    def _mmr_merged(
+        self,
+        query_embedding: List[float],
+        result: Dict[str, Any],
+        n_results: int,
+        lambda_mult: Optional[float]
+    ) -> Dict[str, Any]:
+        """병합 결과의 임베딩을 컬렉션별로 조회하여 MMR로 n_results개 선택"""
+        embeddings: Dict[Tuple[str, str], Any] = {}
+        for collection_name in dict.fromkeys(result["collections"]):
+            ids = [
+                chunk_id for chunk_id, name in zip(result["ids"], result["collections"])
+                if name == collection_name
+            ]
+            with self.lease(collection_name) as store:
+                for row in store.get_by_ids(ids, include=["embeddings"]):
+                    embeddings[(collection_name, row["id"])] = row.get("embedding")
+        
+        keys = list(zip(result["collections"], result["ids"]))
+        positions = [i for i, key in enumerate(keys) if embeddings.get(key) is not None]
+        order = mmr_select(query_embedding, [embeddings[keys[i]] for i in positions], n_results, lambda_mult)
+        return take_results(result, [positions[i] for i in order])
@@ -0,0 +1,63 @@
+"""
+로컬 인덱스 서버
+ChromaDB 컬렉션을 하나의 프로세스가 소유하고, API 워커들은 HTTP(keep-alive 연결 풀)로 접근
+
+사용 예:
+    # 1. 인덱스 서버 실행 (chroma_db_path 디렉토리 사용)
+    python -m app.vectorstore.server
+    
+    # 2. API 워커 실행 (VECTOR_DB_MODE=server)
+    VECTOR_DB_MODE=server WEB_CONCURRENCY=4 uvicorn app.main:app
+"""
+import argparse
+import logging
+import os
+import chromadb.config
+import uvicorn
+from chromadb.server.fastapi import FastAPI as ChromaServer
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(db_path: str = None):
+    """
+    인덱스 서버 ASGI 앱 생성
+    
+    Args:
+        db_path: ChromaDB 저장 경로 (기본값: settings.chroma_db_path)
+        
+    Returns:
+        ChromaDB 서버 FastAPI 앱
+    """
+    db_path = db_path or settings.chroma_db_path
+    os.makedirs(db_path, exist_ok=True)
+    server_settings = chromadb.config.Settings(
+        is_persistent=True,
+        persist_directory=db_path,
+        anonymized_telemetry=False,
+        allow_reset=False
+    )
+    return ChromaServer(server_settings).app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 ChromaDB 인덱스 서버")
+    parser.add_argument("--host", default=settings.index_server_host, help="바인딩 주소 (기본값: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=settings.index_server_port, help="포트")
+    parser.add_argument("--db-path", default=settings.chroma_db_path, help="ChromaDB 저장 경로")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    logger.info(f"[IndexServer] 시작 - {args.host}:{args.port}, 경로: {args.db_path}")
+    
+    # 인덱스를 하나만 메모리에 올리기 위해 단일 워커로 실행
+    uvicorn.run(create_app(args.db_path), host=args.host, port=args.port, workers=1)
+
+
+if __name__ == "__main__":
+    main()
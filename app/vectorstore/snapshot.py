@@ -0,0 +1,331 @@
+"""
+컬렉션 스냅샷 내보내기/가져오기
+새 노드를 재임베딩 없이 빠르게 띄우기 위한 바이너리 번들
+
+번들 구조 (디렉토리):
+    manifest.json      형식 버전, 임베딩 모델, 차원, 청크 수, 인덱스 설정, 파일 체크섬
+    embeddings.npy     (청크 수, 차원) float32 행렬 (압축하지 않아 mmap으로 바로 읽음)
+    records.jsonl.gz   행 순서대로 {"id", "text", "metadata"} (gzip 압축)
+    
+사용 예:
+    python -m app.vectorstore.snapshot export --output ./snapshots/documents
+    python -m app.vectorstore.snapshot import --input ./snapshots/documents --replace
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl.gz"
+
+
+def _sha256(path: str) -> str:
+    """파일 SHA-256 체크섬"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(4 * 1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_base_dir() -> str:
+    """스냅샷 기본 디렉토리 (settings.snapshot_dir, 없으면 {chroma_db_path}/snapshots)"""
+    return settings.snapshot_dir or os.path.join(settings.chroma_db_path, "snapshots")
+
+
+def default_snapshot_path(collection_name: str) -> str:
+    """
+    기본 스냅샷 경로 ({snapshot_dir}/{컬렉션}-{시각})
+    
+    Args:
+        collection_name: 컬렉션 이름
+        
+    Returns:
+        스냅샷 디렉토리 경로
+    """
+    return os.path.join(snapshot_base_dir(), f"{collection_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+
+def resolve_snapshot_path(relative_path: str) -> str:
+    """
+    API로 받은 스냅샷 경로를 스냅샷 기본 디렉토리 안의 경로로 변환
+    
+    CLI는 임의 경로를 쓸 수 있지만, HTTP 요청은 기본 디렉토리 밖을 읽거나 쓰지 못하게 합니다.
+    
+    Args:
+        relative_path: 스냅샷 기본 디렉토리 기준 상대 경로
+        
+    Returns:
+        스냅샷 디렉토리 절대 경로
+        
+    Raises:
+        ValueError: 절대 경로이거나 '..'를 포함하거나 기본 디렉토리 밖을 가리키는 경우
+    """
+    if not relative_path or os.path.isabs(relative_path) or os.path.splitdrive(relative_path)[0]:
+        raise ValueError(f"Snapshot path must be relative to the snapshot directory: {relative_path!r}")
+    if ".." in relative_path.replace("\\", "/").split("/"):
+        raise ValueError(f"Snapshot path must not contain '..': {relative_path!r}")
+    
+    base_dir = os.path.realpath(snapshot_base_dir())
+    resolved = os.path.realpath(os.path.join(base_dir, relative_path))
+    if resolved == base_dir or os.path.commonpath([base_dir, resolved]) != base_dir:
+        raise ValueError(f"Snapshot path is outside the snapshot directory: {relative_path!r}")
+    return resolved
+
+
+def read_manifest(snapshot_path: str) -> Dict[str, Any]:
+    """
+    스냅샷 manifest 읽기
+    
+    Args:
+        snapshot_path: 스냅샷 디렉토리
+        
+    Returns:
+        manifest 딕셔너리
+        
+    Raises:
+        ValueError: manifest가 없거나 지원하지 않는 형식 버전인 경우
+    """
+    manifest_path = os.path.join(snapshot_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"Snapshot manifest not found: {manifest_path}")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format version: {manifest.get('format_version')} "
+            f"(expected {SNAPSHOT_FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def export_snapshot(vectorstore, output_path: Optional[str] = None, batch_size: int = 2000) -> Dict[str, Any]:
+    """
+    컬렉션을 스냅샷 번들로 내보내기
+    
+    일관된 스냅샷을 위해 내보내는 동안 벡터 스토어 쓰기를 잠급니다 (검색은 계속 가능).
+    
+    Args:
+        vectorstore: 벡터 스토어 (ChromaVectorStore 또는 NumpyVectorStore)
+        output_path: 스냅샷 디렉토리 (기본값: default_snapshot_path)
+        batch_size: 한 번에 읽어올 청크 수
+        
+    Returns:
+        manifest 딕셔너리 (path, seconds 포함)
+    """
+    started = time.perf_counter()
+    output_path = output_path or default_snapshot_path(vectorstore.collection_name)
+    if os.path.exists(output_path):
+        raise ValueError(f"Snapshot path already exists: {output_path}")
+    
+    # 임시 디렉토리에 쓴 뒤 이름을 바꿔 중단된 번들이 남지 않도록 함
+    tmp_path = f"{output_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    
+    try:
+        with vectorstore._write_lock:
+            total = vectorstore.count()
+            embeddings = None
+            written = 0
+            with gzip.open(os.path.join(tmp_path, RECORDS_FILE), "wt", encoding="utf-8", compresslevel=6) as records:
+                for results in vectorstore.iter_records(batch_size=batch_size):
+                    batch = np.asarray(results["embeddings"], dtype=np.float32)
+                    if embeddings is None:
+                        embeddings = np.lib.format.open_memmap(
+                            os.path.join(tmp_path, EMBEDDINGS_FILE),
+                            mode="w+",
+                            dtype=np.float32,
+                            shape=(total, batch.shape[1])
+                        )
+                    embeddings[written:written + len(batch)] = batch
+                    for chunk_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"]):
+                        records.write(json.dumps(
+                            {"id": chunk_id, "text": text, "metadata": metadata or {}},
+                            ensure_ascii=False
+                        ) + "\n")
+                    written += len(batch)
+            
+            if written != total:
+                raise RuntimeError(f"Collection changed during export: expected {total} chunks, read {written}")
+            
+            if embeddings is None:
+                # 빈 컬렉션
+                np.save(os.path.join(tmp_path, EMBEDDINGS_FILE), np.zeros((0, 0), dtype=np.float32))
+                dim = 0
+            else:
+                embeddings.flush()
+                dim = int(embeddings.shape[1])
+                del embeddings
+            
+            index_params = vectorstore.get_index_params()
+        
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "collection_name": vectorstore.collection_name,
+            "backend": type(vectorstore).__name__,
+            "embedding_model": settings.embedding_model,
+            "dim": dim,
+            "count": written,
+            "index_params": index_params,
+            "files": {
+                EMBEDDINGS_FILE: _sha256(os.path.join(tmp_path, EMBEDDINGS_FILE)),
+                RECORDS_FILE: _sha256(os.path.join(tmp_path, RECORDS_FILE)),
+            },
+        }
+        with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        os.replace(tmp_path, output_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    
+    seconds = time.perf_counter() - started
+    logger.info(f"[Snapshot] 내보내기 완료 - {output_path}, 청크 {written}개, {seconds:.1f}초")
+    return {**manifest, "path": output_path, "seconds": round(seconds, 3)}
+
+
+def import_snapshot(
+    vectorstore,
+    snapshot_path: str,
+    replace: bool = True,
+    batch_size: Optional[int] = None,
+    verify: bool = True,
+    allow_model_mismatch: bool = False
+) -> Dict[str, Any]:
+    """
+    스냅샷 번들을 컬렉션으로 가져오기 (임베딩을 다시 계산하지 않음)
+    
+    Args:
+        vectorstore: 벡터 스토어 (ChromaVectorStore 또는 NumpyVectorStore)
+        snapshot_path: 스냅샷 디렉토리
+        replace: 가져오기 전에 기존 청크를 모두 삭제할지 여부 (False면 같은 ID만 덮어씀)
+        batch_size: 한 번에 저장할 청크 수 (기본값: settings.snapshot_import_batch_size)
+        verify: 파일 체크섬 검증 여부
+        allow_model_mismatch: 임베딩 모델이 현재 설정과 달라도 가져올지 여부
+        
+    Returns:
+        가져오기 결과 (imported, seconds, manifest)
+        
+    Raises:
+        ValueError: 형식 버전/임베딩 모델/체크섬/행 수가 맞지 않는 경우
+    """
+    started = time.perf_counter()
+    batch_size = batch_size or settings.snapshot_import_batch_size
+    manifest = read_manifest(snapshot_path)
+    
+    if manifest["embedding_model"] != settings.embedding_model and not allow_model_mismatch:
+        raise ValueError(
+            f"Snapshot was built with embedding model '{manifest['embedding_model']}', "
+            f"but current model is '{settings.embedding_model}'"
+        )
+    
+    if verify:
+        for file_name, checksum in manifest["files"].items():
+            if _sha256(os.path.join(snapshot_path, file_name)) != checksum:
+                raise ValueError(f"Snapshot checksum mismatch: {file_name}")
+    
+    embeddings = np.load(os.path.join(snapshot_path, EMBEDDINGS_FILE), mmap_mode="r")
+    if embeddings.shape[0] != manifest["count"]:
+        raise ValueError(f"Snapshot embeddings have {embeddings.shape[0]} rows, manifest says {manifest['count']}")
+    
+    if replace:
+        vectorstore.delete_all()
+    
+    imported = 0
+    with gzip.open(os.path.join(snapshot_path, RECORDS_FILE), "rt", encoding="utf-8") as records:
+        ids, texts, metadatas = [], [], []
+        for line in records:
+            record = json.loads(line)
+            ids.append(record["id"])
+            texts.append(record["text"])
+            metadatas.append(record["metadata"])
+            if len(ids) >= batch_size:
+                vectorstore.upsert_documents(
+                    texts=texts,
+                    embeddings=embeddings[imported:imported + len(ids)].tolist(),
+                    metadatas=metadatas,
+                    ids=ids
+                )
+                imported += len(ids)
+                ids, texts, metadatas = [], [], []
+        if ids:
+            vectorstore.upsert_documents(
+                texts=texts,
+                embeddings=embeddings[imported:imported + len(ids)].tolist(),
+                metadatas=metadatas,
+                ids=ids
+            )
+            imported += len(ids)
+    
+    if imported != manifest["count"]:
+        raise ValueError(f"Snapshot records have {imported} rows, manifest says {manifest['count']}")
+    
+    if vectorstore.lexical_index is not None:
+        # 대량 적재 후 어휘 색인 델타를 기본 세그먼트로 병합
+        vectorstore.lexical_index.compact()
+    vectorstore.rebuild_document_centroids()
+    
+    seconds = time.perf_counter() - started
+    logger.info(f"[Snapshot] 가져오기 완료 - {snapshot_path}, 청크 {imported}개, {seconds:.1f}초")
+    return {"imported": imported, "seconds": round(seconds, 3), "manifest": manifest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컬렉션 스냅샷 내보내기/가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="스냅샷 내보내기")
+    export_parser.add_argument("--output", default=None, help="스냅샷 디렉토리 (기본값: {snapshot_dir}/{컬렉션}-{시각})")
+    export_parser.add_argument("--collection", default=None, help="컬렉션 이름 (기본값: settings.collection_name)")
+    
+    import_parser = subparsers.add_parser("import", help="스냅샷 가져오기")
+    import_parser.add_argument("--input", required=True, help="스냅샷 디렉토리")
+    import_parser.add_argument("--collection", default=None, help="컬렉션 이름 (기본값: settings.collection_name)")
+    import_parser.add_argument("--replace", action="store_true", help="기존 청크를 모두 삭제한 뒤 가져오기")
+    import_parser.add_argument("--batch-size", type=int, default=None, help="저장 배치 크기 (기본값: settings.snapshot_import_batch_size)")
+    import_parser.add_argument("--allow-model-mismatch", action="store_true", help="임베딩 모델이 달라도 가져오기")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
+    from app.vectorstore.factory import create_vectorstore
+    vectorstore = create_vectorstore(collection_name=args.collection)
+    
+    if args.command == "export":
+        result = export_snapshot(vectorstore, args.output)
+    else:
+        result = import_snapshot(
+            vectorstore,
+            args.input,
+            replace=args.replace,
+            batch_size=args.batch_size,
+            allow_model_mismatch=args.allow_model_mismatch
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
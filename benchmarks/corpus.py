@@ -0,0 +1,185 @@
+"""
+벤치마크용 문서 코퍼스 생성기
+한국어/영어가 섞인 마크다운/HTML 문서(헤더, 코드 블록, 표 포함)를 생성
+"""
+import os
+import random
+from typing import List, Dict, Any
+
+KO_SENTENCES = [
+    "이 설정은 애플리케이션 시작 시 한 번만 읽힙니다.",
+    "요청 본문은 JSON 형식으로 전달해야 합니다.",
+    "세션 ID가 없으면 서버에서 새로 생성합니다.",
+    "임베딩 모델을 변경하면 기존 컬렉션을 다시 생성해야 합니다.",
+    "청크 크기가 너무 크면 검색 정확도가 떨어질 수 있습니다.",
+    "오류가 발생하면 서버 로그에서 상세 내용을 확인하세요.",
+    "이 API는 인증 토큰이 필요합니다.",
+    "대량 업로드는 디렉토리 경로를 사용하는 것이 좋습니다.",
+    "응답 시간은 검색할 문서 수에 비례하여 증가합니다.",
+    "설정 파일의 값은 환경 변수로 덮어쓸 수 있습니다.",
+]
+
+EN_SENTENCES = [
+    "The client retries the request when the server returns a 503 status.",
+    "Use the mock endpoint to validate your schema before deployment.",
+    "Each chunk keeps the header path of the section it came from.",
+    "The default timeout is thirty seconds for every outbound call.",
+    "Set the environment variable before starting the container.",
+    "The specification is validated against the OpenAPI 3.1 schema.",
+    "Pagination parameters are limit and offset.",
+    "Vector search returns the nearest chunks by cosine distance.",
+    "The response contains the generated answer and its sources.",
+    "Large uploads should be split into several smaller requests.",
+]
+
+TOPICS = [
+    ("설치", "Installation"),
+    ("빠른 시작", "Quick Start"),
+    ("설정", "Configuration"),
+    ("API 레퍼런스", "API Reference"),
+    ("문제 해결", "Troubleshooting"),
+    ("스키마", "Schema"),
+    ("배포", "Deployment"),
+    ("인증", "Authentication"),
+]
+
+CODE_SAMPLES = [
+    ("python", "from app.ingest.pipeline import IngestPipeline\n\npipeline = IngestPipeline()\nresult = pipeline.ingest_text(text, metadata={\"source\": \"docs\"})\nprint(result[\"chunks_count\"])"),
+    ("bash", "curl -X POST \"http://localhost:8000/chat\" \\\n  -H \"Content-Type: application/json\" \\\n  -d '{\"message\": \"설치 방법 알려줘\"}'"),
+    ("yaml", "server:\n  port: 8080\n  timeout: 30s\nmock:\n  enabled: true\n  delay_ms: 150"),
+    ("json", "{\n  \"type\": \"object\",\n  \"properties\": {\n    \"id\": {\"type\": \"string\"},\n    \"count\": {\"type\": \"integer\"}\n  }\n}"),
+]
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    """한국어/영어 문장을 섞어 문단 생성"""
+    parts = []
+    for _ in range(sentences):
+        pool = KO_SENTENCES if rng.random() < 0.5 else EN_SENTENCES
+        parts.append(rng.choice(pool))
+    return " ".join(parts)
+
+
+def _table_rows(rng: random.Random) -> List[List[str]]:
+    """설정 키 표 데이터 생성"""
+    rows = []
+    for i in range(rng.randint(3, 6)):
+        rows.append([
+            f"option_{rng.randint(1, 999)}",
+            rng.choice(["string", "integer", "boolean"]),
+            rng.choice(["기본값 없음", "true", "30", "\"default\""]),
+            rng.choice(KO_SENTENCES + EN_SENTENCES)
+        ])
+    return rows
+
+
+def generate_markdown(rng: random.Random, sections: int) -> str:
+    """
+    마크다운 문서 하나 생성
+    
+    Args:
+        rng: 난수 생성기
+        sections: 섹션 수
+        
+    Returns:
+        마크다운 텍스트
+    """
+    ko_title, en_title = rng.choice(TOPICS)
+    lines = [f"# {ko_title} ({en_title})", "", _paragraph(rng, 3), ""]
+    
+    for i in range(sections):
+        level = "##" if i % 3 == 0 else "###"
+        ko_sub, en_sub = rng.choice(TOPICS)
+        lines += [f"{level} {ko_sub} {i + 1} - {en_sub}", "", _paragraph(rng, rng.randint(3, 12)), ""]
+        
+        roll = rng.random()
+        if roll < 0.35:
+            lang, code = rng.choice(CODE_SAMPLES)
+            lines += [f"```{lang}", code, "```", ""]
+        elif roll < 0.6:
+            lines += ["| 키 | 타입 | 기본값 | 설명 |", "| --- | --- | --- | --- |"]
+            lines += ["| " + " | ".join(row) + " |" for row in _table_rows(rng)]
+            lines.append("")
+    
+    return "\n".join(lines)
+
+
+def generate_html(rng: random.Random, sections: int) -> str:
+    """
+    HTML 문서 하나 생성
+    
+    Args:
+        rng: 난수 생성기
+        sections: 섹션 수
+        
+    Returns:
+        HTML 텍스트
+    """
+    ko_title, en_title = rng.choice(TOPICS)
+    body = [f"<h1>{ko_title} ({en_title})</h1>", f"<p>{_paragraph(rng, 3)}</p>"]
+    
+    for i in range(sections):
+        ko_sub, en_sub = rng.choice(TOPICS)
+        body.append(f"<h2>{ko_sub} {i + 1} - {en_sub}</h2>")
+        body.append(f"<p>{_paragraph(rng, rng.randint(3, 12))}</p>")
+        
+        roll = rng.random()
+        if roll < 0.35:
+            _, code = rng.choice(CODE_SAMPLES)
+            body.append(f"<pre><code>{code}</code></pre>")
+        elif roll < 0.6:
+            rows = "".join(
+                "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
+                for row in _table_rows(rng)
+            )
+            body.append(f"<table><tr><th>키</th><th>타입</th><th>기본값</th><th>설명</th></tr>{rows}</table>")
+    
+    return (
+        f"<html><head><title>{en_title}</title><script>console.log('x')</script></head>"
+        f"<body><main>{''.join(body)}</main></body></html>"
+    )
+
+
+def generate_corpus(
+    output_dir: str,
+    num_docs: int = 100,
+    sections_per_doc: int = 12,
+    html_ratio: float = 0.2,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    디렉토리에 마크다운/HTML 코퍼스 생성
+    
+    Args:
+        output_dir: 생성할 디렉토리
+        num_docs: 문서 수
+        sections_per_doc: 문서당 평균 섹션 수
+        html_ratio: HTML 문서 비율
+        seed: 난수 시드 (같은 시드면 같은 코퍼스)
+        
+    Returns:
+        생성된 파일 정보 리스트 (path, type, bytes)
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    files = []
+    for i in range(num_docs):
+        sections = max(1, int(rng.gauss(sections_per_doc, sections_per_doc / 3)))
+        sub_dir = os.path.join(output_dir, f"section_{i % 10}")
+        os.makedirs(sub_dir, exist_ok=True)
+        
+        if rng.random() < html_ratio:
+            path = os.path.join(sub_dir, f"page_{i:05d}.html")
+            content = generate_html(rng, sections)
+            doc_type = "html"
+        else:
+            path = os.path.join(sub_dir, f"doc_{i:05d}.md")
+            content = generate_markdown(rng, sections)
+            doc_type = "markdown"
+        
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        files.append({"path": path, "type": doc_type, "bytes": len(content.encode("utf-8"))})
+    
+    return files
@@ -0,0 +1,153 @@
+"""
+가짜 OpenAI 호환 서버
+LLM HTTP 클라이언트(연결 풀, 재시도, 헤지 요청)를 실제 API 없이 시험하기 위한 /v1/chat/completions 서버
+
+응답 지연, 느린 꼬리 요청(slow-rate), 429/5xx 오류 비율을 조절할 수 있고 stream=true면 SSE로 토큰을 보냅니다.
+받은 요청 수와 상태 코드별 응답 수는 GET /stats로 확인합니다.
+
+사용 예:
+    python -m benchmarks.fake_openai_server --port 9000 --delay-ms 200 --slow-rate 0.05 --slow-ms 3000 --error-rate 0.1
+    OPENAI_API_KEY=fake OPENAI_API_BASE=http://127.0.0.1:9000/v1 python main.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Dict, Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FAKE_ANSWER = "가짜 서버의 응답입니다. 설치 방법은 공식 문서를 참고하세요."
+
+
+def create_app(
+    delay_ms: float = 200,
+    slow_rate: float = 0.0,
+    slow_ms: float = 3000,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    token_delay_ms: float = 20,
+    seed: int = 42
+) -> FastAPI:
+    """
+    가짜 OpenAI 호환 서버 앱 생성
+    
+    Args:
+        delay_ms: 응답(스트리밍은 첫 토큰) 전 기본 지연 (ms)
+        slow_rate: slow_ms만큼 지연되는 요청 비율 (꼬리 지연 재현)
+        slow_ms: 느린 요청의 지연 (ms)
+        error_rate: error_status로 실패하는 요청 비율
+        error_status: 실패 상태 코드 (429면 Retry-After: 0 헤더 포함)
+        token_delay_ms: 스트리밍 토큰 사이 간격 (ms)
+        seed: 난수 시드
+        
+    Returns:
+        FastAPI 앱
+    """
+    app = FastAPI(title="Fake OpenAI-compatible server")
+    rng = random.Random(seed)
+    stats: Dict[str, Any] = {"requests": 0, "statuses": {}}
+    
+    def _count(status: int) -> None:
+        stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        
+        if rng.random() < error_rate:
+            _count(error_status)
+            headers = {"Retry-After": "0"} if error_status == 429 else None
+            return JSONResponse(
+                status_code=error_status,
+                content={"error": {"message": "fake upstream error", "type": "server_error"}},
+                headers=headers
+            )
+        
+        delay = slow_ms if rng.random() < slow_rate else delay_ms
+        await asyncio.sleep(delay / 1000)
+        _count(200)
+        
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": FAKE_ANSWER},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+            }
+        
+        async def events():
+            for i, token in enumerate(FAKE_ANSWER.split(" ")):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": token if i == 0 else f" {token}"},
+                        "finish_reason": None
+                    }]
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(token_delay_ms / 1000)
+            done = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+        
+        return StreamingResponse(events(), media_type="text/event-stream")
+    
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+    
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 OpenAI 호환 서버 (LLM HTTP 클라이언트 시험용)")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩 주소")
+    parser.add_argument("--port", type=int, default=9000, help="포트")
+    parser.add_argument("--delay-ms", type=float, default=200, help="기본 응답 지연 (ms)")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="느린 요청 비율 (0~1)")
+    parser.add_argument("--slow-ms", type=float, default=3000, help="느린 요청 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--error-status", type=int, default=503, help="오류 상태 코드 (429, 500, 503 등)")
+    parser.add_argument("--token-delay-ms", type=float, default=20, help="스트리밍 토큰 간격 (ms)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args()
+    
+    app = create_app(
+        delay_ms=args.delay_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_delay_ms=args.token_delay_ms,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
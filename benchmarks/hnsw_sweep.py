@@ -0,0 +1,255 @@
+"""
+HNSW 파라미터 스윕 벤치마크
+설정 조합(space, M, construction_ef, search_ef)마다 임시 컬렉션을 만들어
+정확 검색(numpy) 대비 recall@k 와 쿼리 지연 시간(p50/p95)을 측정하여 JSON으로 저장
+
+사용 예:
+    # 합성 벡터로 측정
+    python -m benchmarks.hnsw_sweep --vectors 20000 --dim 768 --output bench_hnsw.json
+    
+    # 기존 컬렉션의 임베딩으로 측정 (일부 벡터를 쿼리로 사용)
+    python -m benchmarks.hnsw_sweep --from-collection documents --queries 200
+"""
+import argparse
+import itertools
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings as ChromaSettings
+
+from app.config import settings
+
+
+def _load_collection_vectors(collection_name: str, limit: Optional[int] = None) -> np.ndarray:
+    """기존 Chroma 컬렉션에서 임베딩 로드"""
+    from app.vectorstore.chroma import ChromaVectorStore
+    
+    store = ChromaVectorStore(collection_name=collection_name)
+    batches = []
+    total = 0
+    for results in store.iter_records(batch_size=2000, include=["embeddings"]):
+        batches.append(np.asarray(results["embeddings"], dtype=np.float32))
+        total += len(results["ids"])
+        if limit and total >= limit:
+            break
+    if not batches:
+        raise ValueError(f"Collection '{collection_name}' has no embeddings")
+    vectors = np.concatenate(batches)
+    return vectors[:limit] if limit else vectors
+
+
+def _synthetic_vectors(num_vectors: int, dim: int, seed: int) -> np.ndarray:
+    """클러스터 구조를 가진 합성 벡터 생성 (균일 난수보다 실제 임베딩 분포에 가까움)"""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 200)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, num_clusters, size=num_vectors)
+    noise = rng.standard_normal((num_vectors, dim)).astype(np.float32) * 0.5
+    return centers[assignments] + noise
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화 (e5 임베딩과 동일하게 단위 벡터로 맞춤)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """numpy 정확 검색으로 정답 top-k 인덱스 계산"""
+    if space == "l2":
+        # ||q - x||^2 = ||q||^2 - 2 q·x + ||x||^2 (쿼리 항은 순위에 영향 없음)
+        scores = 2 * queries @ corpus.T - np.sum(corpus ** 2, axis=1)
+    else:
+        # 정규화된 벡터이므로 cosine과 ip 모두 내적 순위
+        scores = queries @ corpus.T
+    top = np.argpartition(-scores, kth=min(k, corpus.shape[0] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _evaluate_config(
+    client,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    space: str,
+    m: int,
+    construction_ef: int,
+    search_ef: int
+) -> Dict[str, Any]:
+    """설정 하나로 컬렉션을 구축하고 recall@k / 지연 시간 측정"""
+    name = f"sweep_{space}_{m}_{construction_ef}_{search_ef}"
+    collection = client.create_collection(
+        name=name,
+        metadata={
+            "hnsw:space": space,
+            "hnsw:M": m,
+            "hnsw:construction_ef": construction_ef,
+            "hnsw:search_ef": search_ef,
+        }
+    )
+    
+    build_start = time.perf_counter()
+    batch_size = 5000
+    for start in range(0, corpus.shape[0], batch_size):
+        batch = corpus[start:start + batch_size]
+        collection.add(
+            ids=[str(i) for i in range(start, start + batch.shape[0])],
+            embeddings=batch.tolist()
+        )
+    build_seconds = time.perf_counter() - build_start
+    
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        query_start = time.perf_counter()
+        results = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        found = {int(doc_id) for doc_id in results["ids"][0]}
+        hits += len(found & set(expected.tolist()))
+    
+    client.delete_collection(name=name)
+    
+    latencies_ms = np.asarray(latencies)
+    return {
+        "space": space,
+        "m": m,
+        "construction_ef": construction_ef,
+        "search_ef": search_ef,
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "build_seconds": round(build_seconds, 3),
+    }
+
+
+def run_sweep(
+    spaces: List[str],
+    ms: List[int],
+    construction_efs: List[int],
+    search_efs: List[int],
+    k: int = 5,
+    num_queries: int = 200,
+    num_vectors: int = 10000,
+    dim: int = 768,
+    seed: int = 42,
+    from_collection: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    HNSW 설정 조합별 recall@k / 지연 시간 스윕
+    
+    Args:
+        spaces: 거리 공간 목록
+        ms: M 값 목록
+        construction_efs: construction_ef 값 목록
+        search_efs: search_ef 값 목록
+        k: recall 측정 기준 top-k
+        num_queries: 쿼리 수
+        num_vectors: 합성 벡터 수 (from_collection 사용 시 최대 로드 수)
+        dim: 합성 벡터 차원
+        seed: 난수 시드
+        from_collection: 임베딩을 가져올 기존 컬렉션 이름 (선택적)
+        
+    Returns:
+        측정 결과 딕셔너리
+    """
+    if from_collection:
+        vectors = _load_collection_vectors(from_collection, limit=num_vectors)
+    else:
+        vectors = _synthetic_vectors(num_vectors + num_queries, dim, seed)
+    vectors = _normalize(vectors.astype(np.float32))
+    
+    # 일부 벡터를 쿼리로 분리 (쿼리 자신이 정답에 포함되지 않도록)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(vectors.shape[0])
+    num_queries = min(num_queries, vectors.shape[0] // 10 or 1)
+    queries = vectors[order[:num_queries]]
+    corpus = vectors[order[num_queries:]]
+    
+    work_dir = tempfile.mkdtemp(prefix="hnsw_sweep_")
+    try:
+        client = chromadb.PersistentClient(
+            path=work_dir,
+            settings=ChromaSettings(anonymized_telemetry=False, allow_reset=True)
+        )
+        
+        truth_by_space = {}
+        results = []
+        for space, m, construction_ef, search_ef in itertools.product(spaces, ms, construction_efs, search_efs):
+            if space not in truth_by_space:
+                truth_by_space[space] = _exact_top_k(corpus, queries, k, space)
+            result = _evaluate_config(
+                client, corpus, queries, truth_by_space[space],
+                k, space, m, construction_ef, search_ef
+            )
+            print(json.dumps(result, ensure_ascii=False))
+            results.append(result)
+        
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "source": from_collection or "synthetic",
+                "corpus_size": int(corpus.shape[0]),
+                "dim": int(corpus.shape[1]),
+                "queries": int(queries.shape[0]),
+                "k": k,
+                "seed": seed,
+                "current_settings": {
+                    "space": settings.chroma_hnsw_space,
+                    "m": settings.chroma_hnsw_m,
+                    "construction_ef": settings.chroma_hnsw_construction_ef,
+                    "search_ef": settings.chroma_hnsw_search_ef,
+                },
+            },
+            "results": results
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW 파라미터 스윕 (recall@k vs 지연 시간)")
+    parser.add_argument("--spaces", default="cosine,l2", help="거리 공간 목록 (쉼표 구분)")
+    parser.add_argument("--m", default="8,16,32", help="M 값 목록")
+    parser.add_argument("--construction-ef", default="100,200", help="construction_ef 값 목록")
+    parser.add_argument("--search-ef", default="10,50,100,200", help="search_ef 값 목록")
+    parser.add_argument("--k", type=int, default=5, help="recall 기준 top-k")
+    parser.add_argument("--queries", type=int, default=200, help="쿼리 수")
+    parser.add_argument("--vectors", type=int, default=10000, help="벡터 수")
+    parser.add_argument("--dim", type=int, default=768, help="합성 벡터 차원")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--from-collection", default=None, help="임베딩을 가져올 기존 컬렉션 이름")
+    parser.add_argument("--output", default="bench_hnsw.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+    
+    result = run_sweep(
+        spaces=[s for s in args.spaces.split(",") if s],
+        ms=_int_list(args.m),
+        construction_efs=_int_list(args.construction_ef),
+        search_efs=_int_list(args.search_ef),
+        k=args.k,
+        num_queries=args.queries,
+        num_vectors=args.vectors,
+        dim=args.dim,
+        seed=args.seed,
+        from_collection=args.from_collection
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Ingest 처리량 벤치마크
+생성한 문서 코퍼스를 임시 Chroma 경로에 수집하면서 단계별 시간, 처리량,
+최대 메모리(RSS), 인덱스 디스크 크기를 측정하여 JSON으로 저장
+
+사용 예:
+    python -m benchmarks.ingest_benchmark --docs 200 --output bench_ingest.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from app.config import settings
+from benchmarks.corpus import generate_corpus
+
+
+def _peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _dir_size_mb(path: str) -> float:
+    """디렉토리 전체 크기 (MB)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / (1024 * 1024)
+
+
+def run_benchmark(
+    num_docs: int,
+    sections_per_doc: int,
+    html_ratio: float,
+    seed: int,
+    keep_files: bool = False
+) -> Dict[str, Any]:
+    """
+    코퍼스 생성 후 IngestPipeline으로 수집하며 측정
+    
+    Args:
+        num_docs: 문서 수
+        sections_per_doc: 문서당 평균 섹션 수
+        html_ratio: HTML 문서 비율
+        seed: 코퍼스 난수 시드
+        keep_files: 임시 코퍼스/DB 디렉토리를 남길지 여부
+        
+    Returns:
+        측정 결과 딕셔너리
+    """
+    work_dir = tempfile.mkdtemp(prefix="ingest_bench_")
+    corpus_dir = os.path.join(work_dir, "corpus")
+    db_dir = os.path.join(work_dir, "vector_db")
+    
+    try:
+        files = generate_corpus(
+            corpus_dir,
+            num_docs=num_docs,
+            sections_per_doc=sections_per_doc,
+            html_ratio=html_ratio,
+            seed=seed
+        )
+        
+        # 임시 Chroma 경로로 파이프라인 생성 (모델 로딩 시간은 별도로 기록)
+        settings.chroma_db_path = db_dir
+        from app.ingest.loader import DocumentLoader
+        from app.ingest.pipeline import IngestPipeline
+        
+        setup_start = time.perf_counter()
+        pipeline = IngestPipeline(collection_name="bench_ingest")
+        setup_seconds = time.perf_counter() - setup_start
+        
+        stages = {"load": 0.0, "chunk": 0.0, "embed": 0.0, "store": 0.0}
+        total_chunks = 0
+        errors = []
+        
+        run_start = time.perf_counter()
+        for file_info in files:
+            path = file_info["path"]
+            try:
+                stage_start = time.perf_counter()
+                if file_info["type"] == "html":
+                    document = DocumentLoader.load_html_file(path)
+                else:
+                    document = DocumentLoader.load_markdown_file(path)
+                stages["load"] += time.perf_counter() - stage_start
+                
+                result = pipeline.ingest_text(
+                    text=document["text"],
+                    metadata=document["metadata"],
+                    document_id=document["metadata"].get("document_id")
+                )
+                for stage, seconds in result["timings"].items():
+                    stages[stage] += seconds
+                total_chunks += result["chunks_count"]
+            except Exception as e:
+                errors.append(f"{path}: {e}")
+        total_seconds = time.perf_counter() - run_start
+        
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "num_docs": num_docs,
+                "sections_per_doc": sections_per_doc,
+                "html_ratio": html_ratio,
+                "seed": seed,
+                "embedding_model": settings.embedding_model,
+                "embedding_device": settings.embedding_device,
+                "chunk_size": settings.chunk_size,
+                "chunk_overlap": settings.chunk_overlap,
+                "python": platform.python_version(),
+                "platform": platform.platform()
+            },
+            "corpus_bytes": sum(f["bytes"] for f in files),
+            "documents": len(files) - len(errors),
+            "chunks": total_chunks,
+            "setup_seconds": round(setup_seconds, 3),
+            "total_seconds": round(total_seconds, 3),
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stages.items()},
+            "chunks_per_second": round(total_chunks / total_seconds, 2) if total_seconds > 0 else 0.0,
+            "docs_per_second": round((len(files) - len(errors)) / total_seconds, 2) if total_seconds > 0 else 0.0,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "index_size_mb": round(_dir_size_mb(db_dir), 2),
+            "errors": errors
+        }
+    finally:
+        if keep_files:
+            print(f"Benchmark files kept at: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest 처리량 벤치마크")
+    parser.add_argument("--docs", type=int, default=100, help="생성할 문서 수")
+    parser.add_argument("--sections", type=int, default=12, help="문서당 평균 섹션 수")
+    parser.add_argument("--html-ratio", type=float, default=0.2, help="HTML 문서 비율")
+    parser.add_argument("--seed", type=int, default=42, help="코퍼스 난수 시드")
+    parser.add_argument("--output", default="bench_ingest.json", help="결과 JSON 경로")
+    parser.add_argument("--keep-files", action="store_true", help="임시 코퍼스/DB 유지")
+    args = parser.parse_args()
+    
+    result = run_benchmark(
+        num_docs=args.docs,
+        sections_per_doc=args.sections,
+        html_ratio=args.html_ratio,
+        seed=args.seed,
+        keep_files=args.keep_files
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+LLM HTTP 클라이언트 벤치마크
+OpenAI 호환 엔드포인트(기본: benchmarks.fake_openai_server)에 동시 채팅 호출을 보내
+호출 지연 시간(p50/p95/p99)과 재시도/헤지 지표를 측정하여 JSON으로 저장
+
+--hedge-after-ms, --max-retries는 LLM_HEDGE_AFTER_MS, LLM_MAX_RETRIES 설정을 덮어씁니다.
+
+사용 예:
+    python -m benchmarks.fake_openai_server --port 9000 --slow-rate 0.05 --slow-ms 3000 --error-rate 0.1 &
+    python -m benchmarks.llm_client_benchmark --base-url http://127.0.0.1:9000/v1 --requests 200 --concurrency 20
+    python -m benchmarks.llm_client_benchmark --base-url http://127.0.0.1:9000/v1 --hedge-after-ms 500 --stream
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def _latency_stats(latencies_ms: List[float]) -> Dict[str, float]:
+    latencies = np.asarray(latencies_ms or [0.0])
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+    }
+
+
+async def _run(llm, num_requests: int, concurrency: int, stream: bool) -> Dict[str, Any]:
+    from langchain.schema import HumanMessage
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+    
+    async def one(i: int):
+        nonlocal failures
+        messages = [HumanMessage(content=f"설치 방법을 알려주세요 ({i})")]
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if stream:
+                    async for _ in llm.astream(messages):
+                        pass
+                else:
+                    await llm.ainvoke(messages)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                failures += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(num_requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "latency": _latency_stats(latencies),
+        "failures": failures,
+        "throughput_rps": round(num_requests / elapsed, 2),
+    }
+
+
+def run_benchmark(
+    base_url: str,
+    num_requests: int = 100,
+    concurrency: int = 10,
+    stream: bool = False,
+    hedge_after_ms: Optional[int] = None,
+    max_retries: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    LLM 호출 지연 시간 / 재시도 / 헤지 지표 측정
+    
+    Args:
+        base_url: OpenAI 호환 API 주소 (예: http://127.0.0.1:9000/v1)
+        num_requests: 보낼 요청 수
+        concurrency: 동시 요청 수
+        stream: 스트리밍 호출 여부 (지연 시간은 스트림 끝까지)
+        hedge_after_ms: 헤지 요청 기준 (기본값: settings.llm_hedge_after_ms)
+        max_retries: 재시도 횟수 (기본값: settings.llm_max_retries)
+        
+    Returns:
+        측정 결과 딕셔너리
+    """
+    from app.services.rag.llm_http import llm_call_metrics
+    from app.services.rag.llm_manager import create_llm
+    
+    os.environ["OPENAI_API_BASE"] = base_url
+    settings.use_gms = False
+    settings.openai_api_key = settings.openai_api_key or "fake"
+    if hedge_after_ms is not None:
+        settings.llm_hedge_after_ms = hedge_after_ms or None
+    if max_retries is not None:
+        settings.llm_max_retries = max_retries
+    
+    llm = create_llm()
+    llm_call_metrics.reset()
+    results = asyncio.run(_run(llm, num_requests, concurrency, stream))
+    results["http"] = llm_call_metrics.stats()
+    print(json.dumps(results, ensure_ascii=False))
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "base_url": base_url,
+            "requests": num_requests,
+            "concurrency": concurrency,
+            "stream": stream,
+            "hedge_after_ms": settings.llm_hedge_after_ms,
+            "max_retries": settings.llm_max_retries,
+            "max_connections": settings.llm_http_max_connections,
+            "max_keepalive": settings.llm_http_max_keepalive,
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM HTTP 클라이언트 벤치마크 (지연 시간, 재시도, 헤지 요청)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:9000/v1", help="OpenAI 호환 API 주소")
+    parser.add_argument("--requests", type=int, default=100, help="보낼 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 호출")
+    parser.add_argument("--hedge-after-ms", type=int, default=None, help="헤지 요청 기준 (ms, 0이면 끔)")
+    parser.add_argument("--max-retries", type=int, default=None, help="재시도 횟수")
+    parser.add_argument("--output", default="bench_llm_client.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+    
+    result = run_benchmark(
+        base_url=args.base_url,
+        num_requests=args.requests,
+        concurrency=args.concurrency,
+        stream=args.stream,
+        hedge_after_ms=args.hedge_after_ms,
+        max_retries=args.max_retries
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+재순위화 벤치마크
+질의마다 rerank_candidates개 후보를 벡터 검색한 뒤 cross-encoder 재순위화에 걸린 시간과,
+재순위화 없이 retrieval_top_k개를 보낼 때 대비 컨텍스트 토큰(패킹 후) 절감량을 측정하여 JSON으로 저장
+
+같은 질의를 두 번 돌려 두 번째 실행에서 쌍 점수 캐시 적중 시 지연 시간도 측정합니다.
+질의는 --queries-file(한 줄에 질의 하나)을 사용하고, 없으면 WARMUP_QUERIES를 사용합니다.
+
+사용 예:
+    python -m benchmarks.rerank_benchmark --collection documents --top-n 3
+    python -m benchmarks.rerank_benchmark --queries-file queries.txt --candidates 30 --threshold 0.0
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def _latency_stats(latencies_ms: List[float]) -> Dict[str, float]:
+    latencies = np.asarray(latencies_ms)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+    }
+
+
+def _load_queries(queries_file: Optional[str]) -> List[str]:
+    if not queries_file:
+        return list(settings.warmup_queries)
+    with open(queries_file, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+    if not queries:
+        raise ValueError(f"No queries in {queries_file}")
+    return queries
+
+
+def run_benchmark(
+    collection_name: Optional[str] = None,
+    queries_file: Optional[str] = None,
+    candidates: Optional[int] = None,
+    top_n: Optional[int] = None,
+    score_threshold: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    재순위화 지연 시간 / 컨텍스트 토큰 절감량 측정
+    
+    Args:
+        collection_name: 측정할 컬렉션 (기본값: settings.collection_name)
+        queries_file: 질의 파일 경로 (선택적)
+        candidates: 재순위화할 후보 수 (기본값: settings.rerank_candidates)
+        top_n: 남길 청크 수 (기본값: settings.rerank_top_n)
+        score_threshold: 점수 기준 (기본값: settings.rerank_score_threshold)
+        
+    Returns:
+        측정 결과 딕셔너리
+    """
+    from app.ingest.embedder import Embedder
+    from app.services.rag.context_packer import pack_context, tokenizer_name
+    from app.services.rag.reranker import CrossEncoderReranker
+    from app.vectorstore.factory import open_vectorstore
+    
+    store = open_vectorstore(collection_name)
+    if store.count() == 0:
+        raise ValueError(f"Collection '{store.collection_name}' is empty")
+    candidates = candidates or settings.rerank_candidates
+    queries = _load_queries(queries_file)
+    
+    embedder = Embedder()
+    reranker = CrossEncoderReranker()
+    instruction = "query: " if "multilingual-e5" in embedder.model_name.lower() else None
+    query_embeddings = embedder.embed_texts(queries, instruction=instruction)
+    
+    cold_ms, warm_ms = [], []
+    baseline_tokens, reranked_tokens = [], []
+    kept_counts = []
+    for query, query_embedding in zip(queries, query_embeddings):
+        result = store.search(query_embedding, n_results=max(candidates, settings.retrieval_top_k))
+        documents = [
+            {"content": text, "metadata": metadata, "distance": float(distance), "id": doc_id}
+            for text, metadata, distance, doc_id in zip(
+                result["documents"], result["metadatas"], result["distances"], result["ids"]
+            )
+        ]
+        
+        # 기준: 재순위화 없이 상위 retrieval_top_k개
+        baseline_tokens.append(pack_context(documents[:settings.retrieval_top_k])[2]["tokens_after"])
+        
+        started = time.perf_counter()
+        kept, _ = reranker.rerank(query, documents[:candidates], top_n=top_n, score_threshold=score_threshold)
+        cold_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        reranker.rerank(query, documents[:candidates], top_n=top_n, score_threshold=score_threshold)
+        warm_ms.append((time.perf_counter() - started) * 1000)
+        
+        reranked_tokens.append(pack_context(kept)[2]["tokens_after"])
+        kept_counts.append(len(kept))
+    
+    tokens_saved = float(np.mean(baseline_tokens) - np.mean(reranked_tokens))
+    cold = _latency_stats(cold_ms)
+    summary = {
+        "rerank_latency": cold,
+        "rerank_latency_cached": _latency_stats(warm_ms),
+        "kept_mean": round(float(np.mean(kept_counts)), 2),
+        "baseline_context_tokens_mean": round(float(np.mean(baseline_tokens)), 1),
+        "reranked_context_tokens_mean": round(float(np.mean(reranked_tokens)), 1),
+        "context_tokens_saved_mean": round(tokens_saved, 1),
+        "ms_per_1k_tokens_saved": round(cold["mean_ms"] / tokens_saved * 1000, 3) if tokens_saved > 0 else None,
+    }
+    print(json.dumps(summary, ensure_ascii=False))
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "collection": store.collection_name,
+            "chunks": store.count(),
+            "queries": len(queries),
+            "query_source": queries_file or "warmup_queries",
+            "rerank_model": reranker.model_name,
+            "candidates": candidates,
+            "top_n": settings.rerank_top_n if top_n is None else top_n,
+            "score_threshold": settings.rerank_score_threshold if score_threshold is None else score_threshold,
+            "baseline_top_k": settings.retrieval_top_k,
+            "tokenizer": tokenizer_name(),
+        },
+        "results": summary
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재순위화 벤치마크 (지연 시간 vs 컨텍스트 토큰 절감량)")
+    parser.add_argument("--collection", default=None, help="측정할 컬렉션 (기본값: COLLECTION_NAME)")
+    parser.add_argument("--queries-file", default=None, help="질의 파일 (한 줄에 질의 하나)")
+    parser.add_argument("--candidates", type=int, default=None, help="재순위화할 후보 수 (기본값: RERANK_CANDIDATES)")
+    parser.add_argument("--top-n", type=int, default=None, help="남길 청크 수 (기본값: RERANK_TOP_N)")
+    parser.add_argument("--threshold", type=float, default=None, help="점수 기준 (기본값: RERANK_SCORE_THRESHOLD)")
+    parser.add_argument("--output", default="bench_rerank.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+    
+    result = run_benchmark(
+        collection_name=args.collection,
+        queries_file=args.queries_file,
+        candidates=args.candidates,
+        top_n=args.top_n,
+        score_threshold=args.threshold
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+2단계 검색 벤치마크
+기존 컬렉션에서 전체 청크 검색(flat)과 문서 중심 벡터 -> 청크 2단계 검색(two_stage)의
+지연 시간(p50/p95)과 flat 결과 대비 recall@k를 1단계 문서 수별로 측정하여 JSON으로 저장
+
+쿼리는 --queries-file(한 줄에 질의 하나)을 임베딩하여 사용하고, 없으면 저장된 청크 중
+일부를 골라 그 임베딩을 쿼리로 사용합니다.
+
+사용 예:
+    python -m benchmarks.two_stage_benchmark --collection documents --top-documents 5,10,20,50
+    python -m benchmarks.two_stage_benchmark --queries-file queries.txt --k 5
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def _sample_query_embeddings(store, num_queries: int, seed: int) -> List[List[float]]:
+    """저장된 청크 중 일부의 임베딩을 쿼리로 사용"""
+    chunk_ids = store.metadata_index.find_chunk_ids()
+    if not chunk_ids:
+        raise ValueError(f"Collection '{store.collection_name}' is empty")
+    sampled = random.Random(seed).sample(chunk_ids, min(num_queries, len(chunk_ids)))
+    return [chunk["embedding"] for chunk in store.get_by_ids(sampled, include=["embeddings"])]
+
+
+def _embed_queries(queries_file: str) -> List[List[float]]:
+    """질의 파일을 임베딩"""
+    from app.ingest.embedder import Embedder
+    
+    with open(queries_file, "r", encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+    if not queries:
+        raise ValueError(f"No queries in {queries_file}")
+    embedder = Embedder()
+    instruction = "query: " if "multilingual-e5" in embedder.model_name.lower() else None
+    return embedder.embed_texts(queries, instruction=instruction)
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, float]:
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+    }
+
+
+def run_benchmark(
+    collection_name: Optional[str] = None,
+    top_documents: Optional[List[int]] = None,
+    k: int = 5,
+    num_queries: int = 200,
+    queries_file: Optional[str] = None,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    flat / two_stage 검색 비교
+    
+    Args:
+        collection_name: 측정할 컬렉션 (기본값: settings.collection_name)
+        top_documents: 1단계에서 고를 문서 수 목록 (기본값: [settings.two_stage_top_documents])
+        k: 쿼리당 검색할 청크 수 (recall 기준 top-k)
+        num_queries: 질의 파일이 없을 때 샘플링할 쿼리 수
+        queries_file: 질의 파일 경로 (선택적)
+        seed: 샘플링 난수 시드
+        
+    Returns:
+        측정 결과 딕셔너리
+    """
+    from app.vectorstore.factory import open_vectorstore
+    
+    store = open_vectorstore(collection_name)
+    if store.centroid_index is None:
+        raise ValueError("document_centroids_enabled is off; enable it to benchmark two-stage retrieval")
+    top_documents = top_documents or [settings.two_stage_top_documents]
+    
+    if queries_file:
+        query_embeddings = _embed_queries(queries_file)
+    else:
+        query_embeddings = _sample_query_embeddings(store, num_queries, seed)
+    
+    # 기준: 전체 청크 검색
+    flat_latencies = []
+    flat_ids = []
+    for query_embedding in query_embeddings:
+        started = time.perf_counter()
+        result = store.search(query_embedding, n_results=k)
+        flat_latencies.append(time.perf_counter() - started)
+        flat_ids.append(set(result["ids"]))
+    
+    results = [{"mode": "flat", f"recall@{k}": 1.0, **_latency_stats(flat_latencies)}]
+    print(json.dumps(results[0], ensure_ascii=False))
+    
+    for n_documents in top_documents:
+        latencies = []
+        stage1_latencies = []
+        hits = 0
+        expected = 0
+        for query_embedding, reference in zip(query_embeddings, flat_ids):
+            started = time.perf_counter()
+            document_ids = store.search_documents([query_embedding], n_documents=n_documents)[0]
+            stage1_latencies.append(time.perf_counter() - started)
+            result = store.search(
+                query_embedding,
+                n_results=k,
+                filter_metadata={"document_id": {"$in": document_ids}} if document_ids else None
+            )
+            latencies.append(time.perf_counter() - started)
+            hits += len(reference & set(result["ids"]))
+            expected += len(reference)
+        
+        result = {
+            "mode": "two_stage",
+            "top_documents": n_documents,
+            f"recall@{k}": round(hits / expected, 4) if expected else 0.0,
+            **_latency_stats(latencies),
+            "stage1_p50_ms": _latency_stats(stage1_latencies)["p50_ms"],
+        }
+        print(json.dumps(result, ensure_ascii=False))
+        results.append(result)
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "collection": store.collection_name,
+            "backend": settings.vector_db_type,
+            "chunks": store.count(),
+            "documents": len(store.centroid_index),
+            "queries": len(query_embeddings),
+            "query_source": queries_file or "sampled_chunks",
+            "k": k,
+            "seed": seed,
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="2단계 검색 벤치마크 (flat vs two_stage, recall@k / 지연 시간)")
+    parser.add_argument("--collection", default=None, help="측정할 컬렉션 (기본값: COLLECTION_NAME)")
+    parser.add_argument("--top-documents", default=None, help="1단계 문서 수 목록 (쉼표 구분)")
+    parser.add_argument("--k", type=int, default=5, help="쿼리당 검색할 청크 수")
+    parser.add_argument("--queries", type=int, default=200, help="샘플링할 쿼리 수 (질의 파일이 없을 때)")
+    parser.add_argument("--queries-file", default=None, help="질의 파일 (한 줄에 질의 하나)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--output", default="bench_two_stage.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+    
+    result = run_benchmark(
+        collection_name=args.collection,
+        top_documents=[int(v) for v in args.top_documents.split(",") if v] if args.top_documents else None,
+        k=args.k,
+        num_queries=args.queries,
+        queries_file=args.queries_file,
+        seed=args.seed
+    )
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()